@@ -0,0 +1,32 @@
+from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def recriar_fts_sqlite(using, **kwargs):
+    """
+    Recria os triggers da busca no SQLite se alguma migração recriou as tabelas
+    de origem (o SQLite recria a tabela ao alterar colunas, descartando os triggers).
+
+    Só age se a migração busca.0002_fts_sqlite já criou as tabelas FTS.
+    """
+    conexao = connections[using]
+    if conexao.vendor != "sqlite":
+        return
+    from busca.consultas import FONTES, preparar_fts_sqlite
+
+    tabelas = [fonte.tabela_fts for fonte in FONTES]
+    if not set(tabelas) & set(conexao.introspection.table_names()):
+        return
+    preparar_fts_sqlite(conexao)
+
+
+class BuscaConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "busca"
+    verbose_name = "Busca"
+
+    def ready(self):
+        """Mantém as tabelas FTS do SQLite depois de cada migrate."""
+        # Sem sender: o sinal só é enviado para apps com models.py, e busca não tem
+        post_migrate.connect(recriar_fts_sqlite, dispatch_uid="busca.recriar_fts_sqlite")
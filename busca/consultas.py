@@ -0,0 +1,265 @@
+"""
+Busca textual em peças, OPs e clientes.
+
+Cada fonte tem campos de código (casados por trecho, ex.: "1234" encontra
+"NF-2024-1234") e um campo de texto livre (casado por palavras). A
+implementação depende do banco:
+
+- PostgreSQL: índices trigram (pg_trgm) sobre UPPER(código), que atendem o
+  icontains, e índices de busca textual (to_tsvector) sobre o texto livre;
+  relevância por SearchRank + similaridade trigram. Os índices são criados pela
+  migração busca.0001_indices_postgres.
+- SQLite (desenvolvimento): tabelas FTS5 com tokenizador trigram, mantidas por
+  triggers e criadas pela migração busca.0002_fts_sqlite (e recriadas após cada
+  migrate, ver BuscaConfig.ready()); relevância por bm25.
+- Outros bancos: icontains sem índice, com relevância simples.
+"""
+
+import re
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+
+CONFIG_TEXTO = "portuguese"
+
+TAMANHO_MINIMO_TERMO = 3
+
+
+@dataclass(frozen=True)
+class Fonte:
+    tipo: str
+    modelo: type
+    campos_codigo: tuple
+    campo_texto: str
+    campo_titulo: str
+    campo_descricao: str = None
+
+    @property
+    def tabela_fts(self):
+        return f"busca_fts_{self.tipo}"
+
+    @property
+    def campos_fts(self):
+        return tuple(dict.fromkeys((*self.campos_codigo, self.campo_texto)))
+
+
+FONTES = (
+    Fonte("peca", Peca, ("codigo", "pedido"), "descricao", "codigo", "descricao"),
+    Fonte("ordem_producao", OrdemProducao, ("codigo",), "observacoes", "codigo", "observacoes"),
+    Fonte("cliente", Cliente, ("nome",), "nome", "nome"),
+)
+
+TIPOS = tuple(fonte.tipo for fonte in FONTES)
+
+
+def busca_valida(q):
+    """Os índices trigram exigem ao menos TAMANHO_MINIMO_TERMO caracteres."""
+    return len(q.strip()) >= TAMANHO_MINIMO_TERMO
+
+
+def termos_busca(q):
+    """Palavras da busca com o tamanho mínimo suportado pelos índices trigram."""
+    return [termo for termo in re.findall(r"\w+", q) if len(termo) >= TAMANHO_MINIMO_TERMO]
+
+
+def buscar(q, tipos=TIPOS, limite=20):
+    """
+    Busca q nas fontes dos tipos informados e retorna até ``limite`` resultados
+    de todos os tipos, do mais para o menos relevante.
+
+    O texto inteiro é buscado como trecho dos campos de código e, palavra por
+    palavra, no texto livre.
+    """
+    if not busca_valida(q):
+        return []
+    termos = termos_busca(q)
+
+    if connection.vendor == "postgresql":
+        buscar_fonte = _buscar_postgres
+    elif connection.vendor == "sqlite":
+        buscar_fonte = _buscar_sqlite
+    else:
+        buscar_fonte = _buscar_generico
+
+    resultados = []
+    for fonte in FONTES:
+        if fonte.tipo in tipos:
+            resultados.extend(buscar_fonte(fonte, q.strip(), termos, limite))
+
+    resultados.sort(key=lambda resultado: resultado["rank"], reverse=True)
+    return resultados[:limite]
+
+
+def _resultados(fonte, linhas):
+    return [
+        {
+            "tipo": fonte.tipo,
+            "id": linha["id"],
+            "titulo": linha[fonte.campo_titulo],
+            "descricao": linha[fonte.campo_descricao] if fonte.campo_descricao else None,
+            "rank": float(linha["rank"]),
+        }
+        for linha in linhas
+    ]
+
+
+def _campos_valores(fonte):
+    return ["id", *dict.fromkeys(filter(None, (fonte.campo_titulo, fonte.campo_descricao)))]
+
+
+def _filtro_codigo(fonte, q):
+    filtro = Q()
+    for campo in fonte.campos_codigo:
+        filtro |= Q(**{f"{campo}__icontains": q})
+    return filtro
+
+
+def _buscar_postgres(fonte, q, termos, limite):
+    from django.contrib.postgres.search import (
+        SearchQuery,
+        SearchRank,
+        SearchVector,
+        TrigramSimilarity,
+    )
+
+    similaridades = [TrigramSimilarity(campo, q) for campo in fonte.campos_codigo]
+    rank = Greatest(*similaridades) if len(similaridades) > 1 else similaridades[0]
+    filtro = _filtro_codigo(fonte, q)
+    qs = fonte.modelo.objects.all()
+
+    if termos:
+        # Busca por prefixo de cada palavra (ex.: "usin" encontra "usinagem")
+        consulta = SearchQuery(
+            " & ".join(f"{termo}:*" for termo in termos), config=CONFIG_TEXTO, search_type="raw"
+        )
+        qs = qs.annotate(vetor=SearchVector(fonte.campo_texto, config=CONFIG_TEXTO))
+        filtro |= Q(vetor=consulta)
+        rank = SearchRank(F("vetor"), consulta) + rank
+
+    linhas = (
+        qs.filter(filtro)
+        .annotate(rank=rank)
+        .order_by("-rank")
+        .values(*_campos_valores(fonte), "rank")[:limite]
+    )
+    return _resultados(fonte, linhas)
+
+
+def _buscar_generico(fonte, q, termos, limite):
+    codigo = fonte.campos_codigo[0]
+    filtro = _filtro_codigo(fonte, q)
+    for termo in termos:
+        filtro |= Q(**{f"{fonte.campo_texto}__icontains": termo})
+
+    linhas = (
+        fonte.modelo.objects.filter(filtro)
+        .annotate(
+            rank=Case(
+                When(**{f"{codigo}__iexact": q}, then=Value(3.0)),
+                When(**{f"{codigo}__istartswith": q}, then=Value(2.0)),
+                When(**{f"{codigo}__icontains": q}, then=Value(1.5)),
+                default=Value(1.0),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-rank")
+        .values(*_campos_valores(fonte), "rank")[:limite]
+    )
+    return _resultados(fonte, linhas)
+
+
+def _buscar_sqlite(fonte, q, termos, limite):
+    # Textos entre aspas casam como trecho, sem interpretar a sintaxe do FTS5.
+    # Registros que contêm o texto inteiro casam com as duas alternativas e
+    # ficam à frente dos que só contêm as palavras.
+    alternativas = [_trecho_fts(q)]
+    if termos:
+        alternativas.append("(" + " ".join(_trecho_fts(termo) for termo in termos) + ")")
+    expressao = " OR ".join(alternativas)
+    tabela = fonte.tabela_fts
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT t.id, -bm25({tabela}) AS relevancia FROM {tabela} "
+            f"JOIN {fonte.modelo._meta.db_table} t ON t.rowid = {tabela}.rowid "
+            f"WHERE {tabela} MATCH %s ORDER BY relevancia DESC LIMIT %s",
+            [expressao, limite],
+        )
+        ranks = dict(cursor.fetchall())
+
+    campo_id = fonte.modelo._meta.pk
+    ranks = {campo_id.to_python(chave): rank for chave, rank in ranks.items()}
+    linhas = fonte.modelo.objects.filter(pk__in=ranks).values(*_campos_valores(fonte))
+    return _resultados(fonte, [{**linha, "rank": ranks[linha["id"]]} for linha in linhas])
+
+
+def _trecho_fts(texto):
+    return '"' + texto.replace('"', '""') + '"'
+
+
+def preparar_fts_sqlite(conexao=connection):
+    """
+    Cria (se necessário) as tabelas FTS5 de conteúdo externo e os triggers que as
+    mantêm sincronizadas com as tabelas de origem, e as popula.
+
+    As migrações do Django no SQLite recriam a tabela ao alterar colunas, o que
+    descarta os triggers; por isso, além da migração, a verificação roda ao fim
+    de cada migrate (sinal post_migrate), nunca durante a busca.
+    """
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            ["busca_fts_%"],
+        )
+        if cursor.fetchone()[0] == 3 * len(FONTES):
+            return
+
+        for fonte in FONTES:
+            _criar_fts_sqlite(cursor, fonte)
+
+
+def remover_fts_sqlite(conexao=connection):
+    """Remove as tabelas FTS5 e os triggers criados por preparar_fts_sqlite()."""
+    with conexao.cursor() as cursor:
+        for fonte in FONTES:
+            _remover_fts_sqlite(cursor, fonte)
+
+
+def _remover_fts_sqlite(cursor, fonte):
+    for sufixo in ("ai", "ad", "au"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {fonte.tabela_fts}_{sufixo}")
+    cursor.execute(f"DROP TABLE IF EXISTS {fonte.tabela_fts}")
+
+
+def _criar_fts_sqlite(cursor, fonte):
+    tabela = fonte.tabela_fts
+    origem = fonte.modelo._meta.db_table
+    colunas = ", ".join(fonte.campos_fts)
+    novos = ", ".join(f"new.{campo}" for campo in fonte.campos_fts)
+    antigos = ", ".join(f"old.{campo}" for campo in fonte.campos_fts)
+
+    _remover_fts_sqlite(cursor, fonte)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {tabela} USING fts5({colunas}, content='{origem}', "
+        "tokenize='trigram')"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {tabela}_ai AFTER INSERT ON {origem} BEGIN "
+        f"INSERT INTO {tabela}(rowid, {colunas}) VALUES (new.rowid, {novos}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {tabela}_ad AFTER DELETE ON {origem} BEGIN "
+        f"INSERT INTO {tabela}({tabela}, rowid, {colunas}) "
+        f"VALUES ('delete', old.rowid, {antigos}); END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {tabela}_au AFTER UPDATE ON {origem} BEGIN "
+        f"INSERT INTO {tabela}({tabela}, rowid, {colunas}) "
+        f"VALUES ('delete', old.rowid, {antigos}); "
+        f"INSERT INTO {tabela}(rowid, {colunas}) VALUES (new.rowid, {novos}); END"
+    )
+    cursor.execute(f"INSERT INTO {tabela}({tabela}) VALUES ('rebuild')")
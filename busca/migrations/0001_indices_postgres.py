@@ -0,0 +1,62 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+# Deve ser igual a busca.consultas.CONFIG_TEXTO, para a consulta usar o índice
+CONFIG_TEXTO = "portuguese"
+
+# Índices só existem no PostgreSQL (GIN, pg_trgm e to_tsvector não existem no SQLite),
+# por isso não são declarados em Meta.indexes dos modelos.
+# - trigram sobre UPPER(campo): atende o icontains do Django (UPPER(campo) LIKE UPPER(...))
+# - to_tsvector: mesma expressão gerada por SearchVector(campo, config=CONFIG_TEXTO)
+INDICES = [
+    ("pecas", "Peca", OpClass(Upper("codigo"), name="gin_trgm_ops"), "busca_peca_codigo_trgm"),
+    ("pecas", "Peca", OpClass(Upper("pedido"), name="gin_trgm_ops"), "busca_peca_pedido_trgm"),
+    ("pecas", "Peca", SearchVector("descricao", config=CONFIG_TEXTO), "busca_peca_descricao_fts"),
+    (
+        "producao",
+        "OrdemProducao",
+        OpClass(Upper("codigo"), name="gin_trgm_ops"),
+        "busca_op_codigo_trgm",
+    ),
+    (
+        "producao",
+        "OrdemProducao",
+        SearchVector("observacoes", config=CONFIG_TEXTO),
+        "busca_op_observacoes_fts",
+    ),
+    ("pecas", "Cliente", OpClass(Upper("nome"), name="gin_trgm_ops"), "busca_cliente_nome_trgm"),
+    ("pecas", "Cliente", SearchVector("nome", config=CONFIG_TEXTO), "busca_cliente_nome_fts"),
+]
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for app_label, modelo, expressao, nome in INDICES:
+        schema_editor.add_index(apps.get_model(app_label, modelo), GinIndex(expressao, name=nome))
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for app_label, modelo, expressao, nome in INDICES:
+        schema_editor.remove_index(
+            apps.get_model(app_label, modelo), GinIndex(expressao, name=nome)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pecas", "0004_updated_at_id_idx"),
+        ("producao", "0007_ordemproducao_updated_at_id_idx"),
+    ]
+
+    operations = [
+        # Ignorada em bancos que não são PostgreSQL
+        TrigramExtension(),
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
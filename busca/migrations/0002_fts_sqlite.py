@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Tabelas FTS5 e triggers da busca no SQLite (desenvolvimento). No PostgreSQL a
+# busca usa os índices de busca.0001_indices_postgres.
+# As definições ficam em busca.consultas.FONTES, as mesmas usadas pela busca e pela
+# recriação após cada migrate (BuscaConfig.ready()).
+
+
+def criar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    from busca.consultas import preparar_fts_sqlite
+
+    preparar_fts_sqlite(schema_editor.connection)
+
+
+def remover_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    from busca.consultas import remover_fts_sqlite
+
+    remover_fts_sqlite(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("busca", "0001_indices_postgres"),
+        ("pecas", "0004_updated_at_id_idx"),
+        ("producao", "0008_producaodiariapendente"),
+    ]
+
+    operations = [
+        # Ignorada em bancos que não são SQLite
+        migrations.RunPython(criar_fts, remover_fts),
+    ]
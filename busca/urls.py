@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import busca
+
+urlpatterns = [
+    path("search/", busca, name="search"),
+]
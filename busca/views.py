@@ -0,0 +1,44 @@
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from .consultas import TAMANHO_MINIMO_TERMO, TIPOS, busca_valida, buscar
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+
+@api_view(["GET"])
+def busca(request):
+    """
+    Busca peças (código, descrição, pedido), OPs (código, observações) e
+    clientes (nome) e retorna os resultados misturados, por relevância.
+
+    Parâmetros:
+    - q: texto buscado; trechos de códigos também casam (ex.: "1234" encontra "NF-2024-1234")
+    - tipos: lista separada por vírgulas (peca, ordem_producao, cliente); padrão: todos
+    - limit: máximo de resultados (padrão 20, máximo 100)
+    """
+    q = request.GET.get("q", "")
+    if not busca_valida(q):
+        return Response(
+            {"error": f"q deve ter ao menos {TAMANHO_MINIMO_TERMO} caracteres"},
+            status=400,
+        )
+
+    tipos = TIPOS
+    if request.GET.get("tipos"):
+        tipos = [tipo.strip() for tipo in request.GET["tipos"].split(",") if tipo.strip()]
+        invalidos = sorted(set(tipos) - set(TIPOS))
+        if invalidos:
+            return Response(
+                {"error": f"Tipos inválidos: {', '.join(invalidos)}. Use {', '.join(TIPOS)}"},
+                status=400,
+            )
+
+    try:
+        limite = int(request.GET.get("limit", LIMITE_PADRAO))
+    except ValueError:
+        return Response({"error": "limit deve ser um número inteiro"}, status=400)
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    resultados = buscar(q, tipos, limite)
+    return Response({"q": q, "count": len(resultados), "results": resultados})
@@ -1,19 +1,56 @@
 # Gunicorn configuration file
-# Use: gunicorn -c gunicorn.conf.py usinasoft.wsgi:application
+# Use: gunicorn -c gunicorn.conf.py
+#
+# O perfil dos workers é escolhido por GUNICORN_PERFIL:
+# - sync (padrão): um processo por requisição em andamento; clientes lentos
+#   ocupam o worker inteiro enquanto enviam/recebem os dados.
+# - gthread: GUNICORN_THREADS threads por worker; só as conexões keep-alive
+#   ociosas (entre uma requisição e outra) ficam no laço de eventos do worker sem
+#   ocupar threads. Uma requisição recebida devagar prende uma thread até chegar
+#   inteira: com mais clientes lentos que workers * threads o servidor para.
+# - uvicorn: workers ASGI (usinasoft.asgi); a leitura das requisições é
+#   assíncrona, então clientes lentos não ocupam o worker. Necessário para o
+#   stream de eventos SSE e recomendado com tablets em rede sem fio. As views
+#   síncronas do Django rodam uma por vez em cada worker, então a vazão de CPU é
+#   a mesma do sync com os mesmos workers.
 
 import multiprocessing
+import os
+
+PERFIS = {
+    "sync": ("sync", "usinasoft.wsgi:application"),
+    "gthread": ("gthread", "usinasoft.wsgi:application"),
+    "uvicorn": ("uvicorn.workers.UvicornWorker", "usinasoft.asgi:application"),
+}
+
+perfil = os.environ.get("GUNICORN_PERFIL", "sync")
+if perfil not in PERFIS:
+    raise RuntimeError(f"GUNICORN_PERFIL inválido: {perfil!r} (opções: {', '.join(PERFIS)})")
+worker_class, wsgi_app = PERFIS[perfil]
 
 # Server socket
-bind = "0.0.0.0:8000"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4 if perfil == "gthread" else 1))
+# Conexões simultâneas por worker (gthread: keep-alive ociosas incluídas; uvicorn)
 worker_connections = 1000
-timeout = 120
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = 30
 keepalive = 5
 
+# Reciclagem: cada worker é reiniciado após max_requests requisições (0 desliga);
+# o jitter aleatório evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10))
+
+# Carrega e aquece a aplicação no processo mestre antes do fork (ver when_ready):
+# os workers começam prontos e compartilham a memória do mestre (copy-on-write).
+# Com preload, kill -HUP não recarrega o código: reinicie o processo mestre.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
 # Logging
 accesslog = "-"  # Log to stdout
 errorlog = "-"  # Log to stderr
@@ -33,3 +70,63 @@ tmp_upload_dir = None
 # SSL
 keyfile = None
 certfile = None
+
+
+# Server hooks
+def on_starting(server):
+    """Descarta as métricas por worker de execuções anteriores (METRICAS_DIR)."""
+    import os
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "usinasoft.settings")
+    django.setup()
+    from usinasoft.metricas import limpar_arquivos
+
+    limpar_arquivos()
+
+
+def when_ready(server):
+    """Com preload_app, aquece a aplicação uma vez no mestre, antes de criar os workers."""
+    if not server.cfg.preload_app:
+        return
+    import gc
+
+    from usinasoft.aquecimento import aquecer
+
+    server.log.info("Aplicação aquecida em %.0f ms", aquecer() * 1000)
+    # Os objetos carregados até aqui não são mais percorridos pelo coletor de lixo, que
+    # senão escreveria neles e copiaria as páginas compartilhadas em cada worker
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    """Fecha conexões abertas no mestre: cada worker abre as próprias depois do fork."""
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    """Sem preload_app, cada worker se aquece antes de atender a primeira requisição."""
+    if worker.cfg.preload_app:
+        return
+    from usinasoft.aquecimento import aquecer
+
+    worker.log.info("Aplicação aquecida em %.0f ms", aquecer() * 1000)
+
+
+def worker_exit(server, worker):
+    """Grava os registros de auditoria ainda no buffer e as métricas antes de o worker encerrar."""
+    from usinasoft.auditoria import gravador
+    from usinasoft.metricas import registro
+
+    gravador.encerrar()
+    registro.gravar(forcar=True)
+
+
+def child_exit(server, worker):
+    """No mestre, depois que o worker terminou: soma as métricas dele às dos encerrados."""
+    from usinasoft.metricas import consolidar_processo
+
+    consolidar_processo(worker.pid)
@@ -0,0 +1,90 @@
+import csv
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pecas.serializers import PecaImportacaoSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa peças de um arquivo CSV ou JSONL usando a importação em lote "
+        "(mesmas validações do POST /api/pecas/bulk/)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("arquivo", help="Caminho do arquivo .csv ou .jsonl")
+        parser.add_argument(
+            "--formato",
+            choices=["csv", "jsonl"],
+            help="Formato do arquivo (padrão: inferido pela extensão)",
+        )
+        parser.add_argument(
+            "--delimitador", default=",", help="Delimitador de colunas do CSV (padrão: ',')"
+        )
+
+    def handle(self, *args, **options):
+        caminho = Path(options["arquivo"])
+        if not caminho.exists():
+            raise CommandError(f"Arquivo não encontrado: {caminho}")
+
+        formato = options["formato"] or caminho.suffix.lstrip(".").lower()
+        if formato == "csv":
+            itens = self._ler_csv(caminho, options["delimitador"])
+        elif formato in ("jsonl", "ndjson"):
+            itens = self._ler_jsonl(caminho)
+        else:
+            raise CommandError("Formato não reconhecido. Use --formato csv ou jsonl.")
+
+        if not itens:
+            raise CommandError("Nenhuma peça encontrada no arquivo.")
+
+        serializer = PecaImportacaoSerializer(data=itens, many=True)
+        if not serializer.is_valid():
+            raise CommandError(self._formatar_erros(serializer.errors))
+
+        pecas = serializer.save()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(pecas)} peça(s) importada(s); "
+                f"{len(serializer.ops_criadas)} OP(s) criada(s)."
+            )
+        )
+
+    def _ler_csv(self, caminho, delimitador):
+        itens = []
+        with caminho.open(newline="", encoding="utf-8-sig") as arquivo:
+            for linha in csv.DictReader(arquivo, delimiter=delimitador):
+                # Colunas vazias são tratadas como ausentes (campos opcionais)
+                item = {campo: valor for campo, valor in linha.items() if valor not in ("", None)}
+                if "metadata" in item:
+                    try:
+                        item["metadata"] = json.loads(item["metadata"])
+                    except ValueError:
+                        raise CommandError(
+                            f"Linha {len(itens) + 2}: metadata não é um JSON válido."
+                        )
+                itens.append(item)
+        return itens
+
+    def _ler_jsonl(self, caminho):
+        itens = []
+        with caminho.open(encoding="utf-8") as arquivo:
+            for numero, linha in enumerate(arquivo, start=1):
+                if not linha.strip():
+                    continue
+                try:
+                    itens.append(json.loads(linha))
+                except ValueError:
+                    raise CommandError(f"Linha {numero}: JSON inválido.")
+        return itens
+
+    def _formatar_erros(self, erros):
+        if isinstance(erros, dict):
+            return "\n".join(str(erro) for erro in erros.get("non_field_errors", [erros]))
+        linhas = []
+        for indice, erro in enumerate(erros):
+            if erro:
+                linhas.append(f"Item {indice}: {erro}")
+        return "\n".join(linhas)
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pecas", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="peca",
+            index=models.Index(fields=["created_at", "id"], name="pecas_peca_created_678552_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pecas", "0003_peca_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cliente",
+            index=models.Index(fields=["updated_at", "id"], name="pecas_clien_updated_3e27f3_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="peca",
+            index=models.Index(fields=["updated_at", "id"], name="pecas_peca_updated_140384_idx"),
+        ),
+    ]
@@ -1,8 +1,9 @@
 import uuid
 from django.db import models
+from usinasoft.auditoria import AuditavelMixin
 
 
-class Cliente(models.Model):
+class Cliente(AuditavelMixin, models.Model):
     """
     Modelo que representa um cliente do sistema.
     """
@@ -21,13 +22,171 @@ class Cliente(models.Model):
         ordering = ["nome"]
         indexes = [
             models.Index(fields=["nome"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self):
         return self.nome
 
 
-class Peca(models.Model):
+class PecaQuerySet(models.QuerySet):
+    """QuerySet customizado para peças."""
+
+    def atualizar_status(self, status):
+        """
+        Muda o status de todas as peças do queryset com um único UPDATE.
+
+        queryset.update() não dispara os signals de post_save, então o status
+        de cada OP afetada é recalculado aqui, uma vez por OP, e o cache de
+        indicadores é invalidado explicitamente e a mudança de cada peça é
+        publicada no stream de eventos e registrada na auditoria. Peças que já
+        estão no status de destino são ignoradas.
+
+        Retorna uma tupla (quantidade de peças atualizadas, ids das OPs afetadas).
+        """
+        from django.db import transaction
+        from django.utils import timezone
+        from producao.indicadores import invalidar_indicadores
+        from producao.models import OrdemProducao
+        from usinasoft.auditoria import ACAO_ATUALIZAR, registrar_acao
+        from usinasoft.eventos import publicar_evento
+
+        pecas = self.exclude(status=status)
+
+        with transaction.atomic():
+            anteriores = list(
+                pecas.order_by().values_list("id", "codigo", "status", "ordem_producao_id")
+            )
+            op_ids = {op_id for _, _, _, op_id in anteriores}
+            atualizadas = pecas.update(status=status, updated_at=timezone.now())
+
+            for peca_id, codigo, status_anterior, op_id in anteriores:
+                publicar_evento(
+                    "peca.status",
+                    peca=peca_id,
+                    codigo=codigo,
+                    ordem_producao=op_id,
+                    status_anterior=status_anterior,
+                    status=status,
+                )
+                registrar_acao(
+                    ACAO_ATUALIZAR,
+                    "peca",
+                    peca_id,
+                    {"campos": {"status": {"de": status_anterior, "para": status}}},
+                )
+
+            ops = list(OrdemProducao.objects.filter(pk__in=op_ids))
+            for op in ops:
+                op.verificar_e_atualizar_status()
+
+            if atualizadas:
+                invalidar_indicadores(ops)
+
+        return atualizadas, op_ids
+
+
+class PecaManager(models.Manager.from_queryset(PecaQuerySet)):
+    """Manager customizado para o modelo Peca."""
+
+    def importar_em_lote(self, itens, batch_size=500):
+        """
+        Cria várias peças de uma vez, resolvendo as OPs pelo código da NF.
+
+        Cada item é um dicionário com os campos da peça, o ``cliente`` (instância)
+        e o ``ordem_producao_codigo``. As OPs existentes são buscadas em uma única
+        consulta, as que faltam são criadas com bulk_create e as peças também.
+        Como bulk_create não dispara signals, as peças e OPs criadas são
+        publicadas no stream de eventos e registradas na auditoria, e em seguida
+        o status de cada OP tocada é recalculado uma única vez e o cache de
+        indicadores é invalidado.
+
+        Retorna uma tupla (peças criadas, códigos das OPs criadas).
+        """
+        from django.db import transaction
+        from producao.indicadores import invalidar_indicadores
+        from producao.models import OrdemProducao
+        from usinasoft.auditoria import ACAO_CRIAR, registrar_acao, valores_para_log
+        from usinasoft.eventos import publicar_evento
+
+        itens = [dict(item) for item in itens]
+        codigos_op = {item["ordem_producao_codigo"] for item in itens}
+
+        with transaction.atomic():
+            ops = {op.codigo: op for op in OrdemProducao.objects.filter(codigo__in=codigos_op)}
+
+            # OPs inexistentes herdam o cliente da primeira peça que as referencia
+            novas_ops = {}
+            for item in itens:
+                codigo_op = item["ordem_producao_codigo"]
+                if codigo_op not in ops and codigo_op not in novas_ops:
+                    novas_ops[codigo_op] = OrdemProducao(
+                        codigo=codigo_op,
+                        cliente=item["cliente"],
+                        status=OrdemProducao.StatusChoices.ABERTA,
+                    )
+
+            if novas_ops:
+                # ignore_conflicts protege contra importações concorrentes da mesma NF;
+                # por isso as OPs são relidas do banco em seguida.
+                OrdemProducao.objects.bulk_create(
+                    novas_ops.values(), batch_size=batch_size, ignore_conflicts=True
+                )
+                ops.update(
+                    (op.codigo, op)
+                    for op in OrdemProducao.objects.filter(codigo__in=novas_ops.keys())
+                )
+
+            pecas = []
+            for item in itens:
+                item["ordem_producao"] = ops[item.pop("ordem_producao_codigo")]
+                pecas.append(self.model(**item))
+
+            pecas = self.bulk_create(pecas, batch_size=batch_size)
+
+            # Criações antes do recálculo: a mudança de status das OPs (publicada pelo
+            # signal de OrdemProducao) chega ao stream depois da criação que a causou
+            for codigo_op in novas_ops:
+                op = ops[codigo_op]
+                publicar_evento(
+                    "ordem_producao.status",
+                    ordem_producao=op.id,
+                    codigo=op.codigo,
+                    status_anterior=None,
+                    status=op.status,
+                )
+                registrar_acao(
+                    ACAO_CRIAR,
+                    "ordem_producao",
+                    op.id,
+                    {"campos": valores_para_log(op.valores_auditoria())},
+                )
+            for peca in pecas:
+                publicar_evento(
+                    "peca.status",
+                    peca=peca.id,
+                    codigo=peca.codigo,
+                    ordem_producao=peca.ordem_producao_id,
+                    status_anterior=None,
+                    status=peca.status,
+                )
+                registrar_acao(
+                    ACAO_CRIAR,
+                    "peca",
+                    peca.id,
+                    {"campos": valores_para_log(peca.valores_auditoria())},
+                )
+
+            ops_tocadas = {peca.ordem_producao_id: peca.ordem_producao for peca in pecas}
+            for op in ops_tocadas.values():
+                op.verificar_e_atualizar_status()
+
+            invalidar_indicadores(ops_tocadas.values())
+
+        return pecas, sorted(novas_ops.keys())
+
+
+class Peca(AuditavelMixin, models.Model):
     """
     Modelo que representa uma peça/produto a ser produzido.
     """
@@ -66,6 +225,8 @@ class Peca(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
 
+    objects = PecaManager()
+
     class Meta:
         verbose_name = "Peça"
         verbose_name_plural = "Peças"
@@ -76,11 +237,36 @@ class Peca(models.Model):
             models.Index(fields=["data_entrega"]),
             models.Index(fields=["cliente", "status"]),
             models.Index(fields=["ordem_producao"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self):
         return f'{self.codigo} - {self.descricao or "Sem descrição"}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda o estado carregado do banco para detectar mudanças de status."""
+        instance = super().from_db(db, field_names, values)
+        instance.registrar_estado_salvo()
+        return instance
+
+    def registrar_estado_salvo(self):
+        """Memoriza o status e a OP atuais como o último estado persistido."""
+        deferidos = self.get_deferred_fields()
+        if "status" not in deferidos and "ordem_producao_id" not in deferidos:
+            self._estado_salvo = (self.status, self.ordem_producao_id)
+
+    def status_alterado(self):
+        """
+        Indica se o status ou a OP mudaram desde a última leitura/gravação.
+        Sem estado conhecido (instância nova ou campos adiados), assume que sim.
+        """
+        estado_salvo = getattr(self, "_estado_salvo", None)
+        if estado_salvo is None:
+            return True
+        return estado_salvo != (self.status, self.ordem_producao_id)
+
     def clean(self):
         """Validação customizada."""
         from django.core.exceptions import ValidationError
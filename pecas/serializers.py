@@ -1,16 +1,17 @@
 from rest_framework import serializers
+from usinasoft.campos import CamposDinamicosSerializerMixin
 from .models import Cliente, Peca
 from producao.models import OrdemProducao
 
 
-class ClienteSerializer(serializers.ModelSerializer):
+class ClienteSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Cliente
         fields = ["id", "nome", "contato", "email", "endereco", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class PecaSerializer(serializers.ModelSerializer):
+class PecaSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     cliente_nome = serializers.ReadOnlyField(source="cliente.nome")
     ordem_producao_codigo = serializers.CharField(write_only=True)
     op_codigo = serializers.ReadOnlyField(source="ordem_producao.codigo")
@@ -37,6 +38,24 @@ class PecaSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "ordem_producao", "created_at", "updated_at"]
+        # ?expand=: relações devolvidas como objetos (a OP sem os totais de peças)
+        expansoes = {
+            "cliente": ("pecas.serializers.ClienteSerializer", None),
+            "ordem_producao": (
+                "producao.serializers.OrdemProducaoSerializer",
+                [
+                    "id",
+                    "codigo",
+                    "cliente",
+                    "criado_por",
+                    "responsavel",
+                    "status",
+                    "observacoes",
+                    "created_at",
+                    "updated_at",
+                ],
+            ),
+        }
 
     def create(self, validated_data):
         """
@@ -61,3 +80,100 @@ class PecaSerializer(serializers.ModelSerializer):
         validated_data["ordem_producao"] = ordem_producao
 
         return super().create(validated_data)
+
+
+class PecaImportacaoListSerializer(serializers.ListSerializer):
+    """
+    Valida e cria um lote de peças de uma vez.
+
+    As verificações que dependem do banco (cliente existente e código único)
+    são feitas para o lote inteiro com uma consulta cada, em vez de uma por item.
+    """
+
+    def validate(self, attrs):
+        erros = []
+
+        codigos = [item["codigo"] for item in attrs]
+        vistos = set()
+        for indice, codigo in enumerate(codigos):
+            if codigo in vistos:
+                erros.append(f"Item {indice}: código '{codigo}' repetido no lote.")
+            vistos.add(codigo)
+
+        existentes = set(Peca.objects.filter(codigo__in=vistos).values_list("codigo", flat=True))
+        for indice, codigo in enumerate(codigos):
+            if codigo in existentes:
+                erros.append(f"Item {indice}: já existe uma peça com o código '{codigo}'.")
+
+        clientes = Cliente.objects.in_bulk({item["cliente"] for item in attrs})
+        for indice, item in enumerate(attrs):
+            cliente = clientes.get(item["cliente"])
+            if cliente is None:
+                erros.append(f"Item {indice}: cliente '{item['cliente']}' não encontrado.")
+            else:
+                item["cliente"] = cliente
+
+        if erros:
+            raise serializers.ValidationError(erros)
+        return attrs
+
+    def create(self, validated_data):
+        pecas, self.ops_criadas = Peca.objects.importar_em_lote(validated_data)
+        return pecas
+
+
+class PecaImportacaoSerializer(serializers.ModelSerializer):
+    """
+    Item de importação em lote (POST /api/pecas/bulk/).
+    Deve ser usado com many=True; a validação de banco fica no list serializer.
+    """
+
+    ordem_producao_codigo = serializers.CharField(max_length=50)
+    cliente = serializers.UUIDField()
+    codigo = serializers.CharField(max_length=100)
+
+    class Meta:
+        model = Peca
+        list_serializer_class = PecaImportacaoListSerializer
+        fields = [
+            "ordem_producao_codigo",
+            "cliente",
+            "codigo",
+            "descricao",
+            "pedido",
+            "quantidade",
+            "data_entrega",
+            "status",
+            "metadata",
+        ]
+
+
+class PecaStatusLoteSerializer(serializers.Serializer):
+    """
+    Entrada do PATCH /api/pecas/bulk-status/.
+
+    As peças são selecionadas por ``ids`` ou por ``ordem_producao_codigo``
+    (opcionalmente restrito ao ``status_atual``).
+    """
+
+    status = serializers.ChoiceField(choices=Peca.StatusChoices.choices)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    ordem_producao_codigo = serializers.CharField(required=False)
+    status_atual = serializers.ChoiceField(choices=Peca.StatusChoices.choices, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("ids") and not attrs.get("ordem_producao_codigo"):
+            raise serializers.ValidationError("Informe 'ids' ou 'ordem_producao_codigo'.")
+        return attrs
+
+    def get_queryset(self):
+        """Monta o queryset de peças a partir dos filtros validados."""
+        filtros = self.validated_data
+        qs = Peca.objects.all()
+        if filtros.get("ids"):
+            qs = qs.filter(id__in=filtros["ids"])
+        if filtros.get("ordem_producao_codigo"):
+            qs = qs.filter(ordem_producao__codigo=filtros["ordem_producao_codigo"])
+        if filtros.get("status_atual"):
+            qs = qs.filter(status=filtros["status_atual"])
+        return qs
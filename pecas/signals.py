@@ -1,5 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from producao.indicadores import invalidar_indicadores
+from producao.models import OrdemProducao
+from usinasoft.eventos import publicar_evento
 from .models import Peca
 
 
@@ -10,9 +13,41 @@ def atualizar_status_op_ao_salvar_peca(sender, instance, created, **kwargs):
 
     Quando uma peça muda de status (especialmente para 'concluida' ou 'em_andamento'),
     verifica se todas as peças da OP estão concluídas e atualiza o status da OP.
+    Também invalida os indicadores em cache e a consolidação diária da OP.
+    Gravações que não alteram o status nem a OP da peça não disparam o recálculo.
+    Criações e mudanças de status são publicadas no stream de eventos.
     """
-    if instance.ordem_producao:
-        instance.ordem_producao.verificar_e_atualizar_status()
+    if not created and not instance.status_alterado():
+        return
+
+    estado_salvo = getattr(instance, "_estado_salvo", None)
+    status_anterior = estado_salvo[0] if estado_salvo and not created else None
+    op_anterior_id = estado_salvo[1] if estado_salvo else None
+
+    if created or status_anterior != instance.status:
+        publicar_evento(
+            "peca.status",
+            peca=instance.id,
+            codigo=instance.codigo,
+            ordem_producao=instance.ordem_producao_id,
+            status_anterior=status_anterior,
+            status=instance.status,
+        )
+
+    # OPs cujo status não mudou; as que foram salvas já se invalidam pelo próprio signal
+    ops_afetadas = []
+    if instance.ordem_producao_id:
+        if not instance.ordem_producao.verificar_e_atualizar_status():
+            ops_afetadas.append(instance.ordem_producao)
+
+    # Peça movida para outra OP: a OP de origem também precisa ser recalculada
+    if op_anterior_id and op_anterior_id != instance.ordem_producao_id:
+        op_anterior = OrdemProducao.objects.filter(pk=op_anterior_id).first()
+        if op_anterior and not op_anterior.verificar_e_atualizar_status():
+            ops_afetadas.append(op_anterior)
+
+    invalidar_indicadores(ops_afetadas)
+    instance.registrar_estado_salvo()
 
 
 @receiver(post_delete, sender=Peca)
@@ -20,7 +55,8 @@ def atualizar_status_op_ao_deletar_peca(sender, instance, **kwargs):
     """
     Signal que atualiza o status da OP quando uma peça é deletada.
 
-    Recalcula o status da OP após a remoção de uma peça.
+    Recalcula o status da OP após a remoção de uma peça e invalida os indicadores.
     """
-    if instance.ordem_producao:
-        instance.ordem_producao.verificar_e_atualizar_status()
+    if instance.ordem_producao_id:
+        if not instance.ordem_producao.verificar_e_atualizar_status():
+            invalidar_indicadores([instance.ordem_producao])
@@ -1,33 +1,205 @@
-from rest_framework import viewsets
+import json
+import uuid
+from datetime import date
+
+from django.db.models import Q
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from usinasoft.campos import CamposDinamicosMixin
+from usinasoft.condicional import GetCondicionalMixin
+from usinasoft.exportacao import ExportacaoMixin
+from usinasoft.lista_rapida import ListaRapidaMixin
+from usinasoft.pagination import CursorOpcionalPagination
 from .models import Cliente, Peca
-from .serializers import ClienteSerializer, PecaSerializer
+from .serializers import (
+    ClienteSerializer,
+    PecaImportacaoSerializer,
+    PecaSerializer,
+    PecaStatusLoteSerializer,
+)
 
 
-class ClienteViewSet(viewsets.ModelViewSet):
+class ClienteViewSet(CamposDinamicosMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     queryset = Cliente.objects.all().order_by("nome")
     serializer_class = ClienteSerializer
 
 
-class PecaViewSet(viewsets.ModelViewSet):
+class PecaViewSet(
+    CamposDinamicosMixin,
+    GetCondicionalMixin,
+    ListaRapidaMixin,
+    ExportacaoMixin,
+    viewsets.ModelViewSet,
+):
     queryset = (
         Peca.objects.select_related("cliente", "ordem_producao").all().order_by("-created_at")
     )
     serializer_class = PecaSerializer
+    pagination_class = CursorOpcionalPagination
+    campos_validacao = ["updated_at", "ordem_producao__updated_at", "cliente__updated_at"]
+    nome_exportacao = "pecas"
+    colunas_exportacao = [
+        ("id", "id"),
+        ("ordem_producao", "ordem_producao_id"),
+        ("op_codigo", "ordem_producao__codigo"),
+        ("op_status", "ordem_producao__status"),
+        ("cliente", "cliente_id"),
+        ("cliente_nome", "cliente__nome"),
+        ("codigo", "codigo"),
+        ("descricao", "descricao"),
+        ("pedido", "pedido"),
+        ("quantidade", "quantidade"),
+        ("data_entrega", "data_entrega"),
+        ("status", "status"),
+        ("metadata", "metadata"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
+    # A listagem expõe exatamente as mesmas colunas da exportação
+    colunas_lista_rapida = colunas_exportacao
+
+    # Colunas indexadas aceitas em ?ordering= (prefixo "-" para decrescente)
+    campos_ordenacao = ["created_at", "updated_at", "data_entrega", "codigo", "status"]
 
     def get_queryset(self):
         """
         Permite filtrar peças por parâmetros de query:
         - ordem_producao: UUID da OP (ex.: /api/pecas/?ordem_producao=<op.id>)
         - ordem_producao_codigo: código/nota fiscal da OP (ex.: /api/pecas/?ordem_producao_codigo=NF-2024-001)
+        - status: um ou mais status, repetidos ou separados por vírgula (ex.: ?status=em_fila,pausada)
+        - cliente: UUID do cliente (com status, usa o índice cliente, status)
+        - data_entrega_inicio / data_entrega_fim: período de entrega, YYYY-MM-DD (inclusive)
+        - atrasadas=true: entrega anterior a hoje e status diferente de concluída/cancelada
+        - metadata.<chave>: valor de uma chave dos metadados (ex.: ?metadata.material=aço);
+          sem valor (?metadata.material=) filtra as peças que têm a chave
+
+        E ordenar com ?ordering= por uma das colunas indexadas em campos_ordenacao.
+        ?fields= e ?expand= escolhem os campos e relações devolvidos (CamposDinamicosMixin).
         """
         qs = super().get_queryset()
+        params = self.request.query_params
 
-        op_id = self.request.query_params.get("ordem_producao")
-        op_codigo = self.request.query_params.get("ordem_producao_codigo")
+        op_codigo = params.get("ordem_producao_codigo")
 
-        if op_id:
-            qs = qs.filter(ordem_producao_id=op_id)
+        if params.get("ordem_producao"):
+            try:
+                qs = qs.filter(ordem_producao_id=uuid.UUID(params["ordem_producao"]))
+            except ValueError:
+                raise ValidationError({"ordem_producao": "UUID inválido."})
         if op_codigo:
             qs = qs.filter(ordem_producao__codigo=op_codigo)
 
+        status_lista = [
+            valor.strip()
+            for parametro in params.getlist("status")
+            for valor in parametro.split(",")
+            if valor.strip()
+        ]
+        if status_lista:
+            invalidos = sorted(set(status_lista) - set(Peca.StatusChoices.values))
+            if invalidos:
+                raise ValidationError({"status": f"Status inválido(s): {', '.join(invalidos)}."})
+            qs = qs.filter(status__in=status_lista)
+
+        if params.get("cliente"):
+            try:
+                qs = qs.filter(cliente_id=uuid.UUID(params["cliente"]))
+            except ValueError:
+                raise ValidationError({"cliente": "UUID inválido."})
+
+        for parametro, lookup in (
+            ("data_entrega_inicio", "data_entrega__gte"),
+            ("data_entrega_fim", "data_entrega__lte"),
+        ):
+            if params.get(parametro):
+                try:
+                    qs = qs.filter(**{lookup: date.fromisoformat(params[parametro])})
+                except ValueError:
+                    raise ValidationError({parametro: "Use o formato YYYY-MM-DD."})
+
+        if params.get("atrasadas", "").lower() in ("true", "1"):
+            qs = qs.filter(data_entrega__lt=timezone.localdate()).exclude(
+                status__in=[Peca.StatusChoices.CONCLUIDA, Peca.StatusChoices.CANCELADA]
+            )
+
+        for parametro, valor in params.items():
+            if parametro.startswith("metadata."):
+                qs = self._filtrar_metadata(qs, parametro.removeprefix("metadata."), valor)
+
+        ordenacao = params.get("ordering")
+        if ordenacao:
+            campo = ordenacao.removeprefix("-")
+            if campo not in self.campos_ordenacao:
+                raise ValidationError(
+                    {"ordering": f"Use um destes campos: {', '.join(self.campos_ordenacao)}."}
+                )
+            # id desempata registros com o mesmo valor, mantendo a paginação estável
+            direcao = "-" if ordenacao.startswith("-") else ""
+            qs = qs.order_by(ordenacao, f"{direcao}id")
+
         return qs
+
+    def _filtrar_metadata(self, qs, chave, valor):
+        if not chave:
+            raise ValidationError({"metadata.": "Informe a chave dos metadados."})
+        if valor == "":
+            return qs.filter(metadata__has_key=chave)
+
+        # Via alias, a chave nunca é interpretada como lookup (ex.: ?metadata.contains=)
+        alias = f"metadata_{len(qs.query.annotations)}"
+        filtro = Q(**{alias: valor})
+        try:
+            # Números e booleanos também casam com o valor JSON correspondente
+            convertido = json.loads(valor)
+        except ValueError:
+            convertido = None
+        if isinstance(convertido, (bool, int, float)):
+            filtro |= Q(**{alias: convertido})
+        return qs.alias(**{alias: KeyTransform(chave, "metadata")}).filter(filtro)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def importar_lote(self, request):
+        """
+        Importa uma lista de peças de uma só vez (ex.: todos os itens de uma NF).
+
+        Recebe a mesma estrutura do POST /api/pecas/ em uma lista. O lote é
+        validado por inteiro e criado em uma transação; nada é gravado se
+        algum item for inválido.
+        """
+        serializer = PecaImportacaoSerializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        pecas = serializer.save()
+
+        return Response(
+            {
+                "total": len(pecas),
+                "ids": [peca.id for peca in pecas],
+                "ordens_producao_criadas": serializer.ops_criadas,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=False, methods=["patch"], url_path="bulk-status")
+    def atualizar_status_lote(self, request):
+        """
+        Muda o status de várias peças com um único UPDATE (ex.: fechamento de turno).
+
+        O status de cada OP afetada é recalculado uma única vez.
+        """
+        serializer = PecaStatusLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        atualizadas, op_ids = serializer.get_queryset().atualizar_status(
+            serializer.validated_data["status"]
+        )
+
+        return Response(
+            {
+                "atualizadas": atualizadas,
+                "ordens_producao": sorted(str(op_id) for op_id in op_ids),
+            }
+        )
@@ -25,6 +25,7 @@ class OrdemProducaoAdmin(admin.ModelAdmin):
         "percentual_conclusao",
     )
     ordering = ("-created_at",)
+    list_select_related = ("cliente", "criado_por")
 
     fieldsets = (
         ("Informações Básicas", {"fields": ("codigo", "cliente", "criado_por", "status")}),
@@ -38,3 +39,7 @@ class OrdemProducaoAdmin(admin.ModelAdmin):
         ),
         ("Registro", {"fields": ("created_at", "updated_at"), "classes": ("collapse",)}),
     )
+
+    def get_queryset(self, request):
+        """Anota as estatísticas de peças para não gerar um COUNT por linha."""
+        return super().get_queryset(request).com_estatisticas()
@@ -5,3 +5,7 @@ class ProducaoConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "producao"
     verbose_name = "Produção"
+
+    def ready(self):
+        """Importa os signals quando o app é carregado."""
+        import producao.signals
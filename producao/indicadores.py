@@ -0,0 +1,246 @@
+"""
+Cache e consolidação diária dos indicadores de produção.
+
+Os resultados de indicadores_summary ficam no cache do Django sob uma chave
+que inclui uma "versão" global. Qualquer gravação em OrdemProducao ou Peca
+troca a versão (ver os signals de producao e pecas), o que invalida de uma vez
+todos os períodos já calculados sem precisar conhecer suas chaves.
+
+Com o LocMemCache (padrão) cada worker tem seu próprio cache e só enxerga as
+invalidações feitas no próprio processo; em produção com vários workers use um
+backend compartilhado (Redis/Memcached) via CACHE_BACKEND/CACHE_LOCATION.
+
+Além do cache, os totais por dia de criação da OP, cliente e status ficam
+pré-agregados em ProducaoDiaria. Nenhum recálculo acontece no caminho da
+gravação: a invalidação só registra os dias afetados em
+ProducaoDiariaPendente (uma consulta), e apenas quando a consolidação está em
+uso. Os dias pendentes são recalculados pelo rebuild_rollups e, antes de somar
+a consolidação, pela leitura dos indicadores do período.
+"""
+
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, DurationField, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from pecas.models import Peca
+from .models import ExecucaoRollup, OrdemProducao, ProducaoDiaria, ProducaoDiariaPendente
+
+CHAVE_VERSAO = "indicadores:versao"
+CHAVE_ROLLUP = "indicadores:rollup_disponivel"
+
+# Por quanto tempo cada processo reaproveita a resposta de rollup_disponivel()
+ROLLUP_DISPONIVEL_TIMEOUT = 60
+
+
+def get_cache():
+    return caches[settings.INDICADORES_CACHE_ALIAS]
+
+
+def versao_atual():
+    """Retorna a versão corrente dos indicadores, criando uma se não existir."""
+    return get_cache().get_or_set(CHAVE_VERSAO, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def chave_indicadores(nome, start_date, end_date, *parametros):
+    """Chave de cache de um indicador para o período e parâmetros informados."""
+    partes = [start_date.isoformat(), end_date.isoformat(), *parametros]
+    return f"indicadores:{nome}:{versao_atual()}:" + ":".join(partes)
+
+
+def dia_da_op(op):
+    """Dia (no fuso padrão) em que a OP foi criada, usado como chave da consolidação."""
+    return timezone.localtime(op.created_at, timezone.get_default_timezone()).date()
+
+
+def invalidar_indicadores(ops=()):
+    """
+    Invalida todos os indicadores em cache e marca para recálculo os dias da
+    consolidação diária das OPs informadas.
+
+    Tudo acontece após o commit da transação corrente, para que uma leitura
+    concorrente não grave no cache dados ainda não confirmados; numa transação
+    desfeita nada é aplicado.
+    """
+    dias = set()
+    for op in ops:
+        if op.created_at is None:
+            continue
+        dias.add((op.cliente_id, dia_da_op(op)))
+        cliente_anterior = getattr(op, "_cliente_id_salvo", None)
+        if cliente_anterior and cliente_anterior != op.cliente_id:
+            dias.add((cliente_anterior, dia_da_op(op)))
+
+    transaction.on_commit(lambda: _aplicar_invalidacao(dias))
+
+
+def _aplicar_invalidacao(dias):
+    # Os dias são registrados antes da troca de versão: quem recalcular com a versão
+    # nova já encontra as pendências
+    if dias and rollup_disponivel():
+        ProducaoDiariaPendente.objects.bulk_create(
+            [ProducaoDiariaPendente(cliente_id=cliente_id, data=dia) for cliente_id, dia in dias],
+            ignore_conflicts=True,
+        )
+
+    get_cache().set(CHAVE_VERSAO, uuid.uuid4().hex, timeout=None)
+
+
+def processar_pendentes(inicio=None, fim=None):
+    """
+    Recalcula os dias pendentes de ProducaoDiaria entre inicio e fim (inclusive,
+    ambos opcionais). Retorna o número de dias (por cliente) recalculados.
+
+    As pendências são removidas antes do recálculo: uma gravação confirmada
+    durante o recálculo registra o dia de novo.
+    """
+    pendentes = ProducaoDiariaPendente.objects.all()
+    if inicio:
+        pendentes = pendentes.filter(data__gte=inicio)
+    if fim:
+        pendentes = pendentes.filter(data__lte=fim)
+
+    linhas = list(pendentes.values_list("id", "cliente_id", "data"))
+    if not linhas:
+        return 0
+    ProducaoDiariaPendente.objects.filter(pk__in=[pk for pk, _, _ in linhas]).delete()
+
+    for _, cliente_id, dia in sorted(linhas, key=lambda linha: (linha[2], str(linha[1]))):
+        reconstruir_producao_diaria(dia, dia, cliente_id=cliente_id)
+    return len(linhas)
+
+
+def _limites(inicio, fim):
+    """Converte o intervalo de datas [inicio, fim] em datetimes [início, fim + 1 dia)."""
+    tz = timezone.get_default_timezone()
+    limites = {}
+    if inicio:
+        limites["gte"] = timezone.make_aware(datetime.combine(inicio, time.min), tz)
+    if fim:
+        limites["lt"] = timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min), tz)
+    return limites
+
+
+def reconstruir_producao_diaria(inicio=None, fim=None, cliente_id=None):
+    """
+    Recalcula as linhas de ProducaoDiaria entre as datas inicio e fim
+    (inclusive, ambas opcionais), opcionalmente só de um cliente.
+
+    Usa duas consultas agrupadas (uma sobre OPs e outra sobre peças) e substitui
+    as linhas do intervalo dentro de uma transação. Retorna o número de linhas.
+    """
+    tz = timezone.get_default_timezone()
+    filtro_ops = Q()
+    filtro_pecas = Q()
+    filtro_linhas = Q()
+
+    for lookup, valor in _limites(inicio, fim).items():
+        filtro_ops &= Q(**{f"created_at__{lookup}": valor})
+        filtro_pecas &= Q(**{f"ordem_producao__created_at__{lookup}": valor})
+    if inicio:
+        filtro_linhas &= Q(data__gte=inicio)
+    if fim:
+        filtro_linhas &= Q(data__lte=fim)
+    if cliente_id:
+        filtro_ops &= Q(cliente_id=cliente_id)
+        filtro_pecas &= Q(ordem_producao__cliente_id=cliente_id)
+        filtro_linhas &= Q(cliente_id=cliente_id)
+
+    agregados_ops = (
+        OrdemProducao.objects.filter(filtro_ops)
+        .annotate(dia=TruncDate("created_at", tzinfo=tz))
+        .values("dia", "cliente_id", "status")
+        .annotate(
+            total=Count("id"),
+            duracao=Sum(F("updated_at") - F("created_at"), output_field=DurationField()),
+        )
+        .order_by()
+    )
+    agregados_pecas = (
+        Peca.objects.filter(filtro_pecas)
+        .annotate(dia=TruncDate("ordem_producao__created_at", tzinfo=tz))
+        .values("dia", "ordem_producao__cliente_id", "ordem_producao__status", "status")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+    linhas = {}
+    for item in agregados_ops:
+        chave = (item["dia"], item["cliente_id"], item["status"])
+        linhas[chave] = ProducaoDiaria(
+            data=item["dia"],
+            cliente_id=item["cliente_id"],
+            status=item["status"],
+            total_ops=item["total"],
+            duracao_producao=item["duracao"] or timedelta(),
+        )
+
+    for item in agregados_pecas:
+        chave = (item["dia"], item["ordem_producao__cliente_id"], item["ordem_producao__status"])
+        linha = linhas.get(chave)
+        campo = ProducaoDiaria.CAMPOS_PECAS_POR_STATUS.get(item["status"])
+        if linha is None or campo is None:
+            continue
+        setattr(linha, campo, getattr(linha, campo) + item["total"])
+        linha.pecas_total += item["total"]
+
+    with transaction.atomic():
+        ProducaoDiaria.objects.filter(filtro_linhas).delete()
+        ProducaoDiaria.objects.bulk_create(linhas.values(), batch_size=500)
+
+    return len(linhas)
+
+
+def rollup_disponivel():
+    """
+    A consolidação só é usada depois de uma reconstrução completa bem-sucedida.
+
+    A resposta fica em cache por ROLLUP_DISPONIVEL_TIMEOUT segundos (atualizada
+    pelo rebuild_rollups); antes disso as gravações não registram dias
+    pendentes, e os indicadores são calculados direto sobre as tabelas.
+    """
+    cache = get_cache()
+    disponivel = cache.get(CHAVE_ROLLUP)
+    if disponivel is None:
+        disponivel = ExecucaoRollup.objects.filter(
+            modo=ExecucaoRollup.ModoChoices.COMPLETO, concluido_em__isnull=False
+        ).exists()
+        cache.set(CHAVE_ROLLUP, disponivel, timeout=ROLLUP_DISPONIVEL_TIMEOUT)
+    return disponivel
+
+
+def totais_producao_diaria(start_date, end_date):
+    """
+    Soma as linhas de ProducaoDiaria do período.
+
+    Retorna (OPs por status, tempo médio de produção em dias, total de peças,
+    peças por status) no mesmo formato do cálculo direto sobre as tabelas.
+    """
+    linhas = ProducaoDiaria.objects.filter(data__gte=start_date, data__lte=end_date)
+
+    campos_pecas = ProducaoDiaria.CAMPOS_PECAS_POR_STATUS
+    por_status = linhas.values("status").annotate(
+        total=Sum("total_ops"), duracao=Sum("duracao_producao")
+    )
+    pecas = linhas.aggregate(
+        pecas_total=Sum("pecas_total"), **{campo: Sum(campo) for campo in campos_pecas.values()}
+    )
+
+    ops_por_status = {}
+    tempo_medio_dias = 0
+    for item in por_status.order_by("status"):
+        ops_por_status[item["status"]] = item["total"]
+        if item["status"] == OrdemProducao.StatusChoices.CONCLUIDA and item["total"]:
+            media = item["duracao"] / item["total"]
+            tempo_medio_dias = media.total_seconds() / (60 * 60 * 24)
+
+    pecas_por_status = {
+        status: pecas[campo] for status, campo in campos_pecas.items() if pecas[campo]
+    }
+
+    return ops_por_status, tempo_medio_dias, pecas["pecas_total"] or 0, pecas_por_status
@@ -0,0 +1,177 @@
+import json
+import platform
+import subprocess
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from pecas.models import Peca
+from producao.management.commands.seed_benchmark import EMAIL_BENCHMARK, PREFIXO
+from producao.models import OrdemProducao
+from usinasoft.benchmark import (
+    ClienteDjango,
+    ClienteHttp,
+    ClientesLentos,
+    cenarios,
+    comparar,
+    executar_cenario,
+)
+from usuarios.models import Usuario
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p95/p99), vazão e consultas SQL por requisição das rotas "
+        "/api/pecas/, /api/ops/, /api/indicadores/summary/ e da atualização de status de "
+        "peças, em processo (django.test.Client) ou contra um servidor em execução "
+        "(--url). Use antes o seed_benchmark. A atualização de status altera as peças "
+        "de benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="URL base de um servidor em execução (ex.: http://127.0.0.1:8000); "
+            "sem ela as requisições são feitas em processo",
+        )
+        parser.add_argument(
+            "--requisicoes", type=int, default=200, help="Requisições por cenário (padrão: 200)"
+        )
+        parser.add_argument(
+            "--concorrencia",
+            type=int,
+            default=1,
+            help="Requisições simultâneas; só com --url (padrão: 1)",
+        )
+        parser.add_argument(
+            "--clientes-lentos",
+            type=int,
+            default=0,
+            help="Conexões extras que enviam a requisição um byte por segundo durante a "
+            "medição, simulando clientes com rede ruim; só com --url (padrão: 0)",
+        )
+        parser.add_argument(
+            "--aquecimento",
+            type=int,
+            default=10,
+            help="Requisições descartadas antes de medir cada cenário (padrão: 10)",
+        )
+        parser.add_argument(
+            "--cenario",
+            action="append",
+            choices=list(cenarios({})),
+            help="Cenário a executar (pode repetir; padrão: todos)",
+        )
+        parser.add_argument(
+            "--semente",
+            type=int,
+            default=42,
+            help="Semente do período sorteado dos indicadores (padrão: 42)",
+        )
+        parser.add_argument("--email", default=EMAIL_BENCHMARK, help="Usuário das requisições")
+        parser.add_argument("--saida", help="Grava o resultado em JSON neste arquivo")
+        parser.add_argument(
+            "--comparar", help="JSON de uma execução anterior para mostrar a variação"
+        )
+
+    def handle(self, *args, **options):
+        if options["requisicoes"] < 1 or options["concorrencia"] < 1:
+            raise CommandError("--requisicoes e --concorrencia devem ser maiores que zero.")
+        if options["concorrencia"] > 1 and not options["url"]:
+            raise CommandError("--concorrencia exige --url (o modo em processo é sequencial).")
+        if options["clientes_lentos"] and not options["url"]:
+            raise CommandError("--clientes-lentos exige --url.")
+
+        usuario = Usuario.objects.filter(email=options["email"]).first()
+        if usuario is None:
+            raise CommandError(
+                f"Usuário {options['email']} não encontrado. Rode antes o seed_benchmark."
+            )
+        status_pecas = {
+            str(pk): status
+            for pk, status in Peca.objects.filter(codigo__startswith=f"{PREFIXO}-")
+            .order_by("codigo")
+            .values_list("id", "status")[:500]
+        }
+        if not status_pecas:
+            raise CommandError("Nenhuma peça de benchmark encontrada. Rode antes o seed_benchmark.")
+
+        token = str(AccessToken.for_user(usuario))
+        if options["url"]:
+            cliente = ClienteHttp(token, options["url"])
+        else:
+            cliente = ClienteDjango(token)
+
+        selecionados = cenarios(status_pecas, options["semente"])
+        if options["cenario"]:
+            selecionados = {nome: selecionados[nome] for nome in options["cenario"]}
+
+        resultado = {
+            "meta": self._meta(options),
+            "cenarios": {},
+        }
+        with ExitStack() as pilha:
+            if options["clientes_lentos"]:
+                pilha.enter_context(ClientesLentos(options["url"], options["clientes_lentos"]))
+            for nome, cenario in selecionados.items():
+                self.stdout.write(f"{nome}...", ending=" ")
+                self.stdout.flush()
+                estatisticas = executar_cenario(
+                    cliente,
+                    cenario,
+                    options["requisicoes"],
+                    concorrencia=options["concorrencia"],
+                    aquecimento=options["aquecimento"],
+                )
+                resultado["cenarios"][nome] = estatisticas
+                self.stdout.write(
+                    f"p50 {estatisticas['p50_ms']} ms | p95 {estatisticas['p95_ms']} ms | "
+                    f"p99 {estatisticas['p99_ms']} ms | {estatisticas['vazao_rps']} req/s | "
+                    f"{estatisticas['consultas_media']} consultas | "
+                    f"{estatisticas['erros']} erro(s)"
+                )
+
+        if options["comparar"]:
+            base = json.loads(Path(options["comparar"]).read_text())
+            resultado["comparacao"] = comparar(resultado, base)
+            for nome, variacoes in resultado["comparacao"].items():
+                texto = ", ".join(
+                    f"{metrica} {valor:+.1f}%" for metrica, valor in variacoes.items()
+                )
+                self.stdout.write(f"{nome} vs. base: {texto}")
+
+        if options["saida"]:
+            Path(options["saida"]).write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}"))
+
+    def _meta(self, options):
+        try:
+            revisao = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            revisao = None
+
+        return {
+            "data": timezone.now().isoformat(),
+            "revisao": revisao,
+            "modo": "http" if options["url"] else "processo",
+            "url": options["url"],
+            "requisicoes": options["requisicoes"],
+            "concorrencia": options["concorrencia"],
+            "semente": options["semente"],
+            "clientes_lentos": options["clientes_lentos"],
+            "banco": connection.vendor,
+            "python": platform.python_version(),
+            "ops": OrdemProducao.objects.count(),
+            "pecas": Peca.objects.count(),
+        }
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Min, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from producao.indicadores import (
+    CHAVE_ROLLUP,
+    ROLLUP_DISPONIVEL_TIMEOUT,
+    get_cache,
+    invalidar_indicadores,
+    reconstruir_producao_diaria,
+)
+from producao.models import ExecucaoRollup, OrdemProducao, ProducaoDiaria, ProducaoDiariaPendente
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói a consolidação diária de produção (ProducaoDiaria). Por padrão "
+        "recalcula apenas os dias pendentes (registrados pelas gravações) e os dias com "
+        "OPs ou peças alteradas desde a última execução; use --full para reconstruir "
+        "todo o histórico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Reconstrói todo o histórico, mês a mês",
+        )
+
+    def handle(self, *args, **options):
+        ultima = (
+            ExecucaoRollup.objects.filter(concluido_em__isnull=False)
+            .order_by("-iniciado_em")
+            .first()
+        )
+        completo = options["full"] or ultima is None
+
+        execucao = ExecucaoRollup.objects.create(
+            modo=(
+                ExecucaoRollup.ModoChoices.COMPLETO
+                if completo
+                else ExecucaoRollup.ModoChoices.INCREMENTAL
+            ),
+            iniciado_em=timezone.now(),
+        )
+
+        if completo:
+            dias = self._reconstruir_tudo()
+        else:
+            dias = self._reconstruir_desde(ultima.iniciado_em)
+
+        execucao.concluido_em = timezone.now()
+        execucao.dias_recalculados = dias
+        execucao.save(update_fields=["concluido_em", "dias_recalculados"])
+
+        if completo:
+            get_cache().set(CHAVE_ROLLUP, True, timeout=ROLLUP_DISPONIVEL_TIMEOUT)
+        # Descarta indicadores em cache calculados antes da reconstrução
+        invalidar_indicadores()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Consolidação {execucao.get_modo_display().lower()}: {dias} dia(s)."
+            )
+        )
+
+    def _reconstruir_tudo(self):
+        tz = timezone.get_default_timezone()
+        primeira = OrdemProducao.objects.aggregate(primeira=Min("created_at"))["primeira"]
+        hoje = timezone.localdate(timezone=tz)
+
+        # Tudo será recalculado; gravações confirmadas daqui em diante registram de novo
+        ProducaoDiariaPendente.objects.all().delete()
+
+        if primeira is None:
+            ProducaoDiaria.objects.all().delete()
+            return 0
+
+        inicio = timezone.localtime(primeira, tz).date().replace(day=1)
+
+        # Linhas fora do intervalo com OPs não correspondem a nada
+        ProducaoDiaria.objects.filter(Q(data__lt=inicio) | Q(data__gt=hoje)).delete()
+
+        dias = 0
+        while inicio <= hoje:
+            proximo = (inicio + timedelta(days=32)).replace(day=1)
+            fim = min(proximo - timedelta(days=1), hoje)
+            reconstruir_producao_diaria(inicio, fim)
+            dias += (fim - inicio).days + 1
+            self.stdout.write(f"  {inicio:%Y-%m} reconstruído")
+            inicio = proximo
+        return dias
+
+    def _reconstruir_desde(self, desde):
+        """
+        Recalcula os dias (por cliente) pendentes e os de OPs ou peças alteradas
+        desde a última execução (gravações feitas antes de a consolidação entrar em
+        uso não registram pendências).
+        """
+        tz = timezone.get_default_timezone()
+        pendentes = list(ProducaoDiariaPendente.objects.values_list("id", "cliente_id", "data"))
+        ProducaoDiariaPendente.objects.filter(pk__in=[pk for pk, _, _ in pendentes]).delete()
+
+        chaves = {(cliente_id, dia) for _, cliente_id, dia in pendentes}
+        chaves.update(
+            OrdemProducao.objects.filter(Q(updated_at__gte=desde) | Q(pecas__updated_at__gte=desde))
+            .annotate(dia=TruncDate("created_at", tzinfo=tz))
+            .values_list("cliente_id", "dia")
+            .distinct()
+        )
+        for cliente_id, dia in sorted(chaves, key=lambda chave: (chave[1], str(chave[0]))):
+            reconstruir_producao_diaria(dia, dia, cliente_id=cliente_id)
+        return len(chaves)
@@ -0,0 +1,245 @@
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from pecas.models import Cliente, Peca
+from producao.indicadores import invalidar_indicadores
+from producao.models import OrdemProducao, ProducaoDiaria, ProducaoDiariaPendente
+from sincronizacao.models import RegistroExclusao
+from usuarios.models import Usuario
+
+PREFIXO = "BENCH"
+EMAIL_BENCHMARK = "benchmark@usinasoft.local"
+
+# Distribuição de status (peso relativo) das OPs e das peças geradas
+STATUS_OP = [("aberta", 2), ("em_andamento", 3), ("concluida", 4), ("cancelada", 1)]
+STATUS_PECA = [("em_fila", 3), ("em_andamento", 2), ("pausada", 1), ("concluida", 4)]
+MATERIAIS = ["aço 1045", "aço inox 304", "alumínio 6061", "latão", "bronze", "nylon"]
+PROCESSOS = ["torneamento", "fresamento", "retífica", "furação", "eletroerosão"]
+
+
+@contextmanager
+def datas_explicitas(*modelos):
+    """Desliga auto_now/auto_now_add para gravar created_at/updated_at gerados."""
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos
+        for campo in modelo._meta.concrete_fields
+        if getattr(campo, "auto_now", False) or getattr(campo, "auto_now_add", False)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma massa de dados reprodutível para benchmarks: clientes, OPs e peças "
+        f"(códigos com prefixo {PREFIXO}-) inseridos em lote, com datas distribuídas "
+        "no período que termina na --referencia. A mesma --semente com a mesma "
+        "--referencia gera sempre os mesmos dados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ops", type=int, required=True, help="Número de OPs")
+        parser.add_argument(
+            "--pecas-per-op", type=int, default=20, help="Peças por OP (padrão: 20)"
+        )
+        parser.add_argument("--clientes", type=int, default=50, help="Clientes (padrão: 50)")
+        parser.add_argument(
+            "--dias", type=int, default=365, help="Período das datas de criação (padrão: 365)"
+        )
+        parser.add_argument("--semente", type=int, default=42, help="Semente (padrão: 42)")
+        parser.add_argument(
+            "--referencia",
+            type=date.fromisoformat,
+            default=None,
+            help="Último dia do período das datas, AAAA-MM-DD (padrão: hoje)",
+        )
+        parser.add_argument(
+            "--lote", type=int, default=5000, help="Peças por lote de inserção (padrão: 5000)"
+        )
+        parser.add_argument(
+            "--limpar",
+            action="store_true",
+            help=f"Remove antes os dados gerados anteriormente (prefixo {PREFIXO}-), "
+            "registrando as exclusões para a sincronização, sem log de auditoria",
+        )
+        parser.add_argument(
+            "--sem-rollup",
+            action="store_true",
+            help="Não reconstrói a consolidação diária (rebuild_rollups --full) no final",
+        )
+
+    def handle(self, *args, **options):
+        for opcao in ("ops", "pecas_per_op", "clientes", "dias", "lote"):
+            if options[opcao] < 1:
+                raise CommandError(f"--{opcao.replace('_', '-')} deve ser maior que zero.")
+
+        if options["limpar"]:
+            self._limpar()
+        elif OrdemProducao.objects.filter(codigo__startswith=f"{PREFIXO}-").exists():
+            raise CommandError(
+                "Já existem dados de benchmark no banco. Use --limpar para gerá-los de novo."
+            )
+
+        rng = random.Random(options["semente"])
+        # Datas relativas ao fim do dia de referência, não ao instante da execução
+        referencia = options["referencia"] or timezone.localdate()
+        agora = timezone.make_aware(datetime.combine(referencia, time.max))
+        usuarios = self._usuarios()
+
+        clientes = [
+            Cliente(
+                id=self._uuid(rng),
+                nome=f"{PREFIXO} Cliente {i:04}",
+                contato=f"Compras {i}",
+                email=f"compras{i}@cliente{i}.com.br",
+                created_at=agora - timedelta(days=options["dias"]),
+                updated_at=agora - timedelta(days=options["dias"]),
+            )
+            for i in range(options["clientes"])
+        ]
+
+        total_ops = options["ops"]
+        pecas_por_op = options["pecas_per_op"]
+        ops_por_lote = max(1, options["lote"] // pecas_por_op)
+        segundos_periodo = options["dias"] * 24 * 60 * 60
+
+        with datas_explicitas(Cliente, OrdemProducao, Peca):
+            Cliente.objects.bulk_create(clientes)
+
+            for inicio in range(0, total_ops, ops_por_lote):
+                ops, pecas = [], []
+                for indice in range(inicio, min(inicio + ops_por_lote, total_ops)):
+                    op = self._op(rng, indice, clientes, usuarios, agora, segundos_periodo)
+                    ops.append(op)
+                    pecas.extend(self._pecas(rng, op, pecas_por_op))
+
+                with transaction.atomic():
+                    OrdemProducao.objects.bulk_create(ops)
+                    Peca.objects.bulk_create(pecas, batch_size=options["lote"])
+
+                self.stdout.write(f"{inicio + len(ops)}/{total_ops} OPs", ending="\r")
+                self.stdout.flush()
+
+        self.stdout.write("")
+        if not options["sem_rollup"]:
+            call_command("rebuild_rollups", full=True, stdout=self.stdout)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(clientes)} cliente(s), {total_ops} OP(s) e "
+                f"{total_ops * pecas_por_op} peça(s) gerados. Usuário: {EMAIL_BENCHMARK}"
+            )
+        )
+
+    def _uuid(self, rng):
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def _usuarios(self):
+        usuario, criado = Usuario.objects.get_or_create(
+            email=EMAIL_BENCHMARK,
+            defaults={"first_name": "Benchmark", "last_name": "UsinaSoft"},
+        )
+        if criado:
+            usuario.set_unusable_password()
+            usuario.save(update_fields=["password"])
+        return [usuario, None]
+
+    def _op(self, rng, indice, clientes, usuarios, agora, segundos_periodo):
+        criado_em = agora - timedelta(seconds=rng.randrange(segundos_periodo))
+        status = rng.choices(*zip(*STATUS_OP))[0]
+        duracao = timedelta(hours=rng.randrange(2, 24 * 20))
+        return OrdemProducao(
+            id=self._uuid(rng),
+            codigo=f"{PREFIXO}-NF-{indice:08}",
+            cliente=rng.choice(clientes),
+            criado_por=usuarios[0],
+            responsavel=rng.choice(usuarios),
+            status=status,
+            observacoes=rng.choice([None, f"Prioridade {rng.randrange(1, 4)}"]),
+            created_at=criado_em,
+            updated_at=min(criado_em + duracao, agora) if status != "aberta" else criado_em,
+        )
+
+    def _pecas(self, rng, op, quantidade):
+        for indice in range(quantidade):
+            if op.status == "concluida":
+                status = "concluida"
+            elif op.status == "aberta":
+                status = "em_fila"
+            elif op.status == "cancelada":
+                status = "cancelada"
+            else:
+                status = rng.choices(*zip(*STATUS_PECA))[0]
+            yield Peca(
+                id=self._uuid(rng),
+                ordem_producao=op,
+                cliente=op.cliente,
+                codigo=f"{op.codigo}-{indice:04}",
+                descricao=f"{rng.choice(PROCESSOS).capitalize()} {rng.randrange(10, 500)} mm",
+                pedido=f"PED-{rng.randrange(100000):06}",
+                quantidade=rng.randrange(1, 200),
+                data_entrega=(op.created_at + timedelta(days=rng.randrange(5, 60))).date(),
+                status=status,
+                metadata={
+                    "material": rng.choice(MATERIAIS),
+                    "processo": rng.choice(PROCESSOS),
+                    "espessura": rng.randrange(1, 100) / 2,
+                },
+                created_at=op.created_at,
+                updated_at=op.updated_at,
+            )
+
+    def _limpar(self):
+        # DELETE direto: sem carregar milhões de objetos nem disparar os signals por linha.
+        # Os tombstones da sincronização são gravados em lote; a auditoria não registra
+        # a remoção dos dados sintéticos; a consolidação dos clientes de benchmark é
+        # removida antes deles e o cache dos indicadores é invalidado.
+        gerados = (
+            (Peca, RegistroExclusao.TipoChoices.PECA, "codigo", f"{PREFIXO}-"),
+            (OrdemProducao, RegistroExclusao.TipoChoices.ORDEM_PRODUCAO, "codigo", f"{PREFIXO}-"),
+            (Cliente, RegistroExclusao.TipoChoices.CLIENTE, "nome", f"{PREFIXO} "),
+        )
+        removidos = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            for modelo, tipo, campo, prefixo in gerados:
+                self._registrar_exclusoes(modelo, tipo, campo, prefixo)
+            for modelo in (ProducaoDiaria, ProducaoDiariaPendente):
+                cursor.execute(
+                    f"DELETE FROM {modelo._meta.db_table} WHERE cliente_id IN "
+                    f"(SELECT id FROM {Cliente._meta.db_table} WHERE nome LIKE %s)",
+                    [f"{PREFIXO} %"],
+                )
+            for modelo, _, campo, prefixo in gerados:
+                cursor.execute(
+                    f"DELETE FROM {modelo._meta.db_table} WHERE {campo} LIKE %s", [f"{prefixo}%"]
+                )
+                removidos[modelo] = cursor.rowcount
+            invalidar_indicadores()
+        self.stdout.write(
+            f"Removidos: {removidos[Cliente]} cliente(s), {removidos[OrdemProducao]} OP(s) e "
+            f"{removidos[Peca]} peça(s) de benchmark."
+        )
+
+    def _registrar_exclusoes(self, modelo, tipo, campo, prefixo, lote=5000):
+        ids = (
+            modelo.objects.filter(**{f"{campo}__startswith": prefixo})
+            .values_list("id", flat=True)
+            .iterator(chunk_size=lote)
+        )
+        # bulk_create monta a lista inteira: um lote por vez para não carregar milhões de ids
+        while registros := [RegistroExclusao(tipo=tipo, objeto_id=pk) for pk in islice(ids, lote)]:
+            RegistroExclusao.objects.bulk_create(registros)
@@ -0,0 +1,132 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:45
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pecas", "0002_initial"),
+        ("producao", "0004_alter_ordemproducao_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecucaoRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "modo",
+                    models.CharField(
+                        choices=[("completo", "Completo"), ("incremental", "Incremental")],
+                        max_length=20,
+                        verbose_name="Modo",
+                    ),
+                ),
+                ("iniciado_em", models.DateTimeField(verbose_name="Iniciado em")),
+                (
+                    "concluido_em",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Concluído em"),
+                ),
+                (
+                    "dias_recalculados",
+                    models.PositiveIntegerField(default=0, verbose_name="Dias recalculados"),
+                ),
+            ],
+            options={
+                "verbose_name": "Execução de Consolidação",
+                "verbose_name_plural": "Execuções de Consolidação",
+                "ordering": ["-iniciado_em"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProducaoDiaria",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("data", models.DateField(verbose_name="Data")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("aberta", "Aberta"),
+                            ("em_andamento", "Em Andamento"),
+                            ("pausada", "Pausada"),
+                            ("concluida", "Concluída"),
+                            ("cancelada", "Cancelada"),
+                        ],
+                        max_length=30,
+                        verbose_name="Status da OP",
+                    ),
+                ),
+                ("total_ops", models.PositiveIntegerField(default=0, verbose_name="Total de OPs")),
+                (
+                    "duracao_producao",
+                    models.DurationField(
+                        default=datetime.timedelta,
+                        verbose_name="Soma das durações (atualização - criação)",
+                    ),
+                ),
+                (
+                    "pecas_total",
+                    models.PositiveIntegerField(default=0, verbose_name="Total de peças"),
+                ),
+                (
+                    "pecas_em_fila",
+                    models.PositiveIntegerField(default=0, verbose_name="Peças em fila"),
+                ),
+                (
+                    "pecas_em_andamento",
+                    models.PositiveIntegerField(default=0, verbose_name="Peças em andamento"),
+                ),
+                (
+                    "pecas_pausadas",
+                    models.PositiveIntegerField(default=0, verbose_name="Peças pausadas"),
+                ),
+                (
+                    "pecas_concluidas",
+                    models.PositiveIntegerField(default=0, verbose_name="Peças concluídas"),
+                ),
+                (
+                    "pecas_canceladas",
+                    models.PositiveIntegerField(default=0, verbose_name="Peças canceladas"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Atualizado em")),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="producao_diaria",
+                        to="pecas.cliente",
+                        verbose_name="Cliente",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Produção Diária",
+                "verbose_name_plural": "Produção Diária",
+                "ordering": ["-data"],
+                "indexes": [
+                    models.Index(fields=["data", "status"], name="producao_pr_data_74f535_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="producaodiaria",
+            constraint=models.UniqueConstraint(
+                fields=("data", "cliente", "status"), name="producao_diaria_unica"
+            ),
+        ),
+    ]
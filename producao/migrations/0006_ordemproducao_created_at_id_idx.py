@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("producao", "0005_producaodiaria"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ordemproducao",
+            index=models.Index(fields=["created_at", "id"], name="producao_or_created_c8b6ab_idx"),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("producao", "0006_ordemproducao_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ordemproducao",
+            index=models.Index(fields=["updated_at", "id"], name="producao_or_updated_050fd5_idx"),
+        ),
+    ]
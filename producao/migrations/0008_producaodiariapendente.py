@@ -0,0 +1,47 @@
+# Generated by Django 4.2.25 on 2026-10-18 15:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pecas", "0004_updated_at_id_idx"),
+        ("producao", "0007_ordemproducao_updated_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProducaoDiariaPendente",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("data", models.DateField(verbose_name="Data")),
+                (
+                    "cliente",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="pecas.cliente",
+                        verbose_name="Cliente",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Produção Diária Pendente",
+                "verbose_name_plural": "Produção Diária Pendente",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="producaodiariapendente",
+            constraint=models.UniqueConstraint(
+                fields=("data", "cliente"), name="producao_diaria_pendente_unica"
+            ),
+        ),
+    ]
@@ -1,9 +1,26 @@
 import uuid
+from datetime import timedelta
 from django.db import models
 from django.conf import settings
+from django.db.models import Count, Q
+from usinasoft.auditoria import AuditavelMixin
 
 
-class OrdemProducao(models.Model):
+class OrdemProducaoQuerySet(models.QuerySet):
+    """QuerySet customizado para ordens de produção."""
+
+    def com_estatisticas(self):
+        """
+        Anota a contagem de peças direto no SQL, evitando um COUNT por OP
+        ao ler total_pecas, pecas_concluidas e percentual_conclusao.
+        """
+        return self.annotate(
+            num_pecas=Count("pecas"),
+            num_pecas_concluidas=Count("pecas", filter=Q(pecas__status="concluida")),
+        )
+
+
+class OrdemProducao(AuditavelMixin, models.Model):
     """
     Modelo que representa uma ordem de produção (OP).
     O código da OP corresponde ao número da nota fiscal física.
@@ -52,6 +69,8 @@ class OrdemProducao(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
 
+    objects = OrdemProducaoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Ordem de Produção"
         verbose_name_plural = "Ordens de Produção"
@@ -61,19 +80,36 @@ class OrdemProducao(models.Model):
             models.Index(fields=["status"]),
             models.Index(fields=["cliente"]),
             models.Index(fields=["created_at", "status"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self):
         return f"OP {self.codigo} - {self.get_status_display()}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Guarda o cliente e o status carregados do banco para detectar alterações."""
+        instance = super().from_db(db, field_names, values)
+        adiados = instance.get_deferred_fields()
+        if "cliente_id" not in adiados:
+            instance._cliente_id_salvo = instance.cliente_id
+        if "status" not in adiados:
+            instance._status_salvo = instance.status
+        return instance
+
     @property
     def total_pecas(self):
-        """Retorna o total de peças nesta OP."""
+        """Retorna o total de peças nesta OP (usa a anotação quando disponível)."""
+        if hasattr(self, "num_pecas"):
+            return self.num_pecas
         return self.pecas.count()
 
     @property
     def pecas_concluidas(self):
-        """Retorna o número de peças concluídas."""
+        """Retorna o número de peças concluídas (usa a anotação quando disponível)."""
+        if hasattr(self, "num_pecas_concluidas"):
+            return self.num_pecas_concluidas
         return self.pecas.filter(status="concluida").count()
 
     @property
@@ -96,16 +132,24 @@ class OrdemProducao(models.Model):
         Nota: O status da OP pode ser definido manualmente via API, este método
         apenas sugere atualizações automáticas baseadas nas peças.
         """
-        total = self.total_pecas
+        # Todas as contagens em uma única consulta agregada
+        contagem = self.pecas.aggregate(
+            total=Count("id"),
+            concluidas=Count("id", filter=Q(status="concluida")),
+            em_andamento=Count("id", filter=Q(status="em_andamento")),
+            canceladas=Count("id", filter=Q(status="cancelada")),
+            pausadas=Count("id", filter=Q(status="pausada")),
+        )
+        total = contagem["total"]
 
         # Se não há peças, não faz nada
         if total == 0:
             return False
 
-        concluidas = self.pecas_concluidas
-        em_andamento = self.pecas.filter(status="em_andamento").count()
-        canceladas = self.pecas.filter(status="cancelada").count()
-        pausadas = self.pecas.filter(status="pausada").count()
+        concluidas = contagem["concluidas"]
+        em_andamento = contagem["em_andamento"]
+        canceladas = contagem["canceladas"]
+        pausadas = contagem["pausadas"]
 
         status_anterior = self.status
 
@@ -128,3 +172,112 @@ class OrdemProducao(models.Model):
             return True
 
         return False
+
+
+class ProducaoDiaria(models.Model):
+    """
+    Consolidação diária da produção: uma linha por dia de criação da OP,
+    cliente e status da OP, com contagens de OPs e peças e a soma das durações.
+
+    Mantida pelos signals de OP/Peça e pelo comando rebuild_rollups; permite
+    responder os indicadores de qualquer período somando poucas linhas.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    data = models.DateField(verbose_name="Data")
+    cliente = models.ForeignKey(
+        "pecas.Cliente",
+        on_delete=models.CASCADE,
+        related_name="producao_diaria",
+        verbose_name="Cliente",
+    )
+    status = models.CharField(
+        max_length=30, choices=OrdemProducao.StatusChoices.choices, verbose_name="Status da OP"
+    )
+    total_ops = models.PositiveIntegerField(default=0, verbose_name="Total de OPs")
+    duracao_producao = models.DurationField(
+        default=timedelta, verbose_name="Soma das durações (atualização - criação)"
+    )
+    pecas_total = models.PositiveIntegerField(default=0, verbose_name="Total de peças")
+    pecas_em_fila = models.PositiveIntegerField(default=0, verbose_name="Peças em fila")
+    pecas_em_andamento = models.PositiveIntegerField(default=0, verbose_name="Peças em andamento")
+    pecas_pausadas = models.PositiveIntegerField(default=0, verbose_name="Peças pausadas")
+    pecas_concluidas = models.PositiveIntegerField(default=0, verbose_name="Peças concluídas")
+    pecas_canceladas = models.PositiveIntegerField(default=0, verbose_name="Peças canceladas")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    # Coluna de contagem correspondente a cada status de peça
+    CAMPOS_PECAS_POR_STATUS = {
+        "em_fila": "pecas_em_fila",
+        "em_andamento": "pecas_em_andamento",
+        "pausada": "pecas_pausadas",
+        "concluida": "pecas_concluidas",
+        "cancelada": "pecas_canceladas",
+    }
+
+    class Meta:
+        verbose_name = "Produção Diária"
+        verbose_name_plural = "Produção Diária"
+        ordering = ["-data"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data", "cliente", "status"], name="producao_diaria_unica"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["data", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.data} - {self.cliente_id} - {self.status}"
+
+
+class ExecucaoRollup(models.Model):
+    """Registro das execuções do comando rebuild_rollups."""
+
+    class ModoChoices(models.TextChoices):
+        COMPLETO = "completo", "Completo"
+        INCREMENTAL = "incremental", "Incremental"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    modo = models.CharField(max_length=20, choices=ModoChoices.choices, verbose_name="Modo")
+    iniciado_em = models.DateTimeField(verbose_name="Iniciado em")
+    concluido_em = models.DateTimeField(blank=True, null=True, verbose_name="Concluído em")
+    dias_recalculados = models.PositiveIntegerField(default=0, verbose_name="Dias recalculados")
+
+    class Meta:
+        verbose_name = "Execução de Consolidação"
+        verbose_name_plural = "Execuções de Consolidação"
+        ordering = ["-iniciado_em"]
+
+    def __str__(self):
+        return f"{self.get_modo_display()} - {self.iniciado_em}"
+
+
+class ProducaoDiariaPendente(models.Model):
+    """
+    Dia (e cliente) de ProducaoDiaria a recalcular, registrado após o commit de
+    uma gravação em OP ou peça. Processado pelo rebuild_rollups e, antes de
+    somar a consolidação, pela leitura dos indicadores do período.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    data = models.DateField(verbose_name="Data")
+    cliente = models.ForeignKey(
+        "pecas.Cliente",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Cliente",
+    )
+
+    class Meta:
+        verbose_name = "Produção Diária Pendente"
+        verbose_name_plural = "Produção Diária Pendente"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["data", "cliente"], name="producao_diaria_pendente_unica"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.data} - {self.cliente_id}"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from usinasoft.campos import CamposDinamicosSerializerMixin
 from .models import OrdemProducao
 
 
-class OrdemProducaoSerializer(serializers.ModelSerializer):
+class OrdemProducaoSerializer(CamposDinamicosSerializerMixin, serializers.ModelSerializer):
     criado_por_email = serializers.ReadOnlyField(source="criado_por.email")
     criado_por_nome = serializers.ReadOnlyField(source="criado_por.get_full_name")
     responsavel_email = serializers.ReadOnlyField(source="responsavel.email")
@@ -45,3 +46,5 @@ class OrdemProducaoSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # ?expand=: relações devolvidas como objetos
+        expansoes = {"cliente": ("pecas.serializers.ClienteSerializer", None)}
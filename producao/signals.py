@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from usinasoft.eventos import publicar_evento
+from .indicadores import invalidar_indicadores
+from .models import OrdemProducao
+
+
+@receiver(post_save, sender=OrdemProducao)
+@receiver(post_delete, sender=OrdemProducao)
+def invalidar_indicadores_ao_alterar_op(sender, instance, **kwargs):
+    """
+    Signal que invalida o cache dos indicadores e recalcula a consolidação
+    diária do dia da OP quando ela é salva ou excluída.
+    """
+    invalidar_indicadores([instance])
+    instance._cliente_id_salvo = instance.cliente_id
+
+
+@receiver(post_save, sender=OrdemProducao)
+def publicar_status_op(sender, instance, created, **kwargs):
+    """Publica no stream de eventos a criação ou a mudança de status da OP."""
+    status_anterior = None if created else getattr(instance, "_status_salvo", None)
+    if created or status_anterior != instance.status:
+        publicar_evento(
+            "ordem_producao.status",
+            ordem_producao=instance.id,
+            codigo=instance.codigo,
+            status_anterior=status_anterior,
+            status=instance.status,
+        )
+    instance._status_salvo = instance.status
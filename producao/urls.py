@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import OrdemProducaoViewSet, indicadores_summary
+from .views import OrdemProducaoViewSet, indicadores_summary, indicadores_timeseries
 
 router = DefaultRouter()
 router.register(r"ops", OrdemProducaoViewSet, basename="ordemproducao")
@@ -8,4 +8,5 @@ router.register(r"ops", OrdemProducaoViewSet, basename="ordemproducao")
 urlpatterns = [
     # Endpoint de indicadores (agregação em tempo real)
     path("indicadores/summary/", indicadores_summary, name="indicadores-summary"),
+    path("indicadores/timeseries/", indicadores_timeseries, name="indicadores-timeseries"),
 ] + router.urls
@@ -1,33 +1,130 @@
 from rest_framework import viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from django.db.models import Count, Avg, F
+from usinasoft.campos import CamposDinamicosMixin
+from usinasoft.condicional import GetCondicionalMixin, gerar_etag
+from usinasoft.exportacao import ExportacaoMixin
+from usinasoft.lista_rapida import ListaRapidaMixin
+from usinasoft.pagination import CursorOpcionalPagination
+from django.conf import settings
+from django.db.models import Count, Avg, DateField, F
+from django.db.models.functions import Trunc
 from django.utils import timezone
-from datetime import date, timedelta
+from django.utils.cache import get_conditional_response
+from datetime import date, datetime, time, timedelta
+from .indicadores import (
+    chave_indicadores,
+    get_cache,
+    processar_pendentes,
+    rollup_disponivel,
+    totais_producao_diaria,
+)
 from .models import OrdemProducao
 from .serializers import OrdemProducaoSerializer
+from usuarios.models import nome_completo
 
 
-class OrdemProducaoViewSet(viewsets.ModelViewSet):
-    queryset = OrdemProducao.objects.select_related("cliente").all().order_by("-created_at")
+class OrdemProducaoViewSet(
+    CamposDinamicosMixin,
+    GetCondicionalMixin,
+    ListaRapidaMixin,
+    ExportacaoMixin,
+    viewsets.ModelViewSet,
+):
+    queryset = OrdemProducao.objects.select_related(
+        "cliente", "criado_por", "responsavel"
+    ).order_by("-created_at")
     serializer_class = OrdemProducaoSerializer
+    # Contagens de peças: só calculadas quando algum destes campos é exibido
+    campos_anotados = {
+        "total_pecas": "com_estatisticas",
+        "pecas_concluidas": "com_estatisticas",
+        "percentual_conclusao": "com_estatisticas",
+    }
+    pagination_class = CursorOpcionalPagination
+    campos_validacao = [
+        "updated_at",
+        "cliente__updated_at",
+        "criado_por__updated_at",
+        "responsavel__updated_at",
+    ]
+    relacoes_contadas_validacao = ["pecas"]
+    tipos_exclusao_validacao = ["peca"]
+    nome_exportacao = "ops"
+    colunas_exportacao = [
+        ("id", "id"),
+        ("codigo", "codigo"),
+        ("cliente", "cliente_id"),
+        ("cliente_nome", "cliente__nome"),
+        ("criado_por", "criado_por_id"),
+        ("criado_por_email", "criado_por__email"),
+        ("responsavel", "responsavel_id"),
+        ("responsavel_email", "responsavel__email"),
+        ("status", "status"),
+        ("observacoes", "observacoes"),
+        ("total_pecas", "num_pecas"),
+        ("pecas_concluidas", "num_pecas_concluidas"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
+    colunas_calculadas_exportacao = ["percentual_conclusao"]
+    colunas_lista_rapida = [
+        ("id", "id"),
+        ("codigo", "codigo"),
+        ("cliente", "cliente_id"),
+        ("cliente_nome", "cliente__nome"),
+        ("criado_por", "criado_por_id"),
+        ("criado_por_email", "criado_por__email"),
+        ("criado_por_first_name", "criado_por__first_name"),
+        ("criado_por_last_name", "criado_por__last_name"),
+        ("responsavel", "responsavel_id"),
+        ("responsavel_email", "responsavel__email"),
+        ("responsavel_first_name", "responsavel__first_name"),
+        ("responsavel_last_name", "responsavel__last_name"),
+        ("status", "status"),
+        ("observacoes", "observacoes"),
+        ("total_pecas", "num_pecas"),
+        ("pecas_concluidas", "num_pecas_concluidas"),
+        ("created_at", "created_at"),
+        ("updated_at", "updated_at"),
+    ]
 
+    def transformar_linha_exportacao(self, linha):
+        total = linha["total_pecas"]
+        linha["percentual_conclusao"] = (
+            round((linha["pecas_concluidas"] / total) * 100, 2) if total else 0
+        )
+        return linha
 
-@api_view(["GET"])
-def indicadores_summary(request):
+    def perform_create(self, serializer):
+        op = serializer.save()
+        # OP recém-criada não tem peças: evita as contagens das propriedades na resposta
+        op.num_pecas = op.num_pecas_concluidas = 0
+
+    def transformar_linha_lista_rapida(self, linha):
+        self.transformar_linha_exportacao(linha)
+        for usuario in ("criado_por", "responsavel"):
+            if linha[usuario] is None:
+                # Como no serializer: sem usuário, os campos derivados ficam fora
+                del linha[f"{usuario}_email"]
+                continue
+            linha[f"{usuario}_nome"] = nome_completo(
+                linha[f"{usuario}_first_name"],
+                linha[f"{usuario}_last_name"],
+                linha[f"{usuario}_email"],
+            )
+        return linha
+
+
+def _obter_periodo(request):
     """
-    Retorna indicadores agregados de produção baseados em OPs e peças.
+    Lê os parâmetros start/end (YYYY-MM-DD) da requisição.
+
+    Padrão: últimos 30 dias até hoje. Retorna (start_date, end_date, erro), onde
+    erro é uma Response 400 quando os parâmetros são inválidos.
     """
     end_date = request.GET.get("end")
     start_date = request.GET.get("start")
-    date_field = request.GET.get("date_field", "created_at")
-
-    # Validar date_field
-    if date_field not in ["created_at", "updated_at"]:
-        return Response(
-            {"error": f"date_field inválido. Use: created_at ou updated_at"},
-            status=400,
-        )
 
     try:
         if end_date:
@@ -41,15 +138,19 @@ def indicadores_summary(request):
             start_date = end_date - timedelta(days=30)
 
         if start_date > end_date:
-            return Response({"error": "start deve ser anterior ou igual a end"}, status=400)
+            erro = Response({"error": "start deve ser anterior ou igual a end"}, status=400)
+            return None, None, erro
     except ValueError as e:
-        return Response(
+        erro = Response(
             {"error": f"Formato de data inválido. Use YYYY-MM-DD. Detalhes: {str(e)}"}, status=400
         )
+        return None, None, erro
 
-    # Construir filtro para DateTimeField
-    from datetime import datetime, time
+    return start_date, end_date, None
 
+
+def _limites_periodo(start_date, end_date):
+    """Converte as datas do período em datetimes (início e fim do dia) no fuso corrente."""
     tz = timezone.get_current_timezone()
     start_datetime = datetime.combine(start_date, time.min)
     end_datetime = datetime.combine(end_date, time.max)
@@ -59,17 +160,66 @@ def indicadores_summary(request):
     if timezone.is_naive(end_datetime):
         end_datetime = timezone.make_aware(end_datetime, timezone=tz)
 
-    filter_kwargs = {
-        f"{date_field}__gte": start_datetime,
-        f"{date_field}__lte": end_datetime,
-    }
+    return start_datetime, end_datetime
 
-    # Queryset base
-    qs = OrdemProducao.objects.filter(**filter_kwargs)
 
-    # Agregação por status de OP
-    agregacao = qs.values("status").annotate(total=Count("id")).order_by("status")
-    agregacao_dict = {item["status"]: item["total"] for item in agregacao}
+@api_view(["GET"])
+def indicadores_summary(request):
+    """
+    Retorna indicadores agregados de produção baseados em OPs e peças.
+
+    O resultado de cada período fica em cache até que uma OP ou peça seja
+    alterada (ver producao/indicadores.py).
+    """
+    date_field = request.GET.get("date_field", "created_at")
+
+    # Validar date_field
+    if date_field not in ["created_at", "updated_at"]:
+        return Response(
+            {"error": f"date_field inválido. Use: created_at ou updated_at"},
+            status=400,
+        )
+
+    start_date, end_date, erro = _obter_periodo(request)
+    if erro:
+        return erro
+
+    chave = chave_indicadores("summary", start_date, end_date, date_field)
+
+    # A chave muda sempre que OPs/peças mudam, então serve como ETag
+    etag = gerar_etag(chave, request.accepted_renderer.format)
+    nao_modificado = get_conditional_response(request, etag=etag)
+    if nao_modificado is not None:
+        return nao_modificado
+
+    cache = get_cache()
+    dados = cache.get(chave)
+    if dados is None:
+        dados = _calcular_summary(start_date, end_date, date_field)
+        cache.set(chave, dados, timeout=settings.INDICADORES_CACHE_TIMEOUT)
+
+    response = Response(dados)
+    response["ETag"] = etag
+    return response
+
+
+def _calcular_summary(start_date, end_date, date_field):
+    """
+    Calcula os indicadores agregados do período.
+
+    Para date_field=created_at usa a consolidação diária (ProducaoDiaria), se
+    disponível, depois de recalcular os dias pendentes do período; caso
+    contrário agrega diretamente sobre OPs e peças.
+    """
+    if date_field == "created_at" and rollup_disponivel():
+        processar_pendentes(start_date, end_date)
+        agregacao_dict, tempo_medio_dias, total_pecas, pecas_status_dict = totais_producao_diaria(
+            start_date, end_date
+        )
+    else:
+        agregacao_dict, tempo_medio_dias, total_pecas, pecas_status_dict = _agregar_periodo(
+            start_date, end_date, date_field
+        )
 
     # Garantir todos os status
     status_choices = dict(OrdemProducao.StatusChoices.choices)
@@ -92,17 +242,55 @@ def indicadores_summary(request):
             }
         )
 
+    return {
+        "periodo": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "date_field": date_field,
+        },
+        "ordens_producao": {
+            "total": total_ops,
+            "por_status": por_status,
+            "detalhes_por_status": detalhes_por_status,
+            "tempo_medio_producao_dias": round(tempo_medio_dias, 2),
+        },
+        "pecas": {
+            "total": total_pecas,
+            "por_status": pecas_status_dict,
+        },
+    }
+
+
+def _agregar_periodo(start_date, end_date, date_field):
+    """
+    Agrega OPs e peças do período diretamente nas tabelas.
+
+    Retorna (OPs por status, tempo médio de produção em dias, total de peças,
+    peças por status).
+    """
+    # Construir filtro para DateTimeField
+    start_datetime, end_datetime = _limites_periodo(start_date, end_date)
+    filter_kwargs = {
+        f"{date_field}__gte": start_datetime,
+        f"{date_field}__lte": end_datetime,
+    }
+
+    # Queryset base
+    qs = OrdemProducao.objects.filter(**filter_kwargs)
+
+    # Agregação por status de OP
+    agregacao = qs.values("status").annotate(total=Count("id")).order_by("status")
+    agregacao_dict = {item["status"]: item["total"] for item in agregacao}
+
     # Calcular tempo médio de produção (entre criação e conclusão)
-    ops_concluidas = qs.filter(status="concluida")
-    if ops_concluidas.exists():
-        tempo_medio_segundos = ops_concluidas.annotate(
-            duracao=F("updated_at") - F("created_at")
-        ).aggregate(media=Avg("duracao"))["media"]
-
-        if tempo_medio_segundos:
-            tempo_medio_dias = tempo_medio_segundos.total_seconds() / (60 * 60 * 24)
-        else:
-            tempo_medio_dias = 0
+    # Sem OPs concluídas a média é None
+    tempo_medio_segundos = (
+        qs.filter(status="concluida")
+        .annotate(duracao=F("updated_at") - F("created_at"))
+        .aggregate(media=Avg("duracao"))["media"]
+    )
+    if tempo_medio_segundos:
+        tempo_medio_dias = tempo_medio_segundos.total_seconds() / (60 * 60 * 24)
     else:
         tempo_medio_dias = 0
 
@@ -115,22 +303,127 @@ def indicadores_summary(request):
     pecas_por_status = pecas_qs.values("status").annotate(total=Count("id"))
     pecas_status_dict = {item["status"]: item["total"] for item in pecas_por_status}
 
-    return Response(
-        {
-            "periodo": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat(),
-                "date_field": date_field,
-            },
-            "ordens_producao": {
-                "total": total_ops,
-                "por_status": por_status,
-                "detalhes_por_status": detalhes_por_status,
-                "tempo_medio_producao_dias": round(tempo_medio_dias, 2),
-            },
-            "pecas": {
-                "total": total_pecas,
-                "por_status": pecas_status_dict,
-            },
-        }
+    return agregacao_dict, tempo_medio_dias, total_pecas, pecas_status_dict
+
+
+BUCKETS_TIMESERIES = ("day", "week", "month")
+
+
+@api_view(["GET"])
+def indicadores_timeseries(request):
+    """
+    Retorna séries temporais de produção agrupadas por dia, semana ou mês.
+
+    Para cada intervalo: OPs criadas, OPs concluídas, peças concluídas e lead time
+    médio (dias entre criação e conclusão das OPs concluídas no intervalo).
+    Conclusões são datadas pelo updated_at, como no tempo médio do summary.
+    """
+    bucket = request.GET.get("bucket", "day")
+    if bucket not in BUCKETS_TIMESERIES:
+        return Response(
+            {"error": "bucket inválido. Use: day, week ou month"},
+            status=400,
+        )
+
+    start_date, end_date, erro = _obter_periodo(request)
+    if erro:
+        return erro
+
+    chave = chave_indicadores("timeseries", start_date, end_date, bucket)
+    cache = get_cache()
+    dados = cache.get(chave)
+    if dados is None:
+        dados = _calcular_timeseries(start_date, end_date, bucket)
+        cache.set(chave, dados, timeout=settings.INDICADORES_CACHE_TIMEOUT)
+
+    return Response(dados)
+
+
+def _inicio_bucket(dia, bucket):
+    """Início do intervalo que contém o dia (semanas começam na segunda-feira)."""
+    if bucket == "week":
+        return dia - timedelta(days=dia.weekday())
+    if bucket == "month":
+        return dia.replace(day=1)
+    return dia
+
+
+def _proximo_bucket(inicio, bucket):
+    if bucket == "week":
+        return inicio + timedelta(days=7)
+    if bucket == "month":
+        return (inicio + timedelta(days=32)).replace(day=1)
+    return inicio + timedelta(days=1)
+
+
+def _calcular_timeseries(start_date, end_date, bucket):
+    """Calcula as séries com uma consulta agrupada por métrica."""
+    from pecas.models import Peca
+
+    tz = timezone.get_current_timezone()
+    start_datetime, end_datetime = _limites_periodo(start_date, end_date)
+
+    def truncar(campo):
+        return Trunc(campo, bucket, output_field=DateField(), tzinfo=tz)
+
+    criadas = (
+        OrdemProducao.objects.filter(created_at__gte=start_datetime, created_at__lte=end_datetime)
+        .annotate(inicio=truncar("created_at"))
+        .values("inicio")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+    concluidas = (
+        OrdemProducao.objects.filter(
+            status=OrdemProducao.StatusChoices.CONCLUIDA,
+            updated_at__gte=start_datetime,
+            updated_at__lte=end_datetime,
+        )
+        .annotate(inicio=truncar("updated_at"), duracao=F("updated_at") - F("created_at"))
+        .values("inicio")
+        .annotate(total=Count("id"), lead_time=Avg("duracao"))
+        .order_by()
+    )
+    pecas_concluidas = (
+        Peca.objects.filter(
+            status=Peca.StatusChoices.CONCLUIDA,
+            updated_at__gte=start_datetime,
+            updated_at__lte=end_datetime,
+        )
+        .annotate(inicio=truncar("updated_at"))
+        .values("inicio")
+        .annotate(total=Count("id"))
+        .order_by()
     )
+
+    criadas_dict = {item["inicio"]: item["total"] for item in criadas}
+    concluidas_dict = {item["inicio"]: item for item in concluidas}
+    pecas_dict = {item["inicio"]: item["total"] for item in pecas_concluidas}
+
+    # Todos os intervalos do período aparecem, inclusive os sem movimento
+    series = []
+    inicio = _inicio_bucket(start_date, bucket)
+    while inicio <= end_date:
+        concluidas_bucket = concluidas_dict.get(inicio)
+        lead_time = concluidas_bucket["lead_time"] if concluidas_bucket else None
+        series.append(
+            {
+                "inicio": inicio.isoformat(),
+                "ops_criadas": criadas_dict.get(inicio, 0),
+                "ops_concluidas": concluidas_bucket["total"] if concluidas_bucket else 0,
+                "pecas_concluidas": pecas_dict.get(inicio, 0),
+                "lead_time_medio_dias": (
+                    round(lead_time.total_seconds() / (60 * 60 * 24), 2) if lead_time else 0
+                ),
+            }
+        )
+        inicio = _proximo_bucket(inicio, bucket)
+
+    return {
+        "periodo": {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "bucket": bucket,
+        },
+        "series": series,
+    }
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from .models import RegistroExclusao
+
+
+@admin.register(RegistroExclusao)
+class RegistroExclusaoAdmin(admin.ModelAdmin):
+    """Admin para o modelo RegistroExclusao."""
+
+    list_display = ("tipo", "objeto_id", "excluido_em")
+    list_filter = ("tipo", "excluido_em")
+    search_fields = ("objeto_id",)
+    readonly_fields = ("tipo", "objeto_id", "excluido_em")
+    ordering = ("-excluido_em",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SincronizacaoConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "sincronizacao"
+    verbose_name = "Sincronização"
+
+    def ready(self):
+        """Importa os signals quando o app é carregado."""
+        import sincronizacao.signals
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sincronizacao.models import RegistroExclusao
+
+
+class Command(BaseCommand):
+    help = (
+        "Exclui as marcas de exclusão (tombstones) anteriores ao horizonte de retenção "
+        "da sincronização. Clientes com since mais antigo precisam sincronizar tudo de novo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=settings.SINCRONIZACAO_RETENCAO_DIAS,
+            help=(
+                "Dias de marcas de exclusão mantidos no banco "
+                f"(padrão: {settings.SINCRONIZACAO_RETENCAO_DIAS})"
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantas marcas seriam excluídas",
+        )
+
+    def handle(self, *args, **options):
+        if options["dias"] < 1:
+            raise CommandError("--dias deve ser maior que zero.")
+
+        limite = timezone.now() - timedelta(days=options["dias"])
+        antigas = RegistroExclusao.objects.filter(excluido_em__lt=limite)
+
+        if options["dry_run"]:
+            total, acao = antigas.count(), "seriam excluídas"
+        else:
+            total, _ = antigas.delete()
+            acao = "excluídas"
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} marca(s) de exclusão anteriores a {limite.isoformat()} {acao}."
+            )
+        )
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:49
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistroExclusao",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("cliente", "Cliente"),
+                            ("ordem_producao", "Ordem de Produção"),
+                            ("peca", "Peça"),
+                        ],
+                        max_length=30,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("objeto_id", models.UUIDField(verbose_name="ID do registro excluído")),
+                (
+                    "excluido_em",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Excluído em"),
+                ),
+            ],
+            options={
+                "verbose_name": "Registro de Exclusão",
+                "verbose_name_plural": "Registros de Exclusão",
+                "ordering": ["excluido_em", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["excluido_em", "id"], name="sincronizac_excluid_153f8a_idx"
+                    )
+                ],
+            },
+        ),
+    ]
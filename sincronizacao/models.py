@@ -0,0 +1,32 @@
+import uuid
+from django.db import models
+
+
+class RegistroExclusao(models.Model):
+    """
+    Marca de exclusão (tombstone) de um registro sincronizável.
+
+    Permite que clientes de sincronização incremental saibam quais registros
+    foram removidos desde a última consulta.
+    """
+
+    class TipoChoices(models.TextChoices):
+        CLIENTE = "cliente", "Cliente"
+        ORDEM_PRODUCAO = "ordem_producao", "Ordem de Produção"
+        PECA = "peca", "Peça"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=30, choices=TipoChoices.choices, verbose_name="Tipo")
+    objeto_id = models.UUIDField(verbose_name="ID do registro excluído")
+    excluido_em = models.DateTimeField(auto_now_add=True, verbose_name="Excluído em")
+
+    class Meta:
+        verbose_name = "Registro de Exclusão"
+        verbose_name_plural = "Registros de Exclusão"
+        ordering = ["excluido_em", "id"]
+        indexes = [
+            models.Index(fields=["excluido_em", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} {self.objeto_id} - {self.excluido_em}"
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+from .models import RegistroExclusao
+
+TIPOS_POR_MODELO = {
+    Cliente: RegistroExclusao.TipoChoices.CLIENTE,
+    OrdemProducao: RegistroExclusao.TipoChoices.ORDEM_PRODUCAO,
+    Peca: RegistroExclusao.TipoChoices.PECA,
+}
+
+
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=OrdemProducao)
+@receiver(post_delete, sender=Peca)
+def registrar_exclusao(sender, instance, **kwargs):
+    """
+    Signal que grava uma marca de exclusão para o endpoint de sincronização.
+    """
+    RegistroExclusao.objects.create(tipo=TIPOS_POR_MODELO[sender], objeto_id=instance.pk)
@@ -0,0 +1,138 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from pecas.models import Cliente, Peca
+from pecas.serializers import ClienteSerializer, PecaSerializer
+from producao.models import OrdemProducao
+from producao.serializers import OrdemProducaoSerializer
+from .models import RegistroExclusao
+
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 5000
+
+
+def _fontes():
+    """Fontes sincronizáveis: (nome na resposta, queryset, campo de data)."""
+    return [
+        ("clientes", Cliente.objects.all(), "updated_at"),
+        (
+            "ordens_producao",
+            OrdemProducao.objects.select_related(
+                "cliente", "criado_por", "responsavel"
+            ).com_estatisticas(),
+            "updated_at",
+        ),
+        ("pecas", Peca.objects.select_related("cliente", "ordem_producao"), "updated_at"),
+        ("exclusoes", RegistroExclusao.objects.all(), "excluido_em"),
+    ]
+
+
+def _serializar(nome, objetos):
+    if nome == "clientes":
+        return ClienteSerializer(objetos, many=True).data
+    if nome == "ordens_producao":
+        return OrdemProducaoSerializer(objetos, many=True).data
+    if nome == "pecas":
+        return PecaSerializer(objetos, many=True).data
+    return [
+        {"tipo": registro.tipo, "id": registro.objeto_id, "excluido_em": registro.excluido_em}
+        for registro in objetos
+    ]
+
+
+@api_view(["GET"])
+def sincronizar(request):
+    """
+    Retorna clientes, OPs e peças alterados desde uma marca d'água, mais as
+    exclusões registradas no mesmo intervalo.
+
+    Parâmetros:
+    - since: data/hora ISO 8601 (omitido = desde o início). Anterior à retenção das
+      marcas de exclusão (SINCRONIZACAO_RETENCAO_DIAS) retorna 410: o cliente pode
+      ter perdido exclusões e deve sincronizar tudo de novo, sem since.
+    - after: id do último registro recebido com updated_at == since (vem no watermark)
+    - limit: máximo de registros por página (padrão 500, máximo 5000)
+
+    Os registros de todas as fontes são ordenados por (data de alteração, id) e
+    paginados juntos; o watermark da resposta é a posição do último registro
+    entregue. Enquanto has_more for verdadeiro, siga o link next.
+
+    A data de alteração é a da gravação, não a do commit: uma transação longa pode
+    confirmar registros com data anterior a um watermark já entregue. Por isso só
+    são entregues registros alterados há mais de SINCRONIZACAO_MARGEM_SEGUNDOS; os
+    mais recentes ficam para a próxima consulta.
+    """
+    since = request.GET.get("since")
+    after = request.GET.get("after")
+
+    if since:
+        since = parse_datetime(since)
+        if since is None:
+            return Response({"error": "since inválido. Use data/hora ISO 8601."}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, timezone.get_default_timezone())
+        if since < timezone.now() - timedelta(days=settings.SINCRONIZACAO_RETENCAO_DIAS):
+            return Response(
+                {
+                    "error": "since anterior à retenção das exclusões "
+                    f"({settings.SINCRONIZACAO_RETENCAO_DIAS} dias). "
+                    "Faça uma sincronização completa, sem since."
+                },
+                status=410,
+            )
+
+    if after:
+        try:
+            after = uuid.UUID(after)
+        except ValueError:
+            return Response({"error": "after inválido. Use o id do watermark."}, status=400)
+
+    try:
+        limite = min(int(request.GET.get("limit", LIMITE_PADRAO)), LIMITE_MAXIMO)
+        if limite <= 0:
+            raise ValueError
+    except ValueError:
+        return Response({"error": "limit deve ser um inteiro positivo."}, status=400)
+
+    # Ninguém recebe um watermark além deste instante (ver docstring)
+    limite_superior = timezone.now() - timedelta(seconds=settings.SINCRONIZACAO_MARGEM_SEGUNDOS)
+
+    # Cada fonte contribui com no máximo limite + 1 registros após a marca d'água
+    candidatos = []
+    for nome, qs, campo in _fontes():
+        qs = qs.filter(**{f"{campo}__lte": limite_superior})
+        if since and after:
+            qs = qs.filter(Q(**{f"{campo}__gt": since}) | Q(**{campo: since, "id__gt": after}))
+        elif since:
+            qs = qs.filter(**{f"{campo}__gt": since})
+        for objeto in qs.order_by(campo, "id")[: limite + 1]:
+            candidatos.append((getattr(objeto, campo), objeto.id, nome, objeto))
+
+    candidatos.sort(key=lambda candidato: (candidato[0], candidato[1]))
+    pagina = candidatos[:limite]
+    has_more = len(candidatos) > limite
+
+    dados = {}
+    for nome, _, _ in _fontes():
+        dados[nome] = _serializar(nome, [c[3] for c in pagina if c[2] == nome])
+
+    if pagina:
+        watermark = {"since": pagina[-1][0], "after": pagina[-1][1]}
+    else:
+        watermark = {"since": since, "after": after}
+
+    next_url = None
+    if has_more:
+        next_url = request.build_absolute_uri()
+        next_url = replace_query_param(next_url, "since", watermark["since"].isoformat())
+        next_url = replace_query_param(next_url, "after", str(watermark["after"]))
+
+    dados.update({"watermark": watermark, "has_more": has_more, "next": next_url})
+    return Response(dados)
@@ -0,0 +1,56 @@
+import pytest
+from rest_framework.test import APIClient
+
+from usinasoft import eventos
+from usuarios.models import Usuario
+
+
+@pytest.fixture(autouse=True)
+def auditoria_sincrona(settings):
+    # A thread de gravação em lote não enxerga a transação de cada teste
+    settings.AUDITORIA_ASSINCRONA = False
+
+
+class BackendColetor:
+    """Backend de eventos que só guarda o que foi publicado."""
+
+    def __init__(self):
+        self.eventos = []
+
+    def publicar(self, evento):
+        self.eventos.append(evento)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    coletor = BackendColetor()
+    monkeypatch.setattr(eventos, "_backend", coletor)
+    return coletor
+
+
+@pytest.fixture
+def usuario(db):
+    return Usuario.objects.create_user(
+        "operador@usinasoft.com", "senha-teste", first_name="Ana", last_name="Souza"
+    )
+
+
+@pytest.fixture
+def api(usuario):
+    cliente = APIClient()
+    cliente.force_authenticate(usuario)
+    return cliente
+
+
+@pytest.fixture
+def admin(db):
+    return Usuario.objects.create_user(
+        "gerente@usinasoft.com", "senha-teste", first_name="Rui", last_name="Lima", is_staff=True
+    )
+
+
+@pytest.fixture
+def api_admin(admin):
+    cliente = APIClient()
+    cliente.force_authenticate(admin)
+    return cliente
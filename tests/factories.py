@@ -0,0 +1,112 @@
+"""
+Fábricas de dados de teste.
+
+Cada fábrica cria um registro com valores padrão realistas, sobrescritos
+pelos kwargs. popular() gera volumes maiores com bulk_create (sem signals).
+"""
+
+import itertools
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+from usuarios.models import LogAcao, Usuario
+
+_sequencia = itertools.count(1)
+
+STATUS_PECA = list(Peca.StatusChoices.values)
+STATUS_OP = list(OrdemProducao.StatusChoices.values)
+
+
+def criar_usuario(**kwargs):
+    n = next(_sequencia)
+    kwargs.setdefault("email", f"usuario{n}@usinasoft.com")
+    kwargs.setdefault("first_name", "Operador")
+    kwargs.setdefault("last_name", str(n))
+    return Usuario.objects.create_user(password=kwargs.pop("password", "senha-teste"), **kwargs)
+
+
+def criar_cliente(**kwargs):
+    n = next(_sequencia)
+    kwargs.setdefault("nome", f"Cliente {n}")
+    kwargs.setdefault("contato", "Compras")
+    kwargs.setdefault("email", f"compras{n}@cliente.com")
+    return Cliente.objects.create(**kwargs)
+
+
+def criar_op(**kwargs):
+    n = next(_sequencia)
+    kwargs.setdefault("codigo", f"NF-{n:06}")
+    if "cliente" not in kwargs:
+        kwargs["cliente"] = criar_cliente()
+    return OrdemProducao.objects.create(**kwargs)
+
+
+def criar_peca(**kwargs):
+    n = next(_sequencia)
+    if "ordem_producao" not in kwargs:
+        kwargs["ordem_producao"] = criar_op(cliente=kwargs.get("cliente") or criar_cliente())
+    kwargs.setdefault("cliente", kwargs["ordem_producao"].cliente)
+    kwargs.setdefault("codigo", f"PC-{n:06}")
+    kwargs.setdefault("quantidade", 1)
+    return Peca.objects.create(**kwargs)
+
+
+def popular(clientes=3, ops=10, pecas_por_op=5, logs=20, usuario=None):
+    """
+    Gera clientes, OPs (distribuídas entre os clientes, com criador e
+    responsável), peças com metadados e logs de ação.
+    """
+    usuario = usuario or criar_usuario()
+    responsavel = criar_usuario()
+    base = next(_sequencia)
+    hoje = timezone.localdate()
+
+    lista_clientes = Cliente.objects.bulk_create(
+        Cliente(nome=f"Cliente {base}-{i}", contato="Compras") for i in range(clientes)
+    )
+    lista_ops = OrdemProducao.objects.bulk_create(
+        OrdemProducao(
+            codigo=f"NF-{base}-{i:05}",
+            cliente=lista_clientes[i % clientes],
+            criado_por=usuario,
+            responsavel=responsavel if i % 2 else None,
+            status=STATUS_OP[i % len(STATUS_OP)],
+            observacoes=f"Lote {i}",
+        )
+        for i in range(ops)
+    )
+    Peca.objects.bulk_create(
+        Peca(
+            ordem_producao=op,
+            cliente=op.cliente,
+            codigo=f"PC-{base}-{i:05}-{j:03}",
+            descricao=f"Eixo usinado {j}",
+            pedido=f"PED-{i}",
+            quantidade=j + 1,
+            data_entrega=hoje + timedelta(days=j - 2),
+            status=STATUS_PECA[j % len(STATUS_PECA)],
+            metadata={"material": "aço 1045", "espessura": j * 0.5},
+        )
+        for i, op in enumerate(lista_ops)
+        for j in range(pecas_por_op)
+    )
+    LogAcao.objects.bulk_create(
+        LogAcao(
+            usuario=usuario,
+            acao="atualizar",
+            alvo_tipo="ordem_producao",
+            alvo_id=lista_ops[i % ops].id,
+            detalhes={"status": {"de": "aberta", "para": "em_andamento"}},
+        )
+        for i in range(logs)
+    )
+    return lista_clientes, lista_ops
+
+
+def periodo_padrao():
+    """Período coberto pelos dados de popular() para os indicadores."""
+    hoje = date.today()
+    return hoje - timedelta(days=30), hoje
@@ -0,0 +1,104 @@
+import gc
+import runpy
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.urls import clear_url_caches, get_resolver
+from rest_framework.serializers import ModelSerializer
+
+from pecas.serializers import ClienteSerializer, PecaSerializer
+from producao.serializers import OrdemProducaoSerializer
+from usinasoft.aquecimento import aquecer
+
+ALIAS = "aquecimento"
+
+
+@pytest.fixture
+def conexao(django_db_blocker, monkeypatch, tmp_path):
+    # O banco de teste em memória nunca é fechado pelo Django (close() não faz nada),
+    # então a verificação usa uma conexão a um arquivo, fechada como a de produção
+    monkeypatch.setitem(
+        connections.settings,
+        ALIAS,
+        {**connections.settings["default"], "NAME": str(tmp_path / "aquecimento.sqlite3")},
+    )
+    with django_db_blocker.unblock():
+        yield connections[ALIAS]
+    connections[ALIAS].close()
+    del connections[ALIAS]
+
+
+@pytest.fixture
+def construidos(monkeypatch):
+    classes = []
+    original = ModelSerializer.get_fields
+
+    def get_fields(self):
+        classes.append(type(self))
+        return original(self)
+
+    monkeypatch.setattr(ModelSerializer, "get_fields", get_fields)
+    return classes
+
+
+@pytest.fixture
+def gunicorn_conf():
+    return runpy.run_path(str(Path(settings.BASE_DIR) / "gunicorn.conf.py"))
+
+
+def servidor(preload_app=True):
+    log = SimpleNamespace(info=lambda *args: None)
+    return SimpleNamespace(cfg=SimpleNamespace(preload_app=preload_app), log=log)
+
+
+def test_aquecimento_nao_acessa_o_banco():
+    # Sem o fixture db, qualquer acesso ao banco falha com RuntimeError
+    assert aquecer() > 0
+
+
+def test_aquecimento_monta_rotas_e_serializers(construidos):
+    clear_url_caches()
+    assert not get_resolver()._populated
+
+    aquecer()
+
+    resolver = get_resolver()
+    assert resolver._populated
+    assert resolver.reverse_dict.getlist("peca-list")
+    # Serializers das views, com os aninhados das relações expansíveis
+    assert {PecaSerializer, OrdemProducaoSerializer, ClienteSerializer} <= set(construidos)
+    assert construidos.count(OrdemProducaoSerializer) >= 2
+
+
+def test_aquecimento_fecha_as_conexoes(conexao):
+    conexao.ensure_connection()
+
+    aquecer()
+
+    assert conexao.connection is None
+
+
+def test_hooks_do_gunicorn_fecham_as_conexoes(conexao, gunicorn_conf):
+    conexao.ensure_connection()
+    try:
+        gunicorn_conf["when_ready"](servidor())
+    finally:
+        gc.unfreeze()
+    assert conexao.connection is None
+
+    conexao.ensure_connection()
+    gunicorn_conf["pre_fork"](servidor(), SimpleNamespace(pid=123))
+    assert conexao.connection is None
+
+
+def test_sem_preload_o_mestre_nao_aquece(gunicorn_conf, monkeypatch):
+    chamadas = []
+    monkeypatch.setattr("usinasoft.aquecimento.aquecer", lambda: chamadas.append(1) or 0)
+
+    gunicorn_conf["when_ready"](servidor(preload_app=False))
+    gunicorn_conf["post_worker_init"](servidor(preload_app=False))
+
+    assert chamadas == [1]
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from usinasoft.pagination import IteradorPagination
+from usuarios import arquivo_logs
+from usuarios.arquivo_logs import arquivar_dia, caminho_arquivo, ler_arquivo
+from usuarios.models import LogAcao
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def diretorio(settings, tmp_path):
+    settings.LOGS_ARQUIVO_DIR = str(tmp_path)
+    return tmp_path
+
+
+def criar_log(usuario, dias_atras, acao="atualizar"):
+    return LogAcao.objects.create(
+        usuario=usuario,
+        acao=acao,
+        alvo_tipo="peca",
+        detalhes={"campos": {"status": {"de": "em_fila", "para": "concluida"}}},
+        created_at=timezone.now() - timedelta(days=dias_atras),
+    )
+
+
+def dia(dias_atras):
+    return timezone.localdate() - timedelta(days=dias_atras)
+
+
+def test_prune_arquiva_so_o_que_passou_da_retencao(api_admin, usuario):
+    antigos = [criar_log(usuario, 200), criar_log(usuario, 200, "criar"), criar_log(usuario, 190)]
+    recente = criar_log(usuario, 10)
+    periodo = f"start={dia(201)}&end={dia(189)}"
+    no_banco = api_admin.get(f"/api/logs/?{periodo}").json()["results"]
+
+    call_command("prune_logs", dias=180, lote=2, stdout=StringIO())
+
+    assert list(LogAcao.objects.all()) == [recente]
+    assert caminho_arquivo(dia(200)).exists() and caminho_arquivo(dia(190)).exists()
+    resposta = api_admin.get(f"/api/logs/?origem=arquivo&{periodo}")
+    assert resposta.status_code == 200
+    # Mesmo formato e ordem da listagem do banco
+    assert resposta.json()["results"] == no_banco
+    assert {registro["id"] for registro in no_banco} == {str(log.id) for log in antigos}
+
+    filtrado = api_admin.get(f"/api/logs/?origem=arquivo&{periodo}&acao=criar").json()
+    assert [registro["id"] for registro in filtrado["results"]] == [str(antigos[1].id)]
+
+
+def test_dry_run_nao_altera_nada(usuario, diretorio):
+    criar_log(usuario, 200)
+    saida = StringIO()
+
+    call_command("prune_logs", dias=180, dry_run=True, stdout=saida)
+
+    assert "1 log(s)" in saida.getvalue()
+    assert LogAcao.objects.count() == 1
+    assert not any(diretorio.iterdir())
+
+
+def test_arquivamento_interrompido_nao_duplica_na_leitura(usuario):
+    log = criar_log(usuario, 200)
+    valores = {campo.attname: getattr(log, campo.attname) for campo in LogAcao._meta.fields}
+    arquivar_dia(dia(200))
+    # Como se a exclusão não tivesse acontecido: o registro volta e é arquivado de novo
+    LogAcao.objects.create(**valores)
+    criar_log(usuario, 200)
+
+    assert arquivar_dia(dia(200)) == 2
+
+    ids = [registro["id"] for registro in ler_arquivo(dia(200), dia(200))]
+    assert len(ids) == 2 and str(log.id) in ids
+
+
+def test_arquivo_lido_so_ate_completar_a_pagina(api_admin, usuario, monkeypatch):
+    monkeypatch.setattr(IteradorPagination, "page_size", 2)
+    logs = {dias: [criar_log(usuario, dias) for _ in range(2)] for dias in (200, 201, 202)}
+    call_command("prune_logs", dias=180, stdout=StringIO())
+    abertos = []
+    abrir = arquivo_logs.gzip.open
+
+    def registrar_abertura(caminho, *args, **kwargs):
+        abertos.append(caminho)
+        return abrir(caminho, *args, **kwargs)
+
+    monkeypatch.setattr(arquivo_logs.gzip, "open", registrar_abertura)
+    periodo = f"origem=arquivo&start={dia(202)}&end={dia(200)}"
+
+    primeira = api_admin.get(f"/api/logs/?{periodo}").json()
+    # O dia 201 só é aberto para saber se há próxima página; o 202 nem isso
+    assert abertos == [caminho_arquivo(dia(200)), caminho_arquivo(dia(201))]
+    assert set(primeira) == {"next", "previous", "results"}
+    assert [r["id"] for r in primeira["results"]] == [str(log.id) for log in logs[200][::-1]]
+    assert primeira["previous"] is None
+
+    segunda = api_admin.get(primeira["next"]).json()
+    assert [r["id"] for r in segunda["results"]] == [str(log.id) for log in logs[201][::-1]]
+    assert "page=" not in segunda["previous"]
+
+    terceira = api_admin.get(segunda["next"]).json()
+    assert terceira["next"] is None
+    assert api_admin.get(f"/api/logs/?{periodo}&page=4").status_code == 404
+    assert api_admin.get(f"/api/logs/?{periodo}&page=0").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "origem=arquivo",
+        "origem=arquivo&start=2024-02-01&end=2024-01-01",
+        "origem=arquivo&start=2024-01-01&end=2024-03-01",
+    ],
+)
+def test_periodo_do_arquivo_validado(api_admin, query):
+    assert api_admin.get(f"/api/logs/?{query}").status_code == 400
@@ -0,0 +1,163 @@
+import json
+import logging
+import uuid
+
+import pytest
+from django.db import OperationalError
+from django.utils import timezone
+
+from usinasoft.auditoria import GravadorAuditoria
+from usuarios.models import LogAcao
+
+from .factories import criar_peca, popular
+
+
+@pytest.mark.django_db
+def test_logs_restritos_a_administradores(api, api_admin, usuario):
+    popular(clientes=1, ops=1, pecas_por_op=1, logs=3, usuario=usuario)
+
+    assert api.get("/api/logs/").status_code == 403
+    assert api.get("/api/logs/?origem=arquivo&start=2024-01-01&end=2024-01-02").status_code == 403
+    resposta = api_admin.get("/api/logs/")
+    assert resposta.status_code == 200
+    assert resposta.json()["count"] == 3
+
+
+def test_logs_exigem_autenticacao(client):
+    assert client.get("/api/logs/", HTTP_HOST="localhost").status_code == 401
+
+
+def _registro(**kwargs):
+    registro = {
+        "usuario_id": None,
+        "acao": "atualizar",
+        "alvo_tipo": "peca",
+        "alvo_id": uuid.uuid4(),
+        "detalhes": {"campos": {}},
+        "created_at": timezone.now(),
+    }
+    registro.update(kwargs)
+    return registro
+
+
+# Sem a transação do teste: a gravação roda em autocommit, como na thread de gravação
+@pytest.mark.django_db(transaction=True)
+def test_registro_invalido_nao_bloqueia_o_lote(caplog):
+    gravador = GravadorAuditoria()
+    validos = [_registro() for _ in range(5)]
+    invalido = _registro(detalhes={"valor": object()})  # Não serializável em JSON
+
+    with caplog.at_level(logging.ERROR, logger="usinasoft.auditoria.descartes"):
+        falhas = gravador._gravar(validos[:2] + [invalido] + validos[2:])
+
+    assert falhas == []
+    assert set(LogAcao.objects.values_list("alvo_id", flat=True)) == {
+        registro["alvo_id"] for registro in validos
+    }
+    descartes = [r for r in caplog.records if r.name == "usinasoft.auditoria.descartes"]
+    assert len(descartes) == 1
+    assert json.loads(descartes[0].getMessage())["alvo_id"] == str(invalido["alvo_id"])
+
+
+def test_tentativas_limitadas(settings, caplog):
+    settings.AUDITORIA_MAX_TENTATIVAS = 3
+    gravador = GravadorAuditoria()
+    registro = _registro()
+
+    with caplog.at_level(logging.ERROR, logger="usinasoft.auditoria.descartes"):
+        for _ in range(2):
+            lote, gravador._buffer = gravador._buffer, []
+            gravador._devolver(lote or [registro])
+        assert gravador._buffer == [registro]
+        lote, gravador._buffer = gravador._buffer, []
+        gravador._devolver(lote)
+
+    assert gravador._buffer == []
+    assert [r.name for r in caplog.records].count("usinasoft.auditoria.descartes") == 1
+
+
+def test_falhas_voltam_para_o_fim_do_buffer(settings):
+    settings.AUDITORIA_LIMITE_BUFFER = 3
+    gravador = GravadorAuditoria()
+    novos = [_registro(), _registro()]
+    gravador._buffer = list(novos)
+    falhas = [_registro(), _registro()]
+
+    gravador._devolver(falhas)
+
+    # Os registros mais novos continuam na frente; o excedente é descartado
+    assert gravador._buffer == novos + falhas[:1]
+
+
+@pytest.fixture
+def assincrona(settings):
+    settings.AUDITORIA_ASSINCRONA = True
+    settings.AUDITORIA_INTERVALO = 60
+    settings.AUDITORIA_TAMANHO_LOTE = 5
+    return settings
+
+
+@pytest.mark.django_db(transaction=True)
+def test_thread_grava_em_lote_e_encerramento_descarrega(assincrona):
+    gravador = GravadorAuditoria()
+    registros = [_registro() for _ in range(7)]
+
+    for registro in registros[:4]:
+        gravador.registrar(registro)
+    # Abaixo do tamanho do lote nada é gravado no caminho da requisição
+    assert not LogAcao.objects.exists()
+
+    for registro in registros[4:]:
+        gravador.registrar(registro)
+    gravador.encerrar()
+
+    assert not gravador._thread.is_alive()
+    assert LogAcao.objects.count() == 7
+
+
+@pytest.mark.django_db(transaction=True)
+def test_buffer_cheio_grava_na_hora(assincrona):
+    assincrona.AUDITORIA_LIMITE_BUFFER = 2
+    gravador = GravadorAuditoria()
+
+    for _ in range(3):
+        gravador.registrar(_registro())
+
+    assert LogAcao.objects.count() == 1
+    assert len(gravador._buffer) == 2
+    gravador.encerrar()
+    assert LogAcao.objects.count() == 3
+
+
+def test_banco_indisponivel_devolve_o_lote(monkeypatch):
+    def falhar(*args, **kwargs):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(LogAcao.objects, "bulk_create", falhar)
+    lote = [_registro(), _registro()]
+
+    assert GravadorAuditoria()._gravar(lote) == lote
+
+
+@pytest.mark.django_db
+def test_alteracao_pela_api_registra_autor_e_campos(
+    api, usuario, django_capture_on_commit_callbacks
+):
+    peca = criar_peca(descricao="Eixo")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api.patch(f"/api/pecas/{peca.id}/", {"descricao": "Eixo 2"}, format="json")
+
+    log = LogAcao.objects.get(acao="atualizar", alvo_tipo="peca", alvo_id=peca.id)
+    assert log.usuario_id == usuario.id
+    assert log.detalhes["campos"] == {"descricao": {"de": "Eixo", "para": "Eixo 2"}}
+
+
+@pytest.mark.django_db
+def test_senha_nao_vai_para_o_log(usuario, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        usuario.set_password("nova-senha")
+        usuario.save()
+
+    log = LogAcao.objects.get(acao="atualizar", alvo_tipo="usuario")
+    assert log.detalhes["campos"]["password"] == {"de": "***", "para": "***"}
@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from busca.apps import recriar_fts_sqlite
+from busca.consultas import FONTES, _buscar_generico, buscar, termos_busca
+
+from .factories import criar_cliente, criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def dados():
+    cliente = criar_cliente(nome="Metalúrgica Horizonte")
+    op = criar_op(codigo="NF-2024-1234", cliente=cliente, observacoes="Entrega urgente")
+    return {
+        "exata": criar_peca(ordem_producao=op, codigo="EIXO-1234", descricao="Eixo retificado"),
+        "texto": criar_peca(ordem_producao=op, codigo="FL-77", descricao="Flange com eixo curto"),
+        "outra": criar_peca(ordem_producao=op, codigo="BU-9", descricao="Bucha de bronze"),
+        "op": op,
+        "cliente": cliente,
+    }
+
+
+def ids(resultados, tipo=None):
+    return [r["id"] for r in resultados if tipo is None or r["tipo"] == tipo]
+
+
+def contar_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'busca_fts_%'"
+        )
+        return cursor.fetchone()[0]
+
+
+def test_trecho_de_codigo_em_pecas_e_ops(api, dados):
+    resposta = api.get("/api/search/?q=1234")
+
+    assert resposta.status_code == 200
+    resultados = resposta.json()["results"]
+    assert ids(resultados, "peca") == [str(dados["exata"].id)]
+    assert ids(resultados, "ordem_producao") == [str(dados["op"].id)]
+
+
+def test_palavras_do_texto_livre_e_relevancia(dados):
+    resultados = buscar("eixo", tipos=["peca"])
+
+    # O código que contém o termo fica à frente da descrição que só o menciona
+    assert ids(resultados) == [dados["exata"].id, dados["texto"].id]
+    assert ids(buscar("horizonte", tipos=["cliente"])) == [dados["cliente"].id]
+
+
+def test_triggers_acompanham_alteracoes_e_exclusoes(dados):
+    dados["outra"].descricao = "Bucha de latão"
+    dados["outra"].save()
+    dados["texto"].delete()
+
+    assert ids(buscar("latão", tipos=["peca"])) == [dados["outra"].id]
+    assert ids(buscar("bronze", tipos=["peca"])) == []
+    assert ids(buscar("flange", tipos=["peca"])) == []
+
+
+def test_busca_nao_executa_ddl(dados):
+    with CaptureQueriesContext(connection) as contexto:
+        buscar("eixo")
+
+    assert contexto.captured_queries
+    assert all(consulta["sql"].startswith("SELECT") for consulta in contexto.captured_queries)
+
+
+def test_post_migrate_recria_triggers_descartados(dados):
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER busca_fts_peca_ai")
+    assert contar_triggers() == 3 * len(FONTES) - 1
+
+    recriar_fts_sqlite(using="default")
+
+    assert contar_triggers() == 3 * len(FONTES)
+    nova = criar_peca(ordem_producao=dados["op"], descricao="Engrenagem helicoidal")
+    assert ids(buscar("helicoidal", tipos=["peca"])) == [nova.id]
+
+
+def test_backend_generico_encontra_os_mesmos_registros(dados):
+    for q in ("1234", "eixo", "horizonte"):
+        genericos = []
+        for fonte in FONTES:
+            genericos.extend(_buscar_generico(fonte, q, termos_busca(q), 20))
+        assert sorted(map(str, ids(genericos))) == sorted(map(str, ids(buscar(q))))
+
+
+@pytest.mark.parametrize("query", ["q=ab", "q=eixo&tipos=peca,usuario", "q=eixo&limit=dez"])
+def test_parametros_invalidos(api, query):
+    assert api.get(f"/api/search/?{query}").status_code == 400
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def op():
+    op = criar_op(codigo="NF-CAMPOS")
+    criar_peca(ordem_producao=op, codigo="PC-1", descricao="Eixo", status="concluida")
+    criar_peca(ordem_producao=op, codigo="PC-2", descricao="Flange")
+    return op
+
+
+def consultar(api, url):
+    with CaptureQueriesContext(connection) as contexto:
+        resposta = api.get(url)
+    assert resposta.status_code == 200, resposta.content
+    return resposta.json(), " ".join(consulta["sql"] for consulta in contexto.captured_queries)
+
+
+def test_fields_limita_resposta_e_colunas(api, op):
+    dados, sql = consultar(api, "/api/pecas/?fields=id,codigo")
+
+    assert [set(peca) for peca in dados["results"]] == [{"id", "codigo"}] * 2
+    assert '"pecas_peca"."descricao"' not in sql
+
+    peca = dados["results"][0]
+    detalhe, _ = consultar(api, f"/api/pecas/{peca['id']}/?fields=codigo,status")
+    assert set(detalhe) == {"codigo", "status"}
+
+
+def test_expand_devolve_relacoes_como_objetos(api, op):
+    dados, _ = consultar(api, "/api/pecas/?fields=codigo&expand=cliente,ordem_producao")
+
+    peca = dados["results"][0]
+    assert set(peca) == {"codigo", "cliente", "ordem_producao"}
+    assert peca["cliente"]["id"] == str(op.cliente_id)
+    assert peca["cliente"]["nome"] == op.cliente.nome
+    assert peca["ordem_producao"]["codigo"] == "NF-CAMPOS"
+    # A OP expandida na peça não traz os totais de peças
+    assert "total_pecas" not in peca["ordem_producao"]
+
+    detalhe, _ = consultar(api, f"/api/ops/{op.id}/?expand=cliente")
+    assert detalhe["cliente"]["nome"] == op.cliente.nome
+    assert detalhe["total_pecas"] == 2
+
+
+def test_expand_nao_multiplica_consultas(api, op):
+    contagens = []
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as contexto:
+            api.get("/api/pecas/?expand=cliente,ordem_producao")
+        contagens.append(len(contexto.captured_queries))
+        for indice in range(5):
+            criar_peca(codigo=f"EXTRA-{indice}-{len(contagens)}")
+
+    assert contagens[0] == contagens[1]
+
+
+def test_totais_da_op_so_quando_pedidos(api, op):
+    dados, sql = consultar(api, "/api/ops/?fields=id,codigo,status")
+    assert set(dados["results"][0]) == {"id", "codigo", "status"}
+    assert 'JOIN "pecas_peca"' not in sql
+
+    dados, sql = consultar(api, "/api/ops/?fields=codigo,total_pecas,pecas_concluidas")
+    assert 'JOIN "pecas_peca"' in sql
+    assert dados["results"][0] == {"codigo": "NF-CAMPOS", "total_pecas": 2, "pecas_concluidas": 1}
+
+
+@pytest.mark.parametrize(
+    "query", ["fields=id,preco", "expand=usuario", "fields=codigo&expand=criado_por"]
+)
+def test_campos_e_relacoes_invalidos(api, op, query):
+    resposta = api.get(f"/api/pecas/?{query}")
+    assert resposta.status_code == 400
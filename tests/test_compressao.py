@@ -0,0 +1,84 @@
+import gzip
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from usinasoft import compressao
+from usinasoft.compressao import CompressaoMiddleware
+
+CORPO = json.dumps([{"codigo": f"PC-{i:04}", "status": "em_fila"} for i in range(100)]).encode()
+
+
+@pytest.fixture
+def brotli(monkeypatch):
+    """Substitui o pacote brotli (opcional) por um compressor de marcação conhecida."""
+    falso = SimpleNamespace(compress=lambda dados, quality: b"BR" + zlib.compress(dados))
+    monkeypatch.setattr(compressao, "brotli", falso)
+    return falso
+
+
+def comprimir(resposta, aceita="gzip, deflate, br"):
+    request = RequestFactory().get("/api/pecas/", HTTP_ACCEPT_ENCODING=aceita)
+    return CompressaoMiddleware(lambda request: resposta)(request)
+
+
+def json_(corpo=CORPO, **cabecalhos):
+    return HttpResponse(corpo, content_type="application/json", headers=cabecalhos)
+
+
+def test_brotli_quando_aceito(brotli):
+    resposta = comprimir(json_(ETag='"abc"'))
+
+    assert resposta["Content-Encoding"] == "br"
+    assert zlib.decompress(resposta.content[2:]) == CORPO
+    assert resposta["Content-Length"] == str(len(resposta.content))
+    assert "Accept-Encoding" in resposta["Vary"]
+    assert resposta["ETag"] == 'W/"abc"'
+
+
+@pytest.mark.parametrize("com_brotli", [True, False])
+def test_gzip_sem_brotli_no_cliente_ou_no_servidor(monkeypatch, brotli, com_brotli):
+    if not com_brotli:
+        monkeypatch.setattr(compressao, "brotli", None)
+    aceita = "gzip" if com_brotli else "gzip, br"
+
+    resposta = comprimir(json_(), aceita=aceita)
+
+    assert resposta["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resposta.content) == CORPO
+    assert "Accept-Encoding" in resposta["Vary"]
+
+
+def test_html_nunca_usa_brotli(brotli):
+    resposta = comprimir(HttpResponse(CORPO, content_type="text/html; charset=utf-8"))
+
+    assert resposta["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resposta.content) == CORPO
+
+
+def test_resposta_pequena_nao_e_comprimida(brotli, settings):
+    settings.COMPRESSAO_TAMANHO_MINIMO = len(CORPO) + 1
+
+    resposta = comprimir(json_())
+
+    assert not resposta.has_header("Content-Encoding")
+    assert resposta.content == CORPO
+
+
+def test_streaming_usa_gzip(brotli):
+    partes = [CORPO[:500], CORPO[500:]]
+    resposta = comprimir(StreamingHttpResponse(partes, content_type="application/json"))
+
+    assert resposta["Content-Encoding"] == "gzip"
+    assert gzip.decompress(b"".join(resposta.streaming_content)) == CORPO
+
+
+def test_resposta_ja_codificada_fica_como_esta(brotli):
+    resposta = comprimir(json_(b"x" * 2048, **{"Content-Encoding": "identity"}))
+
+    assert resposta["Content-Encoding"] == "identity"
+    assert resposta.content == b"x" * 2048
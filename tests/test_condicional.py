@@ -0,0 +1,121 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from pecas.models import Peca
+from producao.models import OrdemProducao
+from sincronizacao.models import RegistroExclusao
+from usinasoft import condicional
+
+from .factories import criar_op, criar_peca, popular
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def op():
+    op = criar_op()
+    criar_peca(ordem_producao=op)
+    criar_peca(ordem_producao=op)
+    return op
+
+
+def adiantar_relogio(monkeypatch, segundos):
+    # Relógio do mixin a `segundos` da última alteração das peças
+    ultima = max(peca.updated_at for peca in Peca.objects.all()).timestamp()
+    monkeypatch.setattr(condicional.time, "time", lambda: ultima + segundos)
+
+
+def test_exclusao_de_peca_muda_etag_e_last_modified(api, op, monkeypatch):
+    adiantar_relogio(monkeypatch, 5)
+    url = f"/api/ops/{op.id}/"
+    primeira = api.get(url)
+    assert primeira["Last-Modified"]
+
+    # A exclusão não muda nenhum updated_at da OP; o tombstone muda o validador
+    Peca.objects.filter(ordem_producao=op).first().delete()
+    # Como se a exclusão tivesse acontecido depois da primeira resposta
+    RegistroExclusao.objects.update(excluido_em=F("excluido_em") + timedelta(seconds=6))
+    adiantar_relogio(monkeypatch, 10)
+
+    resposta = api.get(url, HTTP_IF_NONE_MATCH=primeira["ETag"])
+    assert resposta.status_code == 200
+    assert resposta.json()["total_pecas"] == 1
+
+    resposta = api.get(url, HTTP_IF_MODIFIED_SINCE=primeira["Last-Modified"])
+    assert resposta.status_code == 200
+    assert resposta["Last-Modified"] != primeira["Last-Modified"]
+
+
+def test_last_modified_omitido_no_mesmo_segundo(api, op, monkeypatch):
+    url = f"/api/ops/{op.id}/"
+    # Alteração no segundo corrente: outra alteração no mesmo segundo teria o mesmo valor
+    adiantar_relogio(monkeypatch, 0)
+    resposta = api.get(url, HTTP_IF_MODIFIED_SINCE=http_date(condicional.time.time() + 60))
+    assert resposta.status_code == 200
+    assert "Last-Modified" not in resposta
+
+    adiantar_relogio(monkeypatch, 5)
+    resposta = api.get(url)
+    assert resposta["Last-Modified"]
+    assert api.get(url, HTTP_IF_MODIFIED_SINCE=resposta["Last-Modified"]).status_code == 304
+
+
+def test_etag_da_lista_muda_com_peca_alterada(api, op):
+    primeira = api.get("/api/ops/")
+
+    peca = Peca.objects.filter(ordem_producao=op).first()
+    peca.descricao = "Revisada"
+    peca.save()
+
+    assert api.get("/api/ops/", HTTP_IF_NONE_MATCH=primeira["ETag"]).status_code == 200
+
+
+def test_304_da_lista_consulta_so_a_pagina(api, op):
+    resposta = api.get("/api/ops/")
+
+    with CaptureQueriesContext(connection) as contexto:
+        assert api.get("/api/ops/", HTTP_IF_NONE_MATCH=resposta["ETag"]).status_code == 304
+    # Ids da página com o total (janela) e as datas só desses registros
+    ids_pagina, datas = (consulta["sql"] for consulta in contexto.captured_queries)
+    assert "OVER ()" in ids_pagina and "LIMIT 100" in ids_pagina
+    assert "pecas_peca" not in ids_pagina
+    assert 'JOIN "pecas_peca"' not in datas
+    assert f"IN ('{op.id.hex}')" in datas
+
+
+def test_304_do_detalhe_em_uma_consulta(api, op, django_assert_num_queries):
+    resposta = api.get(f"/api/ops/{op.id}/")
+
+    with django_assert_num_queries(1):
+        assert api.get(f"/api/ops/{op.id}/", HTTP_IF_NONE_MATCH=resposta["ETag"]).status_code == 304
+
+
+def test_etag_da_pagina_ignora_as_outras_paginas(api, usuario):
+    popular(clientes=1, ops=101, pecas_por_op=1, logs=0, usuario=usuario)
+    mais_antiga = OrdemProducao.objects.order_by("created_at", "id").first()
+    primeira = api.get("/api/ops/")
+    segunda = api.get("/api/ops/?page=2")
+    assert [op["id"] for op in segunda.json()["results"]] == [str(mais_antiga.id)]
+
+    mais_antiga.observacoes = "Revisada"
+    mais_antiga.save()
+
+    assert api.get("/api/ops/", HTTP_IF_NONE_MATCH=primeira["ETag"]).status_code == 304
+    assert api.get("/api/ops/?page=2", HTTP_IF_NONE_MATCH=segunda["ETag"]).status_code == 200
+
+    # Uma OP nova muda o total e desloca a página
+    criar_op()
+    assert api.get("/api/ops/", HTTP_IF_NONE_MATCH=primeira["ETag"]).status_code == 200
+
+
+def test_pagina_inexistente_segue_sem_etag(api, op):
+    assert api.get("/api/ops/?page=9").status_code == 404
+    resposta = api.get("/api/ops/?page=last")
+    assert resposta.status_code == 200
+    assert "ETag" not in resposta
@@ -0,0 +1,210 @@
+"""
+Limite de consultas SQL por endpoint.
+
+Cada ação (lista, detalhe, criação e atualização) dos viewsets registrados nos
+routers e o /api/indicadores/summary/ têm um teto fixo de consultas, medido
+com volumes acima do tamanho da página e com os callbacks de on_commit
+executados (auditoria, invalidação dos indicadores, eventos). Nas listas o
+número de consultas também não pode crescer com o volume: uma consulta por
+linha (propriedades do modelo, relações sem select_related) quebra o teste.
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pecas.models import Peca
+from usuarios.models import LogAcao
+
+from .factories import popular
+
+# Listas: count da paginação + página (+ relações em lote via prefetch); com ETag,
+# mais os ids da página com o total e as datas dos registros da página
+LIMITES_LISTA = {
+    "/api/usuarios/": 2,
+    "/api/logs/": 2,
+    "/api/clientes/": 4,
+    "/api/pecas/": 4,
+    "/api/ops/": 4,
+    # Consolidação em uso? + OPs por status + duração média + total e peças por status
+    "/api/indicadores/summary/": 5,
+}
+
+# Summary somando a consolidação com um dia pendente: pendências (leitura e remoção),
+# recálculo do dia (2 agregações, savepoint, remoção e inserção das linhas, release)
+# e as 2 somas da consolidação
+LIMITE_SUMMARY_CONSOLIDADO = 10
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    # Os indicadores ficam em cache entre requisições; cada teste mede o cálculo
+    caches["default"].clear()
+
+
+@pytest.fixture
+def volume(usuario):
+    """Volume acima do tamanho da página (100) em peças e logs."""
+    clientes, ops = popular(clientes=4, ops=60, pecas_por_op=3, logs=150, usuario=usuario)
+    return {
+        "cliente": clientes[0],
+        "op": ops[1],
+        "peca": Peca.objects.filter(ordem_producao=ops[1]).first(),
+        "log": LogAcao.objects.first(),
+    }
+
+
+def contar_consultas(api, metodo, url, dados=None):
+    with CaptureQueriesContext(connection) as contexto:
+        if dados is None:
+            resposta = getattr(api, metodo)(url)
+        else:
+            resposta = getattr(api, metodo)(url, dados, format="json")
+    assert resposta.status_code < 300, resposta.content
+    return len(contexto.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", list(LIMITES_LISTA))
+def test_lista_nao_depende_do_volume(api, api_admin, usuario, url):
+    if url == "/api/logs/":
+        api = api_admin
+    popular(clientes=1, ops=2, pecas_por_op=1, logs=2, usuario=usuario)
+    poucos = contar_consultas(api, "get", url)
+
+    caches["default"].clear()
+    popular(clientes=4, ops=60, pecas_por_op=3, logs=150, usuario=usuario)
+    muitos = contar_consultas(api, "get", url)
+
+    assert muitos <= LIMITES_LISTA[url]
+    assert muitos == poucos, f"{url}: {poucos} consultas com poucos registros, {muitos} com muitos"
+
+
+# (id, método, url, corpo, limite); {chave} é preenchido com os registros do volume.
+# "Auditoria" é o INSERT do LogAcao (síncrono nos testes); "consolidação" é a verificação
+# de uso da ProducaoDiaria ou, com ela em uso, o registro do dia pendente.
+CASOS = [
+    # Registro
+    ("usuario-detalhe", "get", "/api/usuarios/{usuario}/", None, 1),
+    # E-mail único + INSERT + auditoria
+    (
+        "usuario-criar",
+        "post",
+        "/api/usuarios/",
+        {"email": "novo@x.com", "password": "x1234567"},
+        3,
+    ),
+    # Registro + UPDATE + auditoria
+    ("usuario-atualizar", "patch", "/api/usuarios/{usuario}/", {"first_name": "Bia"}, 3),
+    # Registro
+    ("log-detalhe", "get", "/api/logs/{log}/", None, 1),
+    # Registro + contagem de OPs
+    ("cliente-detalhe", "get", "/api/clientes/{cliente}/", None, 2),
+    # INSERT + auditoria
+    ("cliente-criar", "post", "/api/clientes/", {"nome": "Novo Cliente"}, 2),
+    # Registro + UPDATE + auditoria
+    ("cliente-atualizar", "patch", "/api/clientes/{cliente}/", {"nome": "Renomeado"}, 3),
+    # Registro com OP e cliente + metadados
+    ("peca-detalhe", "get", "/api/pecas/{peca}/", None, 2),
+    # Cliente + código único + OP pelo código + INSERT + status da OP + auditoria
+    # + consolidação
+    (
+        "peca-criar",
+        "post",
+        "/api/pecas/",
+        {
+            "ordem_producao_codigo": "{op_codigo}",
+            "cliente": "{cliente}",
+            "codigo": "PC-NOVA",
+            "quantidade": 2,
+        },
+        7,
+    ),
+    # Registro + UPDATE + status da OP + auditoria + consolidação
+    ("peca-atualizar", "patch", "/api/pecas/{peca}/", {"status": "concluida"}, 5),
+    # Registro com cliente e usuários + contagem de peças
+    ("op-detalhe", "get", "/api/ops/{op}/", None, 2),
+    # Código único + cliente + INSERT + auditoria + consolidação
+    ("op-criar", "post", "/api/ops/", {"codigo": "OP-NOVA", "cliente": "{cliente}"}, 5),
+    # Registro + UPDATE + auditoria + consolidação
+    ("op-atualizar", "patch", "/api/ops/{op}/", {"observacoes": "Revisada"}, 4),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "metodo,url,dados,limite", [caso[1:] for caso in CASOS], ids=[caso[0] for caso in CASOS]
+)
+def test_limite_consultas(
+    api,
+    api_admin,
+    usuario,
+    volume,
+    metodo,
+    url,
+    dados,
+    limite,
+    django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    valores = {
+        "usuario": usuario.id,
+        "cliente": volume["cliente"].id,
+        "op": volume["op"].id,
+        "op_codigo": volume["op"].codigo,
+        "peca": volume["peca"].id,
+        "log": volume["log"].id,
+    }
+    if url.startswith("/api/logs/"):
+        api = api_admin
+    url = url.format(**valores)
+    if dados is not None:
+        dados = {
+            chave: valor.format(**valores) if isinstance(valor, str) else valor
+            for chave, valor in dados.items()
+        }
+
+    with django_assert_max_num_queries(limite):
+        with django_capture_on_commit_callbacks(execute=True):
+            if dados is None:
+                resposta = getattr(api, metodo)(url)
+            else:
+                resposta = getattr(api, metodo)(url, dados, format="json")
+    assert resposta.status_code < 300, resposta.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("consolidado", [False, True], ids=["ao-vivo", "consolidado"])
+def test_indicadores_depois_de_alteracao(
+    api,
+    volume,
+    consolidado,
+    django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    # A gravação invalida o cache; o recálculo reflete a alteração dentro do teto
+    limite = LIMITES_LISTA["/api/indicadores/summary/"]
+    if consolidado:
+        call_command("rebuild_rollups", full=True, stdout=StringIO())
+        limite = LIMITE_SUMMARY_CONSOLIDADO
+    antes = api.get("/api/indicadores/summary/").json()
+
+    peca = Peca.objects.filter(status="em_fila").first()
+    with django_capture_on_commit_callbacks(execute=True):
+        resposta = api.patch(f"/api/pecas/{peca.id}/", {"status": "concluida"}, format="json")
+    assert resposta.status_code == 200, resposta.content
+
+    with django_assert_max_num_queries(limite):
+        resposta = api.get("/api/indicadores/summary/")
+    assert resposta.status_code == 200
+    depois = resposta.json()
+
+    por_status_antes = antes["pecas"]["por_status"]
+    por_status_depois = depois["pecas"]["por_status"]
+    assert depois["pecas"]["total"] == antes["pecas"]["total"]
+    assert por_status_depois["em_fila"] == por_status_antes["em_fila"] - 1
+    assert por_status_depois["concluida"] == por_status_antes.get("concluida", 0) + 1
@@ -0,0 +1,246 @@
+import asyncio
+import json
+
+import pytest
+from django.db import IntegrityError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from pecas.models import Peca
+from usinasoft import eventos, sse
+from usinasoft.eventos import AssinaturaRedis, BackendLocal
+
+from .factories import criar_cliente, criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+def resumo(evento):
+    chaves = ("tipo", "codigo", "status_anterior", "status")
+    return tuple(evento.get(chave) for chave in chaves)
+
+
+def test_importacao_publica_criacoes_antes_do_status_da_op(
+    backend, django_capture_on_commit_callbacks
+):
+    cliente = criar_cliente()
+    existente = criar_op(codigo="NF-EXISTENTE", cliente=cliente)
+    backend.eventos.clear()
+    itens = [
+        {"cliente": cliente, "ordem_producao_codigo": "NF-NOVA", "codigo": "PC-1", "quantidade": 1},
+        {
+            "cliente": cliente,
+            "ordem_producao_codigo": "NF-NOVA",
+            "codigo": "PC-2",
+            "quantidade": 2,
+            "status": "em_andamento",
+        },
+        {
+            "cliente": cliente,
+            "ordem_producao_codigo": existente.codigo,
+            "codigo": "PC-3",
+            "quantidade": 1,
+        },
+    ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        pecas, _ = Peca.objects.importar_em_lote(itens)
+
+    nova = pecas[0].ordem_producao
+    assert [resumo(evento) for evento in backend.eventos] == [
+        ("ordem_producao.status", "NF-NOVA", None, "aberta"),
+        ("peca.status", "PC-1", None, "em_fila"),
+        ("peca.status", "PC-2", None, "em_andamento"),
+        ("peca.status", "PC-3", None, "em_fila"),
+        # Só a OP nova muda de status; a criação não é publicada de novo
+        ("ordem_producao.status", "NF-NOVA", "aberta", "em_andamento"),
+    ]
+    criacao_op, criacao_peca = backend.eventos[0], backend.eventos[1]
+    assert criacao_op["ordem_producao"] == str(nova.id)
+    assert criacao_peca["peca"] == str(pecas[0].id)
+    assert criacao_peca["ordem_producao"] == str(nova.id)
+    assert len({evento["id"] for evento in backend.eventos}) == len(backend.eventos)
+
+
+def test_transacao_desfeita_nao_publica(backend, django_capture_on_commit_callbacks):
+    cliente = criar_cliente()
+    backend.eventos.clear()
+    item = {"cliente": cliente, "ordem_producao_codigo": "NF-1", "codigo": "PC-1", "quantidade": 1}
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(IntegrityError):
+            # Código de peça repetido: a importação inteira é desfeita
+            Peca.objects.importar_em_lote([item, dict(item)])
+
+    assert callbacks == []
+    assert backend.eventos == []
+
+
+def test_assinatura_local_devolve_none_no_heartbeat():
+    async def cenario():
+        backend = BackendLocal()
+        async with backend.assinar() as assinatura:
+            assert await assinatura.proximo(0.01) is None
+            backend.publicar({"id": "1", "tipo": "peca.status"})
+            return await assinatura.proximo(1)
+
+    assert asyncio.run(cenario()) == {"id": "1", "tipo": "peca.status"}
+
+
+class PubSubFalso:
+    """Imita o get_message do redis.asyncio: mensagens enfileiradas ou None no timeout."""
+
+    def __init__(self, mensagens):
+        self.mensagens = list(mensagens)
+        self.timeouts = []
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        self.timeouts.append(timeout)
+        if not self.mensagens:
+            await asyncio.sleep(timeout)
+            return None
+        mensagem = self.mensagens.pop(0)
+        if ignore_subscribe_messages and mensagem["type"] == "subscribe":
+            return None
+        return mensagem
+
+
+def test_assinatura_redis_usa_get_message_com_timeout():
+    pubsub = PubSubFalso(
+        [
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": json.dumps({"id": "1", "tipo": "peca.status"})},
+        ]
+    )
+    assinatura = AssinaturaRedis("redis://localhost", "canal")
+    assinatura._pubsub = pubsub
+
+    async def cenario():
+        evento = await assinatura.proximo(1)
+        vazio = await assinatura.proximo(0.02)
+        return evento, vazio
+
+    assert asyncio.run(cenario()) == ({"id": "1", "tipo": "peca.status"}, None)
+    assert all(0 < timeout <= 1 for timeout in pubsub.timeouts)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_entrega_evento_e_heartbeat(usuario, monkeypatch):
+    monkeypatch.setattr(eventos, "_backend", BackendLocal())
+    monkeypatch.setattr(sse, "INTERVALO_HEARTBEAT", 0.05)
+    escopo = {
+        "type": "http",
+        "method": "GET",
+        "path": sse.CAMINHO_EVENTOS,
+        "query_string": f"token={AccessToken.for_user(usuario)}&tipos=peca.status".encode(),
+        "headers": [],
+    }
+    evento = {"id": "abc", "tipo": "peca.status", "peca": "1", "status": "concluida"}
+
+    async def cenario():
+        enviados = []
+        desconectado = asyncio.Event()
+
+        async def receive():
+            await desconectado.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(mensagem):
+            enviados.append(mensagem)
+            corpo = mensagem.get("body", b"")
+            if corpo == b": conectado\n\n":
+                eventos.get_backend().publicar({"id": "x", "tipo": "ordem_producao.status"})
+                eventos.get_backend().publicar(evento)
+            elif corpo == b": ping\n\n":
+                desconectado.set()
+
+        await asyncio.wait_for(sse.aplicacao_eventos(escopo, receive, send), 5)
+        return enviados
+
+    enviados = asyncio.run(cenario())
+
+    assert enviados[0]["status"] == 200
+    corpos = [mensagem["body"] for mensagem in enviados[1:]]
+    assert corpos[0] == b": conectado\n\n"
+    assert corpos[1] == sse._formatar(evento)
+    assert corpos[2] == b": ping\n\n"
+
+
+def test_patch_publica_so_mudancas_de_status(api, backend, django_capture_on_commit_callbacks):
+    peca = criar_peca()
+    backend.eventos.clear()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api.patch(f"/api/pecas/{peca.id}/", {"descricao": "Revisada"}, format="json")
+    assert backend.eventos == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api.patch(f"/api/pecas/{peca.id}/", {"status": "em_andamento"}, format="json")
+    assert [resumo(evento) for evento in backend.eventos] == [
+        ("peca.status", peca.codigo, "em_fila", "em_andamento"),
+        ("ordem_producao.status", peca.ordem_producao.codigo, "aberta", "em_andamento"),
+    ]
+
+
+def test_evento_nao_sai_antes_do_commit(backend, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        criar_op()
+    assert backend.eventos == []
+
+    for callback in callbacks:
+        callback()
+    assert [evento["tipo"] for evento in backend.eventos] == ["ordem_producao.status"]
+
+
+def responder(escopo):
+    enviados = []
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        enviados.append(mensagem)
+
+    asyncio.run(sse.aplicacao_eventos(escopo, receive, send))
+    return enviados[0]["status"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_exige_token_valido(usuario):
+    escopo = {"type": "http", "method": "GET", "path": sse.CAMINHO_EVENTOS, "headers": []}
+    token = str(AccessToken.for_user(usuario))
+
+    assert responder({**escopo, "query_string": b""}) == 401
+    assert responder({**escopo, "query_string": b"token=invalido"}) == 401
+    assert responder({**escopo, "method": "POST", "query_string": b""}) == 405
+    usuario.is_active = False
+    usuario.save()
+    assert responder({**escopo, "headers": [(b"authorization", f"Bearer {token}".encode())]}) == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_autenticacao_fecha_a_conexao_antes_e_depois(usuario, monkeypatch):
+    chamadas = []
+    obter_usuario = sse.JWTAuthentication.get_user
+
+    def get_user(self, validado):
+        chamadas.append("consulta")
+        return obter_usuario(self, validado)
+
+    monkeypatch.setattr(sse, "close_old_connections", lambda: chamadas.append("fechar"))
+    monkeypatch.setattr(sse.JWTAuthentication, "get_user", get_user)
+
+    assert asyncio.run(sse._autenticar(str(AccessToken.for_user(usuario)))) == usuario
+    assert chamadas == ["fechar", "consulta", "fechar"]
+
+    chamadas.clear()
+    assert asyncio.run(sse._autenticar("invalido")) is None
+    assert chamadas == ["fechar", "fechar"]
+
+
+def test_filtro_por_tipo_e_op():
+    evento = {"tipo": "peca.status", "ordem_producao": "op-1"}
+
+    assert sse._aceita(evento, set(), None)
+    assert sse._aceita(evento, {"peca.status"}, "op-1")
+    assert not sse._aceita(evento, {"ordem_producao.status"}, None)
+    assert not sse._aceita(evento, set(), "op-2")
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from pecas.models import Peca
+from pecas.views import PecaViewSet
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+def conteudo(resposta):
+    assert resposta.status_code == 200
+    assert resposta.streaming
+    return b"".join(resposta.streaming_content).decode("utf-8")
+
+
+@pytest.fixture
+def op():
+    op = criar_op(codigo="NF-EXP")
+    criar_peca(ordem_producao=op, codigo="PC-A", status="concluida", metadata={"material": "aço"})
+    criar_peca(ordem_producao=op, codigo="PC-B", descricao='Eixo "longo", 2 mm')
+    criar_peca(ordem_producao=op, codigo="PC-C")
+    return op
+
+
+def test_csv_de_pecas(api, op):
+    resposta = api.get("/api/pecas/export/?ordering=codigo")
+
+    assert resposta["Content-Type"] == "text/csv; charset=utf-8"
+    assert resposta["Content-Disposition"].startswith('attachment; filename="pecas-')
+    texto = conteudo(resposta)
+    assert texto.startswith("\ufeff")
+    linhas = {linha["codigo"]: linha for linha in csv.DictReader(io.StringIO(texto[1:]))}
+    assert set(linhas) == {"PC-A", "PC-B", "PC-C"}
+    assert linhas["PC-A"]["op_codigo"] == "NF-EXP"
+    assert json.loads(linhas["PC-A"]["metadata"]) == {"material": "aço"}
+    assert linhas["PC-B"]["descricao"] == 'Eixo "longo", 2 mm'
+    assert linhas["PC-C"]["pedido"] == ""
+
+
+def test_jsonl_aplica_os_filtros_da_lista(api, op):
+    criar_peca(codigo="OUTRA")
+
+    resposta = api.get(f"/api/pecas/export/?formato=jsonl&ordem_producao={op.id}&status=em_fila")
+
+    assert resposta["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    linhas = [json.loads(linha) for linha in conteudo(resposta).splitlines()]
+    assert sorted(linha["codigo"] for linha in linhas) == ["PC-B", "PC-C"]
+
+
+def test_periodo_de_criacao(api, op):
+    antiga = criar_peca(codigo="ANTIGA")
+    Peca.objects.filter(pk=antiga.pk).update(created_at=timezone.now() - timedelta(days=40))
+    inicio = timezone.localdate() - timedelta(days=1)
+
+    texto = conteudo(api.get(f"/api/pecas/export/?formato=jsonl&start={inicio}"))
+
+    assert "ANTIGA" not in texto
+    assert texto.count("\n") == 3
+
+
+def test_ops_com_percentual_de_conclusao(api, op):
+    criar_op(codigo="NF-VAZIA")
+
+    linhas = [
+        json.loads(linha)
+        for linha in conteudo(api.get("/api/ops/export/?formato=jsonl")).splitlines()
+    ]
+
+    por_codigo = {linha["codigo"]: linha for linha in linhas}
+    assert por_codigo["NF-EXP"]["total_pecas"] == 3
+    assert por_codigo["NF-EXP"]["pecas_concluidas"] == 1
+    assert por_codigo["NF-EXP"]["percentual_conclusao"] == 33.33
+    assert por_codigo["NF-VAZIA"]["percentual_conclusao"] == 0
+
+
+@pytest.mark.parametrize("query", ["formato=xlsx", "start=01/02/2024"])
+def test_parametros_invalidos(api, op, query):
+    assert api.get(f"/api/pecas/export/?{query}").status_code == 400
+
+
+def test_asgi_envia_a_exportacao_em_blocos(op, usuario, monkeypatch):
+    monkeypatch.setattr(PecaViewSet, "chunk_size_exportacao", 2)
+    token = AccessToken.for_user(usuario)
+    url = f"/api/pecas/export/?ordem_producao={op.id}&ordering=codigo"
+    sincrona = conteudo(Client(HTTP_AUTHORIZATION=f"Bearer {token}").get(url))
+
+    async def exportar():
+        resposta = await AsyncClient().get(url, headers={"Authorization": f"Bearer {token}"})
+        return resposta, [bloco async for bloco in resposta.streaming_content]
+
+    resposta, blocos = async_to_sync(exportar)()
+
+    # Iterador assíncrono: o Django o consome bloco a bloco, sem sync_to_async(list)
+    assert resposta.is_async
+    # Cabeçalho e três peças, duas linhas por bloco
+    assert len(blocos) == 2
+    assert b"".join(blocos).decode("utf-8") == sincrona
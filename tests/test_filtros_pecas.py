@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from .factories import criar_cliente, criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def pecas():
+    hoje = timezone.localdate()
+    cliente = criar_cliente()
+    op = criar_op(codigo="NF-FILTRO", cliente=cliente)
+    return {
+        "atrasada": criar_peca(
+            ordem_producao=op,
+            codigo="A-1",
+            data_entrega=hoje - timedelta(days=3),
+            metadata={"material": "aço", "espessura": 2},
+        ),
+        "concluida": criar_peca(
+            ordem_producao=op,
+            codigo="A-2",
+            status="concluida",
+            data_entrega=hoje - timedelta(days=3),
+            metadata={"material": "latão"},
+        ),
+        "pausada": criar_peca(
+            ordem_producao=op,
+            codigo="B-1",
+            status="pausada",
+            data_entrega=hoje + timedelta(days=10),
+            metadata={"processo": "torno"},
+        ),
+        "outro_cliente": criar_peca(codigo="C-1", data_entrega=hoje + timedelta(days=1)),
+    }
+
+
+def codigos(api, query):
+    resposta = api.get(f"/api/pecas/?{query}")
+    assert resposta.status_code == 200, resposta.content
+    return sorted(peca["codigo"] for peca in resposta.json()["results"])
+
+
+def test_status_repetido_ou_separado_por_virgula(api, pecas):
+    assert codigos(api, "status=pausada&status=concluida") == ["A-2", "B-1"]
+    assert codigos(api, "status=pausada,concluida") == ["A-2", "B-1"]
+
+
+def test_cliente_e_periodo_de_entrega(api, pecas):
+    cliente = pecas["atrasada"].cliente_id
+    hoje = timezone.localdate()
+
+    assert codigos(api, f"cliente={cliente}") == ["A-1", "A-2", "B-1"]
+    assert codigos(api, f"cliente={cliente}&status=em_fila") == ["A-1"]
+    assert codigos(api, f"data_entrega_inicio={hoje}") == ["B-1", "C-1"]
+    assert codigos(api, f"data_entrega_fim={hoje}") == ["A-1", "A-2"]
+
+
+def test_atrasadas_ignoram_concluidas(api, pecas):
+    assert codigos(api, "atrasadas=true") == ["A-1"]
+
+
+def test_metadados(api, pecas):
+    assert codigos(api, "metadata.material=aço") == ["A-1"]
+    assert codigos(api, "metadata.espessura=2") == ["A-1"]
+    assert codigos(api, "metadata.processo=") == ["B-1"]
+    assert codigos(api, "metadata.contains=aço") == []
+
+
+def test_ordenacao_por_coluna_indexada(api, pecas):
+    resposta = api.get("/api/pecas/?ordering=-codigo")
+    assert [peca["codigo"] for peca in resposta.json()["results"]] == ["C-1", "B-1", "A-2", "A-1"]
+
+    resposta = api.get("/api/pecas/?ordering=data_entrega")
+    assert [peca["codigo"] for peca in resposta.json()["results"]][-1] == "B-1"
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "status=perdida",
+        "cliente=123",
+        "ordem_producao=abc",
+        "data_entrega_inicio=01/02/2024",
+        "ordering=descricao",
+        "metadata.=x",
+    ],
+)
+def test_parametros_invalidos(api, pecas, query):
+    resposta = api.get(f"/api/pecas/?{query}")
+    assert resposta.status_code == 400
@@ -0,0 +1,118 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pecas.models import Peca
+from producao.models import OrdemProducao
+
+from .factories import criar_cliente, criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+def itens(cliente, quantidade, op="NF-NOVA", prefixo="PC"):
+    return [
+        {
+            "ordem_producao_codigo": op,
+            "cliente": str(cliente.id),
+            "codigo": f"{prefixo}-{indice}",
+            "quantidade": indice + 1,
+        }
+        for indice in range(quantidade)
+    ]
+
+
+def test_importacao_cria_ops_faltantes_e_recalcula_status(api):
+    cliente = criar_cliente()
+    existente = criar_op(codigo="NF-EXISTENTE", cliente=cliente)
+    lote = itens(cliente, 2) + itens(cliente, 1, op=existente.codigo, prefixo="EX")
+    lote[1]["status"] = "em_andamento"
+
+    resposta = api.post("/api/pecas/bulk/", lote, format="json")
+
+    assert resposta.status_code == 201, resposta.content
+    assert resposta.json()["total"] == 3
+    assert resposta.json()["ordens_producao_criadas"] == ["NF-NOVA"]
+    nova = OrdemProducao.objects.get(codigo="NF-NOVA")
+    assert nova.cliente == cliente
+    assert nova.status == "em_andamento"
+    assert set(nova.pecas.values_list("codigo", flat=True)) == {"PC-0", "PC-1"}
+    assert existente.pecas.get().codigo == "EX-0"
+
+
+def test_consultas_nao_crescem_com_o_lote(api):
+    cliente = criar_cliente()
+    contagens = []
+    for quantidade, op in ((2, "NF-A"), (40, "NF-B")):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = api.post(
+                "/api/pecas/bulk/", itens(cliente, quantidade, op=op, prefixo=op), format="json"
+            )
+        assert resposta.status_code == 201
+        contagens.append(len(contexto.captured_queries))
+
+    assert contagens[0] == contagens[1]
+
+
+def test_lote_invalido_nao_grava_nada(api):
+    cliente = criar_cliente()
+    criar_peca(codigo="PC-0")
+    lote = itens(cliente, 3)
+    lote[2]["codigo"] = "PC-1"
+    lote.append({**itens(cliente, 1, prefixo="OUTRA")[0], "cliente": str(criar_op().id)})
+
+    resposta = api.post("/api/pecas/bulk/", lote, format="json")
+
+    assert resposta.status_code == 400
+    erros = " ".join(resposta.json()["non_field_errors"])
+    assert "Item 0: já existe uma peça com o código 'PC-0'" in erros
+    assert "Item 2: código 'PC-1' repetido no lote" in erros
+    assert "Item 3: cliente" in erros
+    assert not OrdemProducao.objects.filter(codigo="NF-NOVA").exists()
+    assert Peca.objects.count() == 1
+
+
+def test_lote_vazio(api):
+    assert api.post("/api/pecas/bulk/", [], format="json").status_code == 400
+
+
+def test_comando_importa_csv_e_jsonl(tmp_path):
+    cliente = criar_cliente()
+    csv = tmp_path / "pecas.csv"
+    csv.write_text(
+        "ordem_producao_codigo;cliente;codigo;quantidade;descricao;metadata\n"
+        f'NF-1;{cliente.id};PC-1;2;;"{{""material"": ""latão""}}"\n'
+        f"NF-1;{cliente.id};PC-2;1;Eixo;\n",
+        encoding="utf-8",
+    )
+    jsonl = tmp_path / "pecas.jsonl"
+    jsonl.write_text(
+        "\n".join(json.dumps(item) for item in itens(cliente, 2, op="NF-2", prefixo="J")) + "\n\n",
+        encoding="utf-8",
+    )
+
+    saida = StringIO()
+    call_command("import_pecas", str(csv), delimitador=";", stdout=saida)
+    call_command("import_pecas", str(jsonl), stdout=saida)
+
+    assert "2 peça(s) importada(s); 1 OP(s) criada(s)." in saida.getvalue()
+    assert Peca.objects.get(codigo="PC-1").metadata == {"material": "latão"}
+    assert Peca.objects.get(codigo="PC-2").descricao == "Eixo"
+    assert OrdemProducao.objects.get(codigo="NF-2").pecas.count() == 2
+
+
+def test_comando_recusa_arquivo_invalido(tmp_path):
+    arquivo = tmp_path / "pecas.jsonl"
+    arquivo.write_text('{"codigo": "PC-1"}\nnao-e-json\n', encoding="utf-8")
+
+    with pytest.raises(CommandError, match="Linha 2: JSON inválido"):
+        call_command("import_pecas", str(arquivo))
+
+    arquivo.write_text('{"codigo": "PC-1", "quantidade": 1}\n', encoding="utf-8")
+    with pytest.raises(CommandError, match="Item 0"):
+        call_command("import_pecas", str(arquivo))
+    assert not Peca.objects.exists()
@@ -0,0 +1,142 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from pecas.models import Peca
+from producao.indicadores import processar_pendentes, totais_producao_diaria
+from producao.models import ProducaoDiaria, ProducaoDiariaPendente
+from producao.views import _agregar_periodo
+
+from .factories import periodo_padrao, popular
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    # A versão dos indicadores e a disponibilidade da consolidação ficam em cache
+    caches["default"].clear()
+
+
+@pytest.fixture
+def peca(usuario):
+    popular(clientes=2, ops=6, pecas_por_op=4, logs=0, usuario=usuario)
+    return Peca.objects.filter(status="em_fila").select_related("ordem_producao").first()
+
+
+def mudar_status(api, peca, status, capturar):
+    with capturar(execute=True):
+        resposta = api.patch(f"/api/pecas/{peca.id}/", {"status": status}, format="json")
+    assert resposta.status_code == 200, resposta.content
+
+
+def test_gravacao_sem_consolidacao_em_uso_nao_registra_dias(
+    api, peca, django_capture_on_commit_callbacks
+):
+    mudar_status(api, peca, "em_andamento", django_capture_on_commit_callbacks)
+
+    assert not ProducaoDiariaPendente.objects.exists()
+    assert not ProducaoDiaria.objects.exists()
+
+
+def test_dias_pendentes_recalculados_na_leitura(api, peca, django_capture_on_commit_callbacks):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+    linhas_antes = {linha.pk: linha.updated_at for linha in ProducaoDiaria.objects.all()}
+
+    mudar_status(api, peca, "concluida", django_capture_on_commit_callbacks)
+
+    # A gravação só registra o dia; a consolidação continua como estava
+    pendente = ProducaoDiariaPendente.objects.get()
+    assert pendente.cliente_id == peca.cliente_id
+    assert {l.pk: l.updated_at for l in ProducaoDiaria.objects.all()} == linhas_antes
+
+    start, end = periodo_padrao()
+    resposta = api.get(f"/api/indicadores/summary/?start={start}&end={end}")
+    assert resposta.status_code == 200
+    assert not ProducaoDiariaPendente.objects.exists()
+
+    direto = _agregar_periodo(start, end, "created_at")
+    consolidado = totais_producao_diaria(start, end)
+    assert consolidado[0] == direto[0] and consolidado[2:] == direto[2:]
+    assert resposta.json()["pecas"]["por_status"] == direto[3]
+
+
+def test_rebuild_incremental_processa_pendentes(api, peca, django_capture_on_commit_callbacks):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+    mudar_status(api, peca, "pausada", django_capture_on_commit_callbacks)
+    assert ProducaoDiariaPendente.objects.exists()
+
+    call_command("rebuild_rollups", stdout=StringIO())
+
+    assert not ProducaoDiariaPendente.objects.exists()
+    start, end = periodo_padrao()
+    assert totais_producao_diaria(start, end)[3] == _agregar_periodo(start, end, "created_at")[3]
+
+
+def test_transacao_desfeita_nao_deixa_pendencias(peca, django_capture_on_commit_callbacks):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            peca.status = "concluida"
+            peca.save()
+            raise RuntimeError
+    assert callbacks == []
+
+    # A próxima transação confirmada registra apenas os próprios dias
+    outra = (
+        Peca.objects.exclude(ordem_producao=peca.ordem_producao).filter(status="em_fila").first()
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        outra.status = "concluida"
+        outra.save()
+    assert list(ProducaoDiariaPendente.objects.values_list("cliente_id", flat=True)) == [
+        outra.ordem_producao.cliente_id
+    ]
+    assert processar_pendentes() == 1
+
+
+def consolidado_igual_ao_direto():
+    start, end = periodo_padrao()
+    direto = _agregar_periodo(start, end, "created_at")
+    consolidado = totais_producao_diaria(start, end)
+    assert consolidado[0] == direto[0]
+    assert consolidado[1] == pytest.approx(direto[1])
+    assert consolidado[2:] == direto[2:]
+
+
+def test_rebuild_completo_confere_com_agregacao_direta(peca):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+
+    assert ProducaoDiaria.objects.exists()
+    consolidado_igual_ao_direto()
+
+
+def test_exclusao_de_op_entra_na_consolidacao(api, peca, django_capture_on_commit_callbacks):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resposta = api.delete(f"/api/ops/{peca.ordem_producao_id}/")
+    assert resposta.status_code == 204
+    assert ProducaoDiariaPendente.objects.filter(cliente_id=peca.cliente_id).exists()
+
+    processar_pendentes()
+    consolidado_igual_ao_direto()
+
+
+def test_rebuild_incremental_encontra_alteracoes_sem_signals(peca):
+    call_command("rebuild_rollups", full=True, stdout=StringIO())
+
+    # update() não dispara signals nem registra pendências
+    Peca.objects.filter(ordem_producao=peca.ordem_producao).update(
+        status="concluida", updated_at=timezone.now()
+    )
+    assert not ProducaoDiariaPendente.objects.exists()
+
+    call_command("rebuild_rollups", stdout=StringIO())
+
+    consolidado_igual_ao_direto()
@@ -0,0 +1,78 @@
+import pytest
+from django.core.cache import caches
+from django.db import transaction
+
+from pecas.models import Peca
+from producao.indicadores import CHAVE_VERSAO, get_cache
+
+from .factories import criar_op, periodo_padrao, popular
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    caches["default"].clear()
+
+
+@pytest.fixture
+def url(usuario):
+    popular(clientes=2, ops=4, pecas_por_op=3, logs=0, usuario=usuario)
+    start, end = periodo_padrao()
+    return f"/api/indicadores/summary/?start={start}&end={end}"
+
+
+def test_periodo_repetido_vem_do_cache(api, url, django_assert_num_queries):
+    primeira = api.get(url)
+    assert primeira.status_code == 200
+
+    with django_assert_num_queries(0):
+        segunda = api.get(url)
+    assert segunda.json() == primeira.json()
+    assert segunda["ETag"] == primeira["ETag"]
+    assert api.get(url, HTTP_IF_NONE_MATCH=primeira["ETag"]).status_code == 304
+
+
+def test_gravacao_invalida_o_cache(api, url, django_capture_on_commit_callbacks):
+    primeira = api.get(url)
+    total = primeira.json()["ordens_producao"]["total"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        criar_op()
+
+    resposta = api.get(url, HTTP_IF_NONE_MATCH=primeira["ETag"])
+    assert resposta.status_code == 200
+    assert resposta["ETag"] != primeira["ETag"]
+    assert resposta.json()["ordens_producao"]["total"] == total + 1
+
+
+def test_atualizacao_em_lote_invalida_o_cache(api, url, django_capture_on_commit_callbacks):
+    primeira = api.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Peca.objects.filter(status="em_fila").atualizar_status("concluida")
+
+    resposta = api.get(url)
+    assert resposta["ETag"] != primeira["ETag"]
+    assert resposta.json()["pecas"]["por_status"].get("em_fila", 0) == 0
+
+
+def test_transacao_desfeita_mantem_o_cache(api, url, django_capture_on_commit_callbacks):
+    api.get(url)
+    versao = get_cache().get(CHAVE_VERSAO)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError), transaction.atomic():
+            criar_op()
+            raise RuntimeError
+
+    assert get_cache().get(CHAVE_VERSAO) == versao
+
+
+def test_date_field_tem_cache_proprio(api, url):
+    por_criacao = api.get(url)
+    por_atualizacao = api.get(f"{url}&date_field=updated_at")
+
+    assert por_atualizacao.status_code == 200
+    assert por_atualizacao["ETag"] != por_criacao["ETag"]
+    assert api.get(f"{url}&date_field=data_entrega").status_code == 400
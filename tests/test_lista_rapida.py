@@ -0,0 +1,100 @@
+"""
+Paridade entre a listagem rápida (values()) e a serialização normal.
+
+Cada consulta é feita com LISTA_RAPIDA ligado e desligado, e as respostas
+precisam ser idênticas byte a byte.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from django.utils import timezone
+
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+from usuarios.models import Usuario
+
+
+@pytest.fixture
+def dados(usuario):
+    sem_sobrenome = Usuario.objects.create_user(
+        "sem.sobrenome@usinasoft.com", "x", first_name="Rui"
+    )
+    acme = Cliente.objects.create(nome="ACME Usinagem", contato="João", email="acme@ex.com")
+    beta = Cliente.objects.create(nome="Beta Ferramentaria Ção")
+
+    op_completa = OrdemProducao.objects.create(
+        codigo="NF-001",
+        cliente=acme,
+        criado_por=usuario,
+        responsavel=sem_sobrenome,
+        observacoes="Urgente",
+    )
+    op_sem_usuarios = OrdemProducao.objects.create(codigo="NF-002", cliente=beta)
+    OrdemProducao.objects.create(codigo="NF-003", cliente=beta, criado_por=sem_sobrenome)
+
+    status = list(Peca.StatusChoices.values)
+    for i in range(12):
+        Peca.objects.create(
+            ordem_producao=op_completa if i % 3 else op_sem_usuarios,
+            cliente=acme if i % 2 else beta,
+            codigo=f"P-{i:03}",
+            descricao=f"Eixo ø{i} mm" if i % 4 else None,
+            pedido=f"PED-{i}" if i % 5 else None,
+            quantidade=i + 1,
+            data_entrega=date(2024, 1, 1) + timedelta(days=i) if i % 2 else None,
+            status=status[i % len(status)],
+            metadata={"material": "aço", "espessura": 1.5 * i, "tags": ["a", i]} if i % 3 else None,
+        )
+
+
+def respostas(api, settings, url):
+    settings.LISTA_RAPIDA = True
+    rapida = api.get(url)
+    settings.LISTA_RAPIDA = False
+    normal = api.get(url)
+    return rapida, normal
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/pecas/",
+        "/api/pecas/?ordering=codigo",
+        "/api/pecas/?status=em_fila,concluida",
+        "/api/pecas/?ordering=-data_entrega",
+        "/api/pecas/?paginacao=cursor",
+        "/api/pecas/?metadata.material=aço",
+        "/api/ops/",
+        "/api/ops/?status=aberta",
+        "/api/ops/?paginacao=cursor",
+    ],
+)
+def test_lista_identica_ao_serializer(api, settings, dados, url):
+    rapida, normal = respostas(api, settings, url)
+    assert rapida.status_code == normal.status_code == 200
+    assert rapida.content == normal.content
+    assert rapida.data == normal.data
+
+
+@pytest.mark.django_db
+def test_lista_identica_em_outro_fuso(api, settings, dados):
+    with timezone.override("America/Sao_Paulo"):
+        rapida, normal = respostas(api, settings, "/api/ops/")
+    assert rapida.content == normal.content
+
+
+@pytest.mark.django_db
+def test_relacoes_nulas_ficam_fora(api, settings, dados):
+    rapida, _ = respostas(api, settings, "/api/ops/")
+    op = next(item for item in rapida.json()["results"] if item["codigo"] == "NF-002")
+    assert op["criado_por"] is None
+    assert "criado_por_email" not in op and "criado_por_nome" not in op
+    assert op["total_pecas"] == 4 and op["percentual_conclusao"] == op["pecas_concluidas"] * 25
+
+
+@pytest.mark.django_db
+def test_lista_vazia(api, settings):
+    rapida, normal = respostas(api, settings, "/api/pecas/")
+    assert rapida.content == normal.content
@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+
+from usuarios.models import LogAcao
+
+from .factories import criar_usuario
+
+pytestmark = pytest.mark.django_db
+
+
+def em(dia, hora=12):
+    return timezone.make_aware(datetime(2025, 3, dia, hora))
+
+
+@pytest.fixture
+def logs(admin):
+    """Logs de março/2025 de dois autores sobre duas OPs e um cliente."""
+    outro = criar_usuario()
+    op_a, op_b, cliente = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    registros = {
+        "a1": LogAcao.objects.create(
+            usuario=admin, acao="criar", alvo_tipo="ordem_producao", alvo_id=op_a, created_at=em(1)
+        ),
+        "a2": LogAcao.objects.create(
+            usuario=admin,
+            acao="atualizar",
+            alvo_tipo="ordem_producao",
+            alvo_id=op_a,
+            created_at=em(10),
+        ),
+        "b1": LogAcao.objects.create(
+            usuario=outro, acao="criar", alvo_tipo="ordem_producao", alvo_id=op_b, created_at=em(5)
+        ),
+        "c1": LogAcao.objects.create(
+            usuario=outro, acao="criar", alvo_tipo="cliente", alvo_id=cliente, created_at=em(20)
+        ),
+    }
+    return outro, op_a, cliente, registros
+
+
+def ids(resposta):
+    assert resposta.status_code == 200, resposta.content
+    dados = resposta.json()
+    itens = dados["results"] if isinstance(dados, dict) else dados
+    return [item["id"] for item in itens]
+
+
+def listar(api, **params):
+    params.setdefault("start", "2025-03-01")
+    params.setdefault("end", "2025-03-31")
+    return api.get("/api/logs/", params)
+
+
+def test_filtro_por_usuario(api_admin, logs):
+    outro, _, _, registros = logs
+
+    assert ids(listar(api_admin, usuario=str(outro.id))) == [
+        str(registros["c1"].id),
+        str(registros["b1"].id),
+    ]
+
+
+def test_filtro_por_alvo(api_admin, logs):
+    _, op_a, cliente, registros = logs
+
+    assert ids(listar(api_admin, alvo_tipo="ordem_producao", alvo_id=str(op_a))) == [
+        str(registros["a2"].id),
+        str(registros["a1"].id),
+    ]
+    assert ids(listar(api_admin, alvo_tipo="cliente", alvo_id=str(cliente))) == [
+        str(registros["c1"].id)
+    ]
+    assert len(ids(listar(api_admin, alvo_tipo="ordem_producao"))) == 3
+
+
+def test_filtro_por_acao(api_admin, logs):
+    assert len(ids(listar(api_admin, acao="criar"))) == 3
+
+
+def test_filtro_por_periodo(api_admin, logs):
+    _, _, _, registros = logs
+
+    # Datas cobrem o dia inteiro; data/hora ISO 8601 limita no instante
+    assert ids(listar(api_admin, start="2025-03-05", end="2025-03-10")) == [
+        str(registros["a2"].id),
+        str(registros["b1"].id),
+    ]
+    assert ids(listar(api_admin, start="2025-03-05T13:00:00+00:00", end="2025-03-10")) == [
+        str(registros["a2"].id)
+    ]
+
+
+def test_filtros_combinados(api_admin, logs, admin):
+    _, _, _, registros = logs
+
+    resposta = listar(api_admin, usuario=str(admin.id), acao="criar", end="2025-03-09")
+    assert ids(resposta) == [str(registros["a1"].id)]
+
+
+@pytest.mark.parametrize(
+    "params,campo",
+    [
+        ({"usuario": "abc"}, "usuario"),
+        ({"alvo_tipo": "ordem_producao", "alvo_id": "abc"}, "alvo_id"),
+        ({"alvo_id": str(uuid.UUID(int=1))}, "alvo_id"),
+        ({"start": "05/03/2025"}, "start"),
+        ({"end": "2025-13-01"}, "end"),
+    ],
+)
+def test_filtros_invalidos_retornam_400(api_admin, logs, params, campo):
+    resposta = listar(api_admin, **params)
+
+    assert resposta.status_code == 400
+    assert campo in resposta.json()
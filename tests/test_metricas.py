@@ -0,0 +1,135 @@
+import json
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from usinasoft.metricas import (
+    ARQUIVO_ENCERRADOS,
+    OrcamentoConsultasExcedido,
+    consolidar_processo,
+    registro,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def test_metricas_fechadas_sem_configuracao(client, settings):
+    settings.METRICAS_TOKEN = ""
+    settings.METRICAS_IPS_PERMITIDOS = []
+    assert client.get("/metrics", HTTP_HOST="localhost").status_code == 404
+
+
+def test_metricas_com_token(client, settings):
+    settings.METRICAS_TOKEN = "segredo"
+    settings.METRICAS_IPS_PERMITIDOS = []
+
+    assert client.get("/metrics", HTTP_HOST="localhost").status_code == 401
+    resposta = client.get(
+        "/metrics", HTTP_HOST="localhost", HTTP_AUTHORIZATION="Bearer outro-segredo"
+    )
+    assert resposta.status_code == 401
+
+    resposta = client.get("/metrics", HTTP_HOST="localhost", HTTP_AUTHORIZATION="Bearer segredo")
+    assert resposta.status_code == 200
+    assert b"# TYPE usinasoft_http_requisicoes_total counter" in resposta.content
+
+
+def test_metricas_por_endereco(client, settings):
+    settings.METRICAS_TOKEN = ""
+    settings.METRICAS_IPS_PERMITIDOS = ["10.0.0.5"]
+
+    assert client.get("/metrics", HTTP_HOST="localhost").status_code == 401
+    resposta = client.get("/metrics", HTTP_HOST="localhost", REMOTE_ADDR="10.0.0.5")
+    assert resposta.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "remoto,encaminhado,status",
+    [
+        ("127.0.0.1", "10.0.0.5", 200),
+        ("127.0.0.1", "203.0.113.9, 10.0.0.5", 200),
+        # Só o último endereço vem do proxy: o anterior é o que o cliente enviou
+        ("127.0.0.1", "10.0.0.5, 203.0.113.9", 401),
+        ("127.0.0.1", None, 401),
+        # Fora da lista de proxies o cabeçalho é ignorado
+        ("203.0.113.9", "10.0.0.5", 401),
+    ],
+)
+def test_metricas_atras_de_proxy(client, settings, remoto, encaminhado, status):
+    settings.METRICAS_TOKEN = ""
+    settings.METRICAS_IPS_PERMITIDOS = ["10.0.0.5", "127.0.0.1"]
+    settings.METRICAS_PROXIES_CONFIAVEIS = ["127.0.0.1"]
+    cabecalhos = {"HTTP_X_FORWARDED_FOR": encaminhado} if encaminhado else {}
+
+    resposta = client.get("/metrics", HTTP_HOST="localhost", REMOTE_ADDR=remoto, **cabecalhos)
+    assert resposta.status_code == status
+
+
+def test_server_timing_conta_as_consultas(api, settings):
+    settings.METRICAS_ATIVAS = True
+    settings.METRICAS_SERVER_TIMING = True
+
+    with CaptureQueriesContext(connection) as contexto:
+        resposta = api.get("/api/pecas/")
+
+    cabecalho = re.fullmatch(
+        r'db;dur=[\d.]+;desc="(\d+) consultas", total;dur=[\d.]+', resposta["Server-Timing"]
+    )
+    assert cabecalho and int(cabecalho.group(1)) == len(contexto.captured_queries)
+
+    settings.METRICAS_SERVER_TIMING = False
+    assert "Server-Timing" not in api.get("/api/pecas/")
+
+
+def _excedidos(view):
+    chave = ("orcamento_consultas_excedido_total", (("view", view),))
+    return registro.instantaneo().get(chave, 0)
+
+
+def test_orcamento_de_consultas_excedido_gera_aviso(api, settings, caplog):
+    settings.METRICAS_ATIVAS = True
+    settings.METRICAS_ORCAMENTO_ESTRITO = False
+    settings.METRICAS_ORCAMENTO_CONSULTAS = {"GET peca-list": 100, "GET cliente-list": 1}
+    antes = _excedidos("cliente-list")
+
+    with caplog.at_level(logging.WARNING, logger="usinasoft.metricas"):
+        assert api.get("/api/pecas/").status_code == 200
+        assert not caplog.records
+        assert api.get("/api/clientes/").status_code == 200
+
+    (aviso,) = caplog.records
+    assert re.fullmatch(
+        r"GET cliente-list executou \d+ consultas SQL \(orçamento: 1\)", aviso.message
+    )
+    assert _excedidos("cliente-list") == antes + 1
+
+
+def test_orcamento_estrito_falha_a_requisicao(api, settings):
+    settings.METRICAS_ATIVAS = True
+    settings.METRICAS_ORCAMENTO_ESTRITO = True
+    settings.METRICAS_ORCAMENTO_CONSULTAS = {"cliente-list": 1}
+
+    with pytest.raises(OrcamentoConsultasExcedido):
+        api.get("/api/clientes/")
+
+
+def _serie(total):
+    return [["http_requisicoes_total", [["metodo", "GET"], ["view", "peca-list"]], total]]
+
+
+def test_arquivos_de_workers_encerrados_sao_consolidados(settings, tmp_path):
+    settings.METRICAS_DIR = str(tmp_path)
+    (tmp_path / "101-a.json").write_text(json.dumps(_serie(3)))
+    (tmp_path / "102-b.json").write_text(json.dumps(_serie(4)))
+    chave = ("http_requisicoes_total", (("metodo", "GET"), ("view", "peca-list")))
+
+    consolidar_processo(101)
+    consolidar_processo(102)
+    consolidar_processo(103)  # Worker sem arquivo
+
+    assert sorted(caminho.name for caminho in tmp_path.iterdir()) == [ARQUIVO_ENCERRADOS]
+    registro._iniciar_estado()
+    assert registro.agregado()[chave] == 7
@@ -0,0 +1,99 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from producao.models import OrdemProducao
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def op():
+    op = criar_op()
+    for status in ("concluida", "em_fila", "em_andamento"):
+        criar_peca(ordem_producao=op, status=status)
+    return op
+
+
+def itens(resposta):
+    dados = resposta.json()
+    return dados["results"] if isinstance(dados, dict) else dados
+
+
+def test_instancia_sem_anotacao_conta_as_pecas(op, django_assert_num_queries):
+    op = OrdemProducao.objects.get(pk=op.pk)
+    assert not hasattr(op, "num_pecas")
+
+    with django_assert_num_queries(2):
+        assert op.total_pecas == 3
+        assert op.pecas_concluidas == 1
+    assert op.percentual_conclusao == 33.33
+
+
+def test_com_estatisticas_le_a_anotacao(op, django_assert_num_queries):
+    op = OrdemProducao.objects.com_estatisticas().get(pk=op.pk)
+
+    with django_assert_num_queries(0):
+        assert op.total_pecas == 3
+        assert op.pecas_concluidas == 1
+        assert op.percentual_conclusao == 33.33
+
+
+def test_anotacao_e_contagem_concordam():
+    vazia = criar_op()
+    completa = criar_op()
+    criar_peca(ordem_producao=completa, status="concluida")
+
+    anotadas = {o.pk: o for o in OrdemProducao.objects.com_estatisticas()}
+    for op in (vazia, completa):
+        sem_anotacao = OrdemProducao.objects.get(pk=op.pk)
+        assert anotadas[op.pk].total_pecas == sem_anotacao.total_pecas
+        assert anotadas[op.pk].pecas_concluidas == sem_anotacao.pecas_concluidas
+        assert anotadas[op.pk].percentual_conclusao == sem_anotacao.percentual_conclusao
+    assert anotadas[vazia.pk].percentual_conclusao == 0
+    assert anotadas[completa.pk].percentual_conclusao == 100
+
+
+def test_listagem_nao_consulta_por_op(api, op):
+    with CaptureQueriesContext(connection) as poucas:
+        resposta = api.get("/api/ops/")
+    assert resposta.status_code == 200
+    assert itens(resposta)[0]["total_pecas"] == 3
+    assert itens(resposta)[0]["percentual_conclusao"] == 33.33
+
+    for _ in range(4):
+        criar_peca(ordem_producao=criar_op(), status="em_fila")
+    with CaptureQueriesContext(connection) as muitas:
+        resposta = api.get("/api/ops/")
+    assert len(itens(resposta)) == 5
+    assert len(muitas) == len(poucas)
+
+
+@pytest.mark.parametrize(
+    "status_pecas,esperado",
+    [
+        (["concluida", "concluida"], "concluida"),
+        (["cancelada", "cancelada"], "cancelada"),
+        (["pausada", "pausada"], "pausada"),
+        (["em_andamento", "em_fila"], "em_andamento"),
+        (["em_fila", "concluida"], "aberta"),
+    ],
+)
+def test_status_da_op_segue_as_pecas(status_pecas, esperado):
+    op = criar_op()
+    for status in status_pecas:
+        criar_peca(ordem_producao=op, status=status)
+
+    op = OrdemProducao.objects.get(pk=op.pk)
+    assert op.status == esperado
+    assert op.verificar_e_atualizar_status() is False
+
+
+def test_op_sem_pecas_mantem_o_status():
+    op = criar_op(status="pausada")
+
+    assert op.verificar_e_atualizar_status() is False
+    op.refresh_from_db()
+    assert op.status == "pausada"
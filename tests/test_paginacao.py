@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from pecas.models import Peca
+from usinasoft.pagination import CreatedAtCursorPagination
+
+from .factories import popular
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def pecas_empatadas(usuario, monkeypatch):
+    monkeypatch.setattr(CreatedAtCursorPagination, "page_size", 7)
+    popular(clientes=2, ops=6, pecas_por_op=4, logs=0, usuario=usuario)
+    # Metade das peças com o mesmo created_at, como numa importação em lote
+    agora = timezone.now()
+    ids = list(Peca.objects.values_list("id", flat=True))
+    Peca.objects.filter(id__in=ids[::2]).update(created_at=agora)
+    Peca.objects.filter(id__in=ids[1::2]).update(created_at=agora - timedelta(hours=1))
+    return list(Peca.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+
+def percorrer(api, url, link):
+    paginas = []
+    while url:
+        resposta = api.get(url)
+        assert resposta.status_code == 200
+        dados = resposta.json()
+        assert "count" not in dados
+        paginas.append([item["id"] for item in dados["results"]])
+        url = dados[link]
+    return paginas
+
+
+# Lista rápida (dicionários) e serializer (instâncias, com ?fields=)
+@pytest.mark.parametrize("extra", ["", "&fields=id,codigo"], ids=["lista-rapida", "serializer"])
+def test_cursor_percorre_empates_sem_repetir(api, pecas_empatadas, extra):
+    paginas = percorrer(api, f"/api/pecas/?paginacao=cursor{extra}", "next")
+
+    assert [len(pagina) for pagina in paginas] == [7, 7, 7, 3]
+    assert [item for pagina in paginas for item in pagina] == [str(i) for i in pecas_empatadas]
+
+
+def test_cursor_volta_pelas_mesmas_paginas(api, pecas_empatadas):
+    ida = percorrer(api, "/api/pecas/?paginacao=cursor", "next")
+    ultima = api.get("/api/pecas/?paginacao=cursor").json()
+    while ultima["next"]:
+        ultima = api.get(ultima["next"]).json()
+
+    volta = percorrer(api, ultima["previous"], "previous")
+
+    assert volta == ida[-2::-1]
+
+
+def test_cursor_invalido(api, pecas_empatadas):
+    assert api.get("/api/pecas/?cursor=nao-e-um-cursor").status_code == 404
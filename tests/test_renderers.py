@@ -0,0 +1,44 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from usinasoft import renderers
+from usinasoft.renderers import JSONRapidoParser, JSONRapidoRenderer
+
+DADOS = {
+    "id": uuid.UUID("2f1c1e9e-7d3c-4b8e-9a51-0d3c3f0b6a11"),
+    "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "local": datetime(2024, 5, 1, 9, 30, tzinfo=timezone(timedelta(hours=-3))),
+    "data_entrega": date(2024, 5, 10),
+    "valor": Decimal("12.50"),
+    "metadata": {"material": "aço", "espessura": 1.5, "tags": ["a", 1, None, True]},
+    "separador": "linha nova",
+}
+
+
+@pytest.mark.parametrize("com_orjson", [True, False])
+def test_renderer_igual_ao_do_drf(monkeypatch, com_orjson):
+    if not com_orjson:
+        monkeypatch.setattr(renderers, "orjson", None)
+    assert JSONRapidoRenderer().render(DADOS) == JSONRenderer().render(DADOS)
+
+
+def test_renderer_respeita_indentacao():
+    esperado = JSONRenderer().render(DADOS, "application/json; indent=4")
+    assert JSONRapidoRenderer().render(DADOS, "application/json; indent=4") == esperado
+
+
+@pytest.mark.parametrize("com_orjson", [True, False])
+def test_parser_igual_ao_do_drf(monkeypatch, com_orjson):
+    if not com_orjson:
+        monkeypatch.setattr(renderers, "orjson", None)
+    corpo = JSONRenderer().render({"codigo": "P-1", "quantidade": 3, "metadata": {"a": "ç"}})
+    assert JSONRapidoParser().parse(BytesIO(corpo)) == JSONParser().parse(BytesIO(corpo))
+    with pytest.raises(ParseError):
+        JSONRapidoParser().parse(BytesIO(b'{"codigo": NaN}'))
@@ -0,0 +1,69 @@
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao, ProducaoDiaria
+from sincronizacao.models import RegistroExclusao
+from usinasoft.benchmark import cenarios
+from usuarios.models import LogAcao
+
+pytestmark = pytest.mark.django_db
+
+REFERENCIA = date(2025, 3, 1)
+OPCOES = {"ops": 6, "pecas_per_op": 3, "clientes": 2, "sem_rollup": True, "stdout": StringIO()}
+
+
+def retrato():
+    return (
+        list(OrdemProducao.objects.order_by("codigo").values_list("id", "status", "created_at")),
+        list(Peca.objects.order_by("codigo").values_list("id", "status", "updated_at")),
+    )
+
+
+def test_mesma_semente_e_referencia_geram_os_mesmos_dados():
+    call_command("seed_benchmark", referencia=REFERENCIA, **OPCOES)
+    primeiro = retrato()
+    call_command("seed_benchmark", referencia=REFERENCIA, limpar=True, **OPCOES)
+
+    assert retrato() == primeiro
+    assert max(timezone.localdate(criado) for _, _, criado in primeiro[0]) <= REFERENCIA
+
+
+def test_limpar_registra_exclusoes_para_a_sincronizacao():
+    call_command("seed_benchmark", **OPCOES)
+    pecas = set(Peca.objects.values_list("id", flat=True))
+    ops = set(OrdemProducao.objects.values_list("id", flat=True))
+
+    call_command("seed_benchmark", limpar=True, **OPCOES)
+
+    tombstones = RegistroExclusao.objects.values_list("objeto_id", flat=True)
+    assert pecas <= set(tombstones.filter(tipo="peca"))
+    assert ops <= set(tombstones.filter(tipo="ordem_producao"))
+    assert RegistroExclusao.objects.filter(tipo="cliente").count() == 2
+
+
+def test_limpar_nao_registra_auditoria_nem_deixa_consolidacao(
+    django_capture_on_commit_callbacks,
+):
+    call_command("seed_benchmark", **dict(OPCOES, sem_rollup=False))
+    assert ProducaoDiaria.objects.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("seed_benchmark", limpar=True, **OPCOES)
+
+    assert Cliente.objects.count() == 2
+    assert not ProducaoDiaria.objects.exists()
+    assert not LogAcao.objects.filter(acao="excluir").exists()
+
+
+def test_periodo_dos_indicadores_segue_a_semente():
+    def caminhos(semente):
+        indicadores = cenarios({}, semente)["indicadores_summary"]
+        return [indicadores(i)[1] for i in range(3)]
+
+    assert caminhos(7) == caminhos(7)
+    assert caminhos(7) != caminhos(8)
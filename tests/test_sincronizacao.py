@@ -0,0 +1,146 @@
+from datetime import timedelta
+from io import StringIO
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+from sincronizacao.models import RegistroExclusao
+
+from .factories import criar_peca, popular
+
+pytestmark = pytest.mark.django_db
+
+FONTES = ("clientes", "ordens_producao", "pecas", "exclusoes")
+
+
+@pytest.fixture(autouse=True)
+def sem_margem(settings):
+    # Entrega também o que acabou de ser gravado; a margem tem teste próprio
+    settings.SINCRONIZACAO_MARGEM_SEGUNDOS = 0
+
+
+def sincronizar(api, url):
+    """Segue os links next; devolve os ids recebidos por fonte e o último watermark."""
+    recebidos = {fonte: [] for fonte in FONTES}
+    while True:
+        resposta = api.get(url)
+        assert resposta.status_code == 200, resposta.content
+        dados = resposta.json()
+        for fonte in FONTES:
+            recebidos[fonte].extend(item["id"] for item in dados[fonte])
+        if not dados["has_more"]:
+            return recebidos, dados["watermark"]
+        url = dados["next"]
+
+
+def test_paginas_entregam_tudo_uma_vez_mesmo_com_datas_iguais(api, usuario):
+    popular(clientes=2, ops=4, pecas_por_op=5, logs=0, usuario=usuario)
+    # Todas as peças com o mesmo updated_at, como num UPDATE em lote
+    Peca.objects.update(updated_at=timezone.now())
+
+    recebidos, _ = sincronizar(api, "/api/sync/?limit=3")
+
+    assert sorted(recebidos["clientes"]) == sorted(
+        map(str, Cliente.objects.values_list("id", flat=True))
+    )
+    assert sorted(recebidos["ordens_producao"]) == sorted(
+        map(str, OrdemProducao.objects.values_list("id", flat=True))
+    )
+    assert sorted(recebidos["pecas"]) == sorted(map(str, Peca.objects.values_list("id", flat=True)))
+    assert recebidos["exclusoes"] == []
+
+
+def test_alteracoes_e_exclusoes_desde_o_watermark(api):
+    alterada = criar_peca()
+    excluida = criar_peca()
+    _, watermark = sincronizar(api, "/api/sync/")
+
+    alterada.descricao = "Revisada"
+    alterada.save()
+    excluida_id = str(excluida.id)
+    excluida.delete()
+
+    recebidos, _ = sincronizar(api, f"/api/sync/?{urlencode(watermark)}")
+
+    assert recebidos["pecas"] == [str(alterada.id)]
+    assert recebidos["exclusoes"] == [excluida_id]
+    assert recebidos["clientes"] == recebidos["ordens_producao"] == []
+
+
+def test_exclusao_informa_tipo_e_data(api):
+    peca = criar_peca()
+    peca_id = str(peca.id)
+    peca.delete()
+
+    (exclusao,) = api.get("/api/sync/").json()["exclusoes"]
+
+    assert exclusao["tipo"] == "peca"
+    assert exclusao["id"] == peca_id
+    assert exclusao["excluido_em"]
+
+
+@pytest.mark.parametrize("query", ["since=ontem", "after=xyz", "limit=0", "limit=muitos"])
+def test_parametros_invalidos(api, query):
+    assert api.get(f"/api/sync/?{query}").status_code == 400
+
+
+def test_commit_tardio_com_data_antiga_nao_e_pulado(api, settings):
+    settings.SINCRONIZACAO_MARGEM_SEGUNDOS = 30
+    agora = timezone.now()
+    antiga = criar_peca()
+    recente = criar_peca()
+    Peca.objects.filter(pk=antiga.pk).update(updated_at=agora - timedelta(seconds=60))
+    Peca.objects.filter(pk=recente.pk).update(updated_at=agora - timedelta(seconds=5))
+
+    recebidos, watermark = sincronizar(api, "/api/sync/")
+
+    # A peça de 5 s atrás fica para depois: transações em andamento ainda podem
+    # confirmar registros com data anterior à dela
+    assert recebidos["pecas"] == [str(antiga.id)]
+    assert parse_datetime(watermark["since"]) <= agora - timedelta(seconds=30)
+
+    # Uma transação longa confirma agora uma peça gravada há 20 s, antes da recente
+    tardia = criar_peca()
+    Peca.objects.filter(pk=tardia.pk).update(updated_at=agora - timedelta(seconds=20))
+    # Passados 30 s, tudo o que foi gravado até agora está fora da margem
+    settings.SINCRONIZACAO_MARGEM_SEGUNDOS = 0
+
+    recebidos, _ = sincronizar(api, f"/api/sync/?{urlencode(watermark)}")
+
+    assert recebidos["pecas"] == [str(tardia.id), str(recente.id)]
+
+
+def test_since_anterior_a_retencao_exige_sincronizacao_completa(api, settings):
+    settings.SINCRONIZACAO_RETENCAO_DIAS = 30
+    agora = timezone.now()
+
+    antigo = api.get("/api/sync/", {"since": (agora - timedelta(days=31)).isoformat()})
+    recente = api.get("/api/sync/", {"since": (agora - timedelta(days=29)).isoformat()})
+
+    assert antigo.status_code == 410
+    assert "sincronização completa" in antigo.json()["error"]
+    assert recente.status_code == 200
+
+
+def test_prune_exclusoes_remove_marcas_antigas(settings):
+    settings.SINCRONIZACAO_RETENCAO_DIAS = 30
+    for peca in (criar_peca(), criar_peca()):
+        peca.delete()
+    antiga, recente = RegistroExclusao.objects.filter(tipo="peca")
+    RegistroExclusao.objects.filter(pk=antiga.pk).update(
+        excluido_em=timezone.now() - timedelta(days=31)
+    )
+
+    call_command("prune_exclusoes", dry_run=True, stdout=StringIO())
+    assert RegistroExclusao.objects.filter(tipo="peca").count() == 2
+
+    saida = StringIO()
+    call_command("prune_exclusoes", stdout=saida)
+
+    assert list(RegistroExclusao.objects.filter(tipo="peca")) == [recente]
+    assert saida.getvalue().startswith("1 marca(s)")
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pecas.models import Peca
+from usuarios.models import LogAcao
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ops():
+    ops = [criar_op(codigo="NF-1"), criar_op(codigo="NF-2")]
+    for op in ops:
+        for _ in range(3):
+            criar_peca(ordem_producao=op)
+    return ops
+
+
+def atualizar(api, dados, capturar):
+    with capturar(execute=True):
+        resposta = api.patch("/api/pecas/bulk-status/", dados, format="json")
+    assert resposta.status_code == 200, resposta.content
+    return resposta.json()
+
+
+def test_status_por_ids_recalcula_cada_op_uma_vez(
+    api, ops, backend, usuario, django_capture_on_commit_callbacks
+):
+    ids = [
+        str(pk) for pk in Peca.objects.filter(ordem_producao=ops[0]).values_list("id", flat=True)
+    ]
+    backend.eventos.clear()
+
+    dados = atualizar(api, {"ids": ids, "status": "concluida"}, django_capture_on_commit_callbacks)
+
+    assert dados == {"atualizadas": 3, "ordens_producao": [str(ops[0].id)]}
+    ops[0].refresh_from_db()
+    ops[1].refresh_from_db()
+    assert ops[0].status == "concluida"
+    assert ops[1].status == "aberta"
+    tipos = [evento["tipo"] for evento in backend.eventos]
+    assert tipos == ["peca.status"] * 3 + ["ordem_producao.status"]
+    logs = LogAcao.objects.filter(alvo_tipo="peca", acao="atualizar")
+    assert {str(log.alvo_id) for log in logs} == set(ids)
+    assert {log.usuario_id for log in logs} == {usuario.id}
+
+
+def test_status_por_op_e_status_atual(api, ops, django_capture_on_commit_callbacks):
+    pausada = Peca.objects.filter(ordem_producao=ops[1]).first()
+    pausada.status = "pausada"
+    pausada.save()
+
+    dados = atualizar(
+        api,
+        {"ordem_producao_codigo": "NF-2", "status_atual": "em_fila", "status": "em_andamento"},
+        django_capture_on_commit_callbacks,
+    )
+
+    assert dados["atualizadas"] == 2
+    pausada.refresh_from_db()
+    assert pausada.status == "pausada"
+    ops[1].refresh_from_db()
+    assert ops[1].status == "em_andamento"
+
+
+def test_pecas_ja_no_status_sao_ignoradas(api, ops, django_capture_on_commit_callbacks):
+    atualizar(
+        api,
+        {"ordem_producao_codigo": "NF-1", "status": "pausada"},
+        django_capture_on_commit_callbacks,
+    )
+
+    dados = atualizar(
+        api,
+        {"ordem_producao_codigo": "NF-1", "status": "pausada"},
+        django_capture_on_commit_callbacks,
+    )
+
+    assert dados == {"atualizadas": 0, "ordens_producao": []}
+
+
+def test_consultas_nao_crescem_com_o_numero_de_pecas(api, ops):
+    contagens = []
+    for op in ops:
+        for _ in range(10 * len(contagens)):
+            criar_peca(ordem_producao=op)
+        with CaptureQueriesContext(connection) as contexto:
+            api.patch(
+                "/api/pecas/bulk-status/",
+                {"ordem_producao_codigo": op.codigo, "status": "em_andamento"},
+                format="json",
+            )
+        contagens.append(len(contexto.captured_queries))
+
+    assert contagens[0] == contagens[1]
+
+
+def test_exige_ids_ou_op(api, ops):
+    resposta = api.patch("/api/pecas/bulk-status/", {"status": "concluida"}, format="json")
+    assert resposta.status_code == 400
+    assert not Peca.objects.filter(status="concluida").exists()
@@ -0,0 +1,100 @@
+import pytest
+
+from pecas.models import Peca
+from producao.models import OrdemProducao
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def recalculos(monkeypatch):
+    """Registra a OP de cada chamada a verificar_e_atualizar_status."""
+    chamadas = []
+    original = OrdemProducao.verificar_e_atualizar_status
+
+    def verificar(self):
+        chamadas.append(self.pk)
+        return original(self)
+
+    monkeypatch.setattr(OrdemProducao, "verificar_e_atualizar_status", verificar)
+    return chamadas
+
+
+def test_contagens_em_uma_unica_consulta(django_assert_num_queries):
+    op = criar_op()
+    criar_peca(ordem_producao=op, status="em_andamento")
+    criar_peca(ordem_producao=op, status="em_fila")
+    op = OrdemProducao.objects.get(pk=op.pk)
+
+    with django_assert_num_queries(1):
+        assert op.verificar_e_atualizar_status() is False
+
+
+def test_mudanca_de_status_grava_so_a_op(django_assert_max_num_queries):
+    op = criar_op()
+    pecas = [criar_peca(ordem_producao=op, status="em_andamento") for _ in range(2)]
+    Peca.objects.filter(pk__in=[p.pk for p in pecas]).update(status="concluida")
+    op = OrdemProducao.objects.get(pk=op.pk)
+    assert op.status == "em_andamento"
+
+    # Uma consulta agregada e o UPDATE da OP
+    with django_assert_max_num_queries(2):
+        assert op.verificar_e_atualizar_status() is True
+    op.refresh_from_db()
+    assert op.status == "concluida"
+
+
+def test_gravacao_sem_mudar_status_nao_recalcula_a_op(recalculos):
+    peca = criar_peca(status="em_andamento")
+    peca = Peca.objects.get(pk=peca.pk)
+    recalculos.clear()
+
+    peca.descricao = "Flange retificada"
+    peca.save()
+    peca.quantidade = 4
+    peca.save()
+
+    assert recalculos == []
+
+
+def test_mudanca_de_status_recalcula_a_op(recalculos):
+    peca = criar_peca(status="em_andamento")
+    peca = Peca.objects.get(pk=peca.pk)
+    recalculos.clear()
+
+    peca.status = "concluida"
+    peca.save()
+    assert recalculos == [peca.ordem_producao_id]
+    assert OrdemProducao.objects.get(pk=peca.ordem_producao_id).status == "concluida"
+
+    # Depois da gravação o novo status passa a ser o estado conhecido
+    peca.descricao = "Eixo retificado"
+    peca.save()
+    assert recalculos == [peca.ordem_producao_id]
+
+
+def test_peca_movida_recalcula_as_duas_ops(recalculos):
+    origem = criar_op()
+    movida = criar_peca(ordem_producao=origem, status="em_andamento")
+    criar_peca(ordem_producao=origem, status="concluida")
+    destino = criar_op(cliente=origem.cliente)
+    criar_peca(ordem_producao=destino, status="concluida")
+    assert OrdemProducao.objects.get(pk=origem.pk).status == "em_andamento"
+    assert OrdemProducao.objects.get(pk=destino.pk).status == "concluida"
+
+    movida = Peca.objects.get(pk=movida.pk)
+    recalculos.clear()
+    movida.ordem_producao = destino
+    movida.save()
+
+    assert sorted(recalculos, key=str) == sorted([origem.pk, destino.pk], key=str)
+    origem = OrdemProducao.objects.com_estatisticas().get(pk=origem.pk)
+    destino = OrdemProducao.objects.com_estatisticas().get(pk=destino.pk)
+    assert (origem.status, origem.total_pecas, origem.pecas_concluidas) == ("concluida", 1, 1)
+    assert (destino.status, destino.total_pecas, destino.pecas_concluidas) == (
+        "em_andamento",
+        2,
+        1,
+    )
@@ -0,0 +1,176 @@
+from datetime import date, datetime
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+
+from pecas.models import Peca
+from producao.models import OrdemProducao
+from producao.views import _calcular_timeseries
+
+from .factories import criar_op, criar_peca
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    caches["default"].clear()
+
+
+def instante(dia, hora=12):
+    return timezone.make_aware(datetime(2025, 3, dia, hora))
+
+
+def datar(objeto, criado=None, atualizado=None):
+    campos = {}
+    if criado:
+        campos["created_at"] = criado
+    if atualizado:
+        campos["updated_at"] = atualizado
+    type(objeto).objects.filter(pk=objeto.pk).update(**campos)
+
+
+@pytest.fixture
+def producao():
+    """
+    Março/2025: duas OPs criadas na primeira semana e concluídas no dia 5
+    (lead times de 2 e 1 dia), uma aberta no dia 10 e uma criada em fevereiro
+    e concluída no dia 12 (lead time de 20 dias).
+    """
+    concluida = OrdemProducao.StatusChoices.CONCLUIDA
+
+    op_a = criar_op()
+    pecas = [criar_peca(ordem_producao=op_a, status="concluida") for _ in range(2)]
+    op_a.refresh_from_db()
+    datar(op_a, criado=instante(3), atualizado=instante(5))
+    for peca in pecas:
+        datar(peca, atualizado=instante(5))
+
+    op_b = criar_op(status=concluida)
+    datar(op_b, criado=instante(4), atualizado=instante(5))
+
+    op_c = criar_op()
+    datar(op_c, criado=instante(10), atualizado=instante(10))
+
+    op_d = criar_op(status=concluida)
+    datar(op_d, criado=timezone.make_aware(datetime(2025, 2, 20, 12)), atualizado=instante(12))
+
+    # Fora do período consultado
+    op_e = criar_op(status=concluida)
+    fora = criar_peca(ordem_producao=op_e, status="concluida")
+    datar(op_e, criado=instante(20), atualizado=instante(21))
+    datar(fora, atualizado=instante(17))
+
+    assert op_a.status == concluida
+
+
+def consultar(api, **params):
+    params.setdefault("start", "2025-03-03")
+    params.setdefault("end", "2025-03-16")
+    return api.get("/api/indicadores/timeseries/", params)
+
+
+def test_bucket_diario_inclui_dias_sem_movimento(api, producao):
+    resposta = consultar(api)
+
+    assert resposta.status_code == 200
+    dados = resposta.json()
+    assert dados["periodo"] == {"start": "2025-03-03", "end": "2025-03-16", "bucket": "day"}
+    series = {item["inicio"]: item for item in dados["series"]}
+    assert len(series) == 14
+    assert series["2025-03-03"]["ops_criadas"] == 1
+    assert series["2025-03-04"]["ops_criadas"] == 1
+    assert series["2025-03-05"] == {
+        "inicio": "2025-03-05",
+        "ops_criadas": 0,
+        "ops_concluidas": 2,
+        "pecas_concluidas": 2,
+        "lead_time_medio_dias": 1.5,
+    }
+    assert series["2025-03-12"]["ops_concluidas"] == 1
+    assert series["2025-03-12"]["lead_time_medio_dias"] == 20
+    assert series["2025-03-08"] == {
+        "inicio": "2025-03-08",
+        "ops_criadas": 0,
+        "ops_concluidas": 0,
+        "pecas_concluidas": 0,
+        "lead_time_medio_dias": 0,
+    }
+
+
+def test_bucket_semanal_comeca_na_segunda(api, producao):
+    series = consultar(api, bucket="week").json()["series"]
+
+    assert [item["inicio"] for item in series] == ["2025-03-03", "2025-03-10"]
+    assert series[0]["ops_criadas"] == 2
+    assert series[0]["ops_concluidas"] == 2
+    assert series[0]["pecas_concluidas"] == 2
+    assert series[0]["lead_time_medio_dias"] == 1.5
+    assert series[1]["ops_criadas"] == 1
+    assert series[1]["ops_concluidas"] == 1
+    assert series[1]["lead_time_medio_dias"] == 20
+
+
+def test_bucket_mensal_agrega_o_periodo(api, producao):
+    series = consultar(api, bucket="month").json()["series"]
+
+    assert series == [
+        {
+            "inicio": "2025-03-01",
+            "ops_criadas": 3,
+            "ops_concluidas": 3,
+            "pecas_concluidas": 2,
+            "lead_time_medio_dias": 7.67,
+        }
+    ]
+
+
+def test_limites_do_periodo_sao_inclusivos(api, producao):
+    series = consultar(api, start="2025-03-04", end="2025-03-05").json()["series"]
+
+    assert [item["inicio"] for item in series] == ["2025-03-04", "2025-03-05"]
+    assert series[0]["ops_criadas"] == 1
+    assert series[1]["ops_concluidas"] == 2
+    # A OP A foi criada no dia 3: fora do período, mas concluída dentro dele
+    assert sum(item["ops_criadas"] for item in series) == 1
+
+
+def test_periodo_sem_movimento_retorna_zeros(api, producao):
+    series = consultar(api, start="2025-01-06", end="2025-01-19", bucket="week").json()["series"]
+
+    assert len(series) == 2
+    assert all(
+        item["ops_criadas"] == item["ops_concluidas"] == item["pecas_concluidas"] == 0
+        and item["lead_time_medio_dias"] == 0
+        for item in series
+    )
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"bucket": "year"},
+        {"start": "2025-03-16", "end": "2025-03-03"},
+        {"start": "03/03/2025"},
+    ],
+)
+def test_parametros_invalidos_retornam_400(api, params):
+    resposta = consultar(api, **params)
+
+    assert resposta.status_code == 400
+    assert "error" in resposta.json()
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_uma_consulta_por_metrica(producao, bucket, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        _calcular_timeseries(date(2025, 3, 3), date(2025, 3, 16), bucket)
+
+
+def test_periodo_ampliado_inclui_o_fim_do_mes(api, producao):
+    assert Peca.objects.filter(status="concluida").count() == 3
+    series = consultar(api, end="2025-03-31", bucket="month").json()["series"]
+
+    assert series[0]["pecas_concluidas"] == 3
+    assert series[0]["ops_criadas"] == 4
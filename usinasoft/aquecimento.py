@@ -0,0 +1,101 @@
+"""
+Aquecimento da aplicação antes da primeira requisição.
+
+Executado pelo gunicorn (gunicorn.conf.py): no processo mestre, antes do fork,
+quando preload_app está ativo, ou em cada worker depois de carregar a
+aplicação, quando não está. Faz o trabalho que o Django e o DRF deixam para a
+primeira requisição:
+- importa os módulos de models, signals, serializers, views e urls dos apps
+  do projeto;
+- monta o resolvedor de URLs (compila as expressões regulares das rotas);
+- instancia as views da API com autenticação, permissões, renderers, parsers,
+  filtros e paginação (importa o simplejwt e as classes do REST_FRAMEWORK);
+- constrói os campos de cada serializer, com as relações expansíveis;
+- carrega os catálogos de tradução e o fuso horário.
+
+Nenhuma consulta é feita ao banco; ao final, as conexões eventualmente abertas
+são fechadas para que cada worker abra as próprias depois do fork.
+"""
+
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import close_caches
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone, translation
+
+from usinasoft.campos import CamposDinamicosSerializerMixin
+
+MODULOS_APP = ("models", "signals", "serializers", "views", "urls")
+
+
+def _importar_modulos():
+    # Apps do projeto; os de terceiros são importados pelas settings e pelas rotas
+    for app in apps.get_app_configs():
+        if not Path(app.path).is_relative_to(settings.BASE_DIR):
+            continue
+        for modulo in MODULOS_APP:
+            try:
+                import_module(f"{app.name}.{modulo}")
+            except ModuleNotFoundError as exc:
+                # Só ignora a ausência do próprio módulo, não erros de import dentro dele
+                if exc.name != f"{app.name}.{modulo}":
+                    raise
+
+
+def _callbacks(resolver):
+    for padrao in resolver.url_patterns:
+        if isinstance(padrao, URLResolver):
+            yield from _callbacks(padrao)
+        else:
+            yield padrao.callback
+
+
+def _aquecer_view(classe, initkwargs):
+    view = classe(**initkwargs)
+    view.get_authenticators()
+    view.get_permissions()
+    view.get_renderers()
+    view.get_parsers()
+    view.get_throttles()
+    for backend in getattr(view, "filter_backends", ()):
+        backend()
+    if getattr(view, "pagination_class", None) is not None:
+        view.pagination_class()
+
+    serializer_class = getattr(view, "serializer_class", None)
+    if serializer_class is None:
+        return
+    kwargs = {}
+    if issubclass(serializer_class, CamposDinamicosSerializerMixin):
+        kwargs["expandir"] = list(getattr(serializer_class.Meta, "expansoes", {}))
+    serializer_class(**kwargs).fields
+
+
+def aquecer():
+    """Aquece o processo atual; devolve o tempo gasto em segundos."""
+    inicio = time.perf_counter()
+    _importar_modulos()
+
+    resolver = get_resolver()
+    resolver.reverse_dict  # noqa: B018 - monta o índice de rotas
+    vistas = set()
+    for callback in _callbacks(resolver):
+        classe = getattr(callback, "cls", None)
+        if classe is None or classe in vistas:
+            continue
+        vistas.add(classe)
+        _aquecer_view(classe, getattr(callback, "initkwargs", {}))
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("Not found.")
+    timezone.localtime()
+
+    connections.close_all()
+    close_caches()
+
+    return time.perf_counter() - inicio
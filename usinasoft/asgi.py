@@ -3,6 +3,9 @@ ASGI config for usinasoft project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Além das rotas do Django, responde o stream de eventos SSE em /api/eventos/
+(ver usinasoft/sse.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +16,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "usinasoft.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado depois do setup do Django, que carrega settings e apps
+from usinasoft.sse import com_eventos  # noqa: E402
+
+application = com_eventos(django_application)
@@ -0,0 +1,302 @@
+"""
+Auditoria de ações (LogAcao) com gravação assíncrona em lote.
+
+Os signals de usuarios registram criação, alteração e exclusão de Cliente,
+OrdemProducao, Peca e Usuario com registrar_acao(). Nenhum INSERT acontece no
+caminho da requisição: após o commit, o registro vai para um buffer em memória
+que uma thread em segundo plano grava com bulk_create quando atinge
+AUDITORIA_TAMANHO_LOTE registros ou a cada AUDITORIA_INTERVALO segundos.
+
+A gravação volta a ser síncrona quando AUDITORIA_ASSINCRONA=False (ex.: testes
+e comandos), quando o buffer passa de AUDITORIA_LIMITE_BUFFER (banco lento) ou
+quando o processo já está encerrando. O buffer é descarregado no encerramento do
+worker (atexit e hook worker_exit do gunicorn).
+
+Um lote que falha por um registro inválido (ex.: autor já excluído, valor que
+não vira JSON) é dividido até isolar esse registro; os demais são gravados. Com
+o banco indisponível o lote volta para o buffer e é tentado de novo, até
+AUDITORIA_MAX_TENTATIVAS vezes. Registros que não puderam ser gravados vão para
+o log "usinasoft.auditoria.descartes", um JSON por linha.
+
+O autor da ação vem da requisição corrente, guardada pelo AuditoriaMiddleware.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+logger_descartes = logging.getLogger("usinasoft.auditoria.descartes")
+
+ACAO_CRIAR = "criar"
+ACAO_ATUALIZAR = "atualizar"
+ACAO_EXCLUIR = "excluir"
+
+# Campos que não entram no diff (controlados pelo próprio banco/ORM)
+CAMPOS_IGNORADOS = {"id", "created_at", "updated_at"}
+
+# Campos cujo valor nunca é gravado no log, apenas o fato de terem mudado
+CAMPOS_SENSIVEIS = {"password"}
+
+# Chave interna dos registros no buffer: quantas gravações já falharam
+TENTATIVAS = "_tentativas"
+
+_requisicao_atual = contextvars.ContextVar("requisicao_auditoria", default=None)
+_encoder = DjangoJSONEncoder()
+
+
+class AuditoriaMiddleware:
+    """Disponibiliza a requisição corrente para identificar o autor das ações auditadas."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _requisicao_atual.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _requisicao_atual.reset(token)
+
+
+def usuario_atual_id():
+    """Id do usuário autenticado na requisição corrente, ou None."""
+    request = _requisicao_atual.get()
+    # O DRF repassa o usuário autenticado (ex.: via JWT) para o HttpRequest
+    usuario = getattr(request, "user", None)
+    if usuario is not None and usuario.is_authenticated:
+        return usuario.pk
+    return None
+
+
+class AuditavelMixin:
+    """
+    Mixin de modelo que guarda os valores carregados do banco, usados para
+    calcular os campos alterados sem uma consulta extra antes de salvar.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._valores_auditoria = dict(zip(field_names, values))
+        return instance
+
+    def valores_auditoria(self):
+        """Valores atuais dos campos concretos auditáveis (não adiados)."""
+        adiados = self.get_deferred_fields()
+        return {
+            campo.attname: getattr(self, campo.attname)
+            for campo in self._meta.concrete_fields
+            if campo.attname not in adiados and campo.attname not in CAMPOS_IGNORADOS
+        }
+
+    def registrar_valores_auditoria(self):
+        """Memoriza os valores atuais como o último estado persistido."""
+        self._valores_auditoria = self.valores_auditoria()
+
+
+def _valor_json(campo, valor):
+    if campo in CAMPOS_SENSIVEIS:
+        return "***"
+    if valor is None or isinstance(valor, (str, int, float, bool, list, dict)):
+        return valor
+    try:
+        return _encoder.default(valor)
+    except TypeError:
+        return str(valor)
+
+
+def valores_para_log(valores):
+    """Converte um dicionário de valores de campos para o formato JSON de detalhes."""
+    return {campo: _valor_json(campo, valor) for campo, valor in valores.items()}
+
+
+def campos_alterados(instance, update_fields=None):
+    """
+    Diferença entre os valores carregados do banco e os atuais da instância,
+    no formato {campo: {"de": ..., "para": ...}}.
+    """
+    anteriores = getattr(instance, "_valores_auditoria", {})
+    atuais = instance.valores_auditoria()
+    if update_fields is not None:
+        nomes = {instance._meta.get_field(nome).attname for nome in update_fields}
+        atuais = {campo: valor for campo, valor in atuais.items() if campo in nomes}
+
+    return {
+        campo: {"de": _valor_json(campo, anteriores[campo]), "para": _valor_json(campo, valor)}
+        for campo, valor in atuais.items()
+        if campo in anteriores and anteriores[campo] != valor
+    }
+
+
+class GravadorAuditoria:
+    """Buffer de registros de LogAcao gravado em lote por uma thread em segundo plano."""
+
+    def __init__(self):
+        self._iniciar_estado()
+
+    def _iniciar_estado(self):
+        # Também chamado no processo filho após um fork (ex.: gunicorn com preload_app):
+        # locks e threads do processo pai não existem no filho.
+        self._pid = os.getpid()
+        self._condicao = threading.Condition()
+        self._buffer = []
+        self._thread = None
+        self._encerrando = False
+
+    def registrar(self, registro):
+        """Adiciona um registro (kwargs de LogAcao) ao buffer ou o grava na hora."""
+        if not settings.AUDITORIA_ASSINCRONA:
+            self._gravar_ou_descartar([registro])
+            return
+
+        if self._pid != os.getpid():
+            self._iniciar_estado()
+
+        with self._condicao:
+            sincrono = self._encerrando or len(self._buffer) >= settings.AUDITORIA_LIMITE_BUFFER
+            if not sincrono:
+                self._buffer.append(registro)
+                self._garantir_thread()
+                if len(self._buffer) >= settings.AUDITORIA_TAMANHO_LOTE:
+                    self._condicao.notify()
+
+        if sincrono:
+            self._gravar_ou_descartar([registro])
+
+    def _garantir_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._executar, name="auditoria-logacao", daemon=True
+            )
+            self._thread.start()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(
+                    lambda: self._encerrando
+                    or len(self._buffer) >= settings.AUDITORIA_TAMANHO_LOTE,
+                    timeout=settings.AUDITORIA_INTERVALO,
+                )
+                lote, self._buffer = self._buffer, []
+                encerrando = self._encerrando
+
+            if lote:
+                close_old_connections()
+                falhas = self._gravar(lote)
+                if falhas:
+                    self._devolver(falhas)
+            if encerrando:
+                close_old_connections()
+                return
+
+    def _devolver(self, lote):
+        """
+        Recoloca no fim do buffer os registros que falharam por o banco estar
+        indisponível; os que já esgotaram as tentativas, ou que não cabem no
+        buffer, são descartados.
+        """
+        novos = []
+        for registro in lote:
+            registro[TENTATIVAS] = registro.get(TENTATIVAS, 0) + 1
+            if registro[TENTATIVAS] >= settings.AUDITORIA_MAX_TENTATIVAS:
+                self._descartar([registro], "tentativas esgotadas")
+            else:
+                novos.append(registro)
+
+        with self._condicao:
+            espaco = max(settings.AUDITORIA_LIMITE_BUFFER - len(self._buffer), 0)
+            self._buffer.extend(novos[:espaco])
+        if len(novos) > espaco:
+            self._descartar(novos[espaco:], "buffer cheio")
+
+    def _descartar(self, lote, motivo):
+        logger.error("%d registro(s) de auditoria descartados: %s", len(lote), motivo)
+        for registro in lote:
+            dados = {campo: valor for campo, valor in registro.items() if campo != TENTATIVAS}
+            logger_descartes.error(json.dumps(dados, default=str))
+
+    def _gravar(self, lote):
+        """
+        Grava o lote e devolve os registros que falharam por erro de conexão
+        com o banco. Em qualquer outro erro o lote é dividido ao meio até isolar
+        os registros inválidos, que são descartados.
+        """
+        from usuarios.models import LogAcao
+
+        try:
+            # O bulk_create grava todos os sub-lotes em uma transação: uma falha no meio não
+            # deixa parte do lote gravada para a nova tentativa
+            LogAcao.objects.bulk_create(
+                [
+                    LogAcao(**{c: v for c, v in registro.items() if c != TENTATIVAS})
+                    for registro in lote
+                ],
+                batch_size=settings.AUDITORIA_TAMANHO_LOTE,
+            )
+            return []
+        except (OperationalError, InterfaceError):
+            logger.exception("Banco indisponível ao gravar %d registros de auditoria", len(lote))
+            return lote
+        except Exception:
+            if len(lote) == 1:
+                logger.exception("Registro de auditoria inválido")
+                self._descartar(lote, "registro inválido")
+                return []
+            meio = len(lote) // 2
+            return self._gravar(lote[:meio]) + self._gravar(lote[meio:])
+
+    def _gravar_ou_descartar(self, lote):
+        """Gravação sem nova tentativa (modo síncrono e encerramento)."""
+        falhas = self._gravar(lote)
+        if falhas:
+            self._descartar(falhas, "banco indisponível")
+
+    def descarregar(self):
+        """Grava imediatamente, na thread atual, tudo o que está no buffer."""
+        with self._condicao:
+            lote, self._buffer = self._buffer, []
+        if lote:
+            self._gravar_ou_descartar(lote)
+
+    def encerrar(self, timeout=5):
+        """Para a thread de gravação e descarrega o buffer (encerramento do worker)."""
+        if self._pid != os.getpid():
+            return
+        with self._condicao:
+            self._encerrando = True
+            self._condicao.notify()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self.descarregar()
+
+
+gravador = GravadorAuditoria()
+atexit.register(gravador.encerrar)
+
+
+def registrar_acao(acao, alvo_tipo, alvo_id, detalhes=None, usuario_id=None):
+    """
+    Agenda um registro de auditoria para depois do commit da transação corrente
+    (ações desfeitas por rollback não são auditadas).
+
+    Sem usuario_id explícito, o autor é o usuário autenticado na requisição corrente.
+    """
+    registro = {
+        "usuario_id": usuario_id if usuario_id is not None else usuario_atual_id(),
+        "acao": acao,
+        "alvo_tipo": alvo_tipo,
+        "alvo_id": alvo_id,
+        "detalhes": detalhes,
+        "created_at": timezone.now(),
+    }
+    transaction.on_commit(lambda: gravador.registrar(registro))
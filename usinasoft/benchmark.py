@@ -0,0 +1,229 @@
+"""
+Execução de benchmarks contra as rotas reais da API (comando benchmark).
+
+Dois modos:
+- em processo: django.test.Client, passando por toda a pilha de middlewares e
+  views sem servidor HTTP (mede o custo da aplicação);
+- HTTP: requisições a um servidor em execução (ex.: gunicorn local), com
+  várias conexões simultâneas (mede também o servidor e a concorrência).
+  ClientesLentos ocupa conexões extras enviando a requisição aos poucos, como
+  um tablet com rede ruim, para medir o efeito deles nos demais clientes.
+
+As consultas SQL por requisição vêm do cabeçalho Server-Timing do
+MetricasMiddleware (METRICAS_ATIVAS=True no servidor).
+"""
+
+import http.client
+import json
+import math
+import random
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+re_consultas = re.compile(r'desc="(\d+) consultas"')
+
+
+class ClienteDjango:
+    """Requisições em processo com o django.test.Client."""
+
+    def __init__(self, token):
+        from django.test import Client
+
+        self._client = Client(
+            raise_request_exception=False,
+            HTTP_HOST="localhost",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+    def requisitar(self, metodo, caminho, corpo=None):
+        kwargs = {}
+        if corpo is not None:
+            kwargs = {"data": json.dumps(corpo), "content_type": "application/json"}
+        resposta = getattr(self._client, metodo.lower())(caminho, **kwargs)
+        conteudo = b"".join(resposta.streaming_content) if resposta.streaming else resposta.content
+        return resposta.status_code, resposta.get("Server-Timing", ""), conteudo
+
+
+class ClienteHttp:
+    """Requisições HTTP com uma conexão persistente (keep-alive) por thread."""
+
+    def __init__(self, token, url_base):
+        partes = urlsplit(url_base)
+        self._classe = (
+            http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        )
+        self._endereco = partes.netloc
+        self._prefixo = partes.path.rstrip("/")
+        self._cabecalhos = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+        self._local = threading.local()
+
+    def _conexao(self):
+        if getattr(self._local, "conexao", None) is None:
+            self._local.conexao = self._classe(self._endereco, timeout=60)
+        return self._local.conexao
+
+    def requisitar(self, metodo, caminho, corpo=None):
+        cabecalhos = dict(self._cabecalhos)
+        dados = None
+        if corpo is not None:
+            dados = json.dumps(corpo).encode()
+            cabecalhos["Content-Type"] = "application/json"
+        conexao = self._conexao()
+        try:
+            conexao.request(metodo, self._prefixo + caminho, body=dados, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            conteudo = resposta.read()
+        except (http.client.HTTPException, OSError):
+            # Conexão encerrada pelo servidor (ex.: worker reciclado): a próxima abre outra
+            conexao.close()
+            self._local.conexao = None
+            raise
+        return resposta.status, resposta.getheader("Server-Timing", ""), conteudo
+
+
+class ClientesLentos:
+    """
+    Conexões que enviam os cabeçalhos de uma requisição um byte a cada
+    `intervalo` segundos, enquanto o bloco with estiver ativo. Se o servidor
+    encerrar a conexão, outra é aberta.
+    """
+
+    def __init__(self, url_base, quantidade, intervalo=1.0):
+        partes = urlsplit(url_base)
+        self._endereco = (partes.hostname, partes.port or 80)
+        self._quantidade = quantidade
+        self._intervalo = intervalo
+        self._parar = threading.Event()
+        self._threads = []
+
+    def __enter__(self):
+        for _ in range(self._quantidade):
+            thread = threading.Thread(target=self._conexao_lenta, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        # Dá tempo para as conexões chegarem ao servidor antes da medição
+        time.sleep(self._intervalo)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._parar.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _conexao_lenta(self):
+        while not self._parar.is_set():
+            try:
+                with socket.create_connection(self._endereco, timeout=5) as conexao:
+                    conexao.sendall(b"GET /api/ HTTP/1.1\r\nHost: localhost\r\n")
+                    while not self._parar.wait(self._intervalo):
+                        conexao.sendall(b"X")
+            except OSError:
+                self._parar.wait(self._intervalo)
+
+
+def cenarios(status_pecas, semente=42):
+    """
+    Cenários medidos: nome -> função que recebe o índice da requisição e devolve
+    (método, caminho, corpo).
+
+    Os indicadores usam um período diferente a cada requisição, para medir o
+    cálculo e não o cache. O fim do período é sorteado com a semente: a mesma
+    semente repete as mesmas requisições, e execuções comparadas contra um cache
+    compartilhado (Redis) devem usar sementes diferentes. A atualização de status
+    percorre as peças de status_pecas ({id: status atual}) alternando entre
+    em_andamento e pausada, para que toda requisição de fato altere a peça.
+    """
+    hoje = date.today()
+    fim = hoje + timedelta(days=random.Random(semente).randrange(3650))
+    ids_pecas = list(status_pecas)
+
+    def indicadores(i):
+        inicio = hoje - timedelta(days=30 + i % 300)
+        return "GET", f"/api/indicadores/summary/?start={inicio}&end={fim}", None
+
+    def status_peca(i):
+        peca = ids_pecas[i % len(ids_pecas)]
+        novo = "pausada" if status_pecas[peca] == "em_andamento" else "em_andamento"
+        status_pecas[peca] = novo
+        return "PATCH", f"/api/pecas/{peca}/", {"status": novo}
+
+    return {
+        "pecas_lista": lambda i: ("GET", "/api/pecas/", None),
+        "ops_lista": lambda i: ("GET", "/api/ops/", None),
+        "indicadores_summary": indicadores,
+        "pecas_status": status_peca,
+    }
+
+
+def percentil(valores, p):
+    """Percentil por posição mais próxima (valores ordenados)."""
+    if not valores:
+        return None
+    indice = min(len(valores), max(1, math.ceil(p / 100 * len(valores)))) - 1
+    return valores[indice]
+
+
+def executar_cenario(cliente, cenario, requisicoes, concorrencia=1, aquecimento=0):
+    """Executa o cenário e devolve as estatísticas de latência, vazão e consultas."""
+
+    def requisitar(i):
+        try:
+            status, server_timing, _ = cliente.requisitar(*cenario(i))
+        except (http.client.HTTPException, OSError):
+            # Inclui tempo esgotado: conta como erro
+            status, server_timing = None, ""
+        return status, server_timing
+
+    for i in range(aquecimento):
+        requisitar(i)
+
+    def medir(i):
+        inicio = time.perf_counter()
+        status, server_timing = requisitar(aquecimento + i)
+        duracao = time.perf_counter() - inicio
+        consultas = re_consultas.search(server_timing)
+        return duracao, status, int(consultas.group(1)) if consultas else None
+
+    inicio = time.perf_counter()
+    if concorrencia > 1:
+        with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+            resultados = list(executor.map(medir, range(requisicoes)))
+    else:
+        resultados = [medir(i) for i in range(requisicoes)]
+    total = time.perf_counter() - inicio
+
+    latencias = sorted(duracao * 1000 for duracao, _, _ in resultados)
+    consultas = [n for _, _, n in resultados if n is not None]
+    erros = sum(1 for _, status, _ in resultados if status is None or status >= 400)
+    return {
+        "requisicoes": requisicoes,
+        "erros": erros,
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p95_ms": round(percentil(latencias, 95), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+        "media_ms": round(sum(latencias) / len(latencias), 2),
+        "max_ms": round(latencias[-1], 2),
+        "vazao_rps": round(requisicoes / total, 2),
+        "consultas_media": round(sum(consultas) / len(consultas), 2) if consultas else None,
+        "consultas_max": max(consultas) if consultas else None,
+    }
+
+
+def comparar(atual, base):
+    """Variação percentual de latência e vazão em relação a uma execução anterior."""
+    diferencas = {}
+    for nome, resultado in atual["cenarios"].items():
+        anterior = base.get("cenarios", {}).get(nome)
+        if not anterior:
+            continue
+        diferencas[nome] = {
+            metrica: round((resultado[metrica] - anterior[metrica]) / anterior[metrica] * 100, 1)
+            for metrica in ("p50_ms", "p95_ms", "p99_ms", "vazao_rps")
+            if anterior.get(metrica)
+        }
+    return diferencas
@@ -0,0 +1,170 @@
+"""
+Campos esparsos (?fields=) e relações expandidas (?expand=) nas listagens e
+detalhes da API.
+
+- CamposDinamicosSerializerMixin: o serializer recebe ``campos`` e ``expandir``
+  e remove os campos não pedidos; as relações declaradas em Meta.expansoes
+  passam a ser serializadas por completo em vez de só o id.
+- CamposDinamicosMixin: o viewset lê os parâmetros da requisição, repassa ao
+  serializer e ajusta o queryset (only(), select_related e anotações) para não
+  carregar colunas, relações nem agregações que não serão exibidas.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def _lista_parametro(valor):
+    return [item.strip() for item in valor.split(",") if item.strip()]
+
+
+class CamposDinamicosSerializerMixin:
+    """
+    Mixin de ModelSerializer com campos esparsos e relações expandidas.
+
+    Meta.expansoes mapeia o nome de um campo de relação para
+    (caminho do serializer aninhado, campos do aninhado ou None para todos).
+    """
+
+    def __init__(self, *args, campos=None, expandir=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        expansoes = getattr(self.Meta, "expansoes", {})
+
+        invalidas = sorted(set(expandir or ()) - set(expansoes))
+        if invalidas:
+            raise ValidationError({"expand": f"Relações não expansíveis: {', '.join(invalidas)}."})
+
+        for nome in expandir or ():
+            caminho, campos_aninhados = expansoes[nome]
+            self.fields[nome] = import_string(caminho)(campos=campos_aninhados, read_only=True)
+
+        if campos is not None:
+            permitidos = {nome for nome, campo in self.fields.items() if not campo.write_only}
+            invalidos = sorted(set(campos) - permitidos)
+            if invalidos:
+                raise ValidationError({"fields": f"Campos inexistentes: {', '.join(invalidos)}."})
+
+            manter = set(campos) | set(expandir or ())
+            for nome in list(self.fields):
+                if nome not in manter and not self.fields[nome].write_only:
+                    self.fields.pop(nome)
+
+
+def _colunas_do_campo(modelo, atributos, prefixo=""):
+    """
+    Colunas (para only()) e relações (para select_related) necessárias para ler
+    o source de um campo, ex.: ["cliente", "nome"] -> ({"cliente__nome"}, {"cliente"}).
+    """
+    colunas, relacoes = set(), set()
+    for indice, atributo in enumerate(atributos):
+        try:
+            campo = modelo._meta.get_field(atributo)
+        except FieldDoesNotExist:
+            # Propriedade ou método (ex.: get_full_name): carrega o objeto inteiro
+            colunas.update(f"{prefixo}{campo.name}" for campo in modelo._meta.concrete_fields)
+            return colunas, relacoes
+
+        if campo.many_to_one or campo.one_to_one:
+            colunas.add(f"{prefixo}{atributo}")
+            if indice < len(atributos) - 1:
+                prefixo = f"{prefixo}{atributo}__"
+                relacoes.add(prefixo[:-2])
+                modelo = campo.related_model
+                continue
+        else:
+            colunas.add(f"{prefixo}{atributo}")
+        return colunas, relacoes
+    return colunas, relacoes
+
+
+def requisitos_serializer(serializer, modelo, prefixo="", campos_anotados=None):
+    """
+    Colunas, relações e anotações (métodos do queryset) necessárias para os
+    campos de leitura do serializer.
+    """
+    colunas, relacoes, anotacoes = {f"{prefixo}{modelo._meta.pk.name}"}, set(), set()
+    for nome, campo in serializer.fields.items():
+        if campo.write_only:
+            continue
+        if campos_anotados and nome in campos_anotados:
+            anotacoes.add(campos_anotados[nome])
+            continue
+
+        if isinstance(campo, serializers.BaseSerializer):
+            # Relação expandida: carrega só as colunas usadas pelo serializer aninhado
+            relacao = modelo._meta.get_field(campo.source)
+            colunas.add(f"{prefixo}{campo.source}")
+            relacoes.add(f"{prefixo}{campo.source}")
+            sub_colunas, sub_relacoes, _ = requisitos_serializer(
+                campo, relacao.related_model, f"{prefixo}{campo.source}__"
+            )
+            colunas |= sub_colunas
+            relacoes |= sub_relacoes
+            continue
+
+        if campo.source == "*":
+            continue
+        sub_colunas, sub_relacoes = _colunas_do_campo(modelo, campo.source_attrs, prefixo)
+        colunas |= sub_colunas
+        relacoes |= sub_relacoes
+
+    return colunas, relacoes, anotacoes
+
+
+class CamposDinamicosMixin:
+    """
+    Viewset com ?fields=campo1,campo2 e ?expand=relacao1,relacao2 em list e retrieve.
+
+    Subclasses podem definir campos_anotados: campos do serializer que dependem
+    de uma anotação do queryset, mapeados para o método do queryset que a
+    aplica (ex.: {"total_pecas": "com_estatisticas"}). O queryset base não deve
+    ter essas anotações: elas são aplicadas aqui só quando algum desses campos
+    é exibido (ou sempre, sem ?fields=).
+    """
+
+    campos_anotados = {}
+    acoes_campos_dinamicos = ("list", "retrieve")
+    # Ligado por quem só agrega o queryset (ex.: GetCondicionalMixin): nada é aplicado
+    sem_anotacoes = False
+
+    def parametros_campos(self):
+        """(campos, expandir) pedidos na requisição; None quando ausentes."""
+        if getattr(self, "action", None) not in self.acoes_campos_dinamicos:
+            return None, None
+        params = self.request.query_params
+        campos = _lista_parametro(params["fields"]) if "fields" in params else None
+        expandir = _lista_parametro(params["expand"]) if "expand" in params else None
+        return campos, expandir
+
+    def get_serializer(self, *args, **kwargs):
+        campos, expandir = self.parametros_campos()
+        if campos is not None:
+            kwargs.setdefault("campos", campos)
+        if expandir is not None:
+            kwargs.setdefault("expandir", expandir)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.sem_anotacoes:
+            return qs
+        campos, expandir = self.parametros_campos()
+        if campos is None and expandir is None:
+            for metodo in dict.fromkeys(self.campos_anotados.values()):
+                qs = getattr(qs, metodo)()
+            return qs
+
+        colunas, relacoes, anotacoes = requisitos_serializer(
+            self.get_serializer(), qs.model, campos_anotados=self.campos_anotados
+        )
+        for metodo in sorted(anotacoes):
+            qs = getattr(qs, metodo)()
+
+        qs = qs.select_related(None)
+        if relacoes:
+            qs = qs.select_related(*sorted(relacoes))
+        if campos is not None:
+            qs = qs.only(*sorted(colunas))
+        return qs
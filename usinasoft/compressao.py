@@ -0,0 +1,55 @@
+"""
+Compressão das respostas da API: Brotli quando o pacote brotli está instalado
+e o cliente o aceita, senão gzip (GZipMiddleware do Django).
+
+Brotli vale só para respostas application/json. Páginas HTML (admin, API
+navegável) podem trazer o token CSRF junto de texto vindo da requisição, o
+cenário do ataque BREACH: elas ficam com o gzip do Django, que acrescenta
+bytes aleatórios à resposta comprimida contra esse ataque.
+
+Respostas menores que COMPRESSAO_TAMANHO_MINIMO bytes não são comprimidas.
+Respostas em streaming (exportações) usam sempre gzip, que o Django comprime
+por partes. O ETag forte passa a fraco (W/"..."), o que continua valendo para
+If-None-Match.
+"""
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+re_aceita_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class CompressaoMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.COMPRESSAO_TAMANHO_MINIMO:
+            return response
+
+        aceita = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not re_aceita_brotli.search(aceita)
+            or response.get("Content-Type", "").split(";")[0].strip() != "application/json"
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        comprimido = brotli.compress(response.content, quality=settings.COMPRESSAO_BROTLI_QUALIDADE)
+        if len(comprimido) >= len(response.content):
+            return response
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
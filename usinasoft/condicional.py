@@ -0,0 +1,172 @@
+import hashlib
+import time
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, OuterRef, Subquery, Window
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from sincronizacao.models import RegistroExclusao
+
+
+def gerar_etag(*partes):
+    """ETag forte a partir de uma representação estável das partes informadas."""
+    return '"%s"' % hashlib.md5(repr(partes).encode()).hexdigest()
+
+
+class GetCondicionalMixin:
+    """
+    Suporte a GET condicional (If-None-Match / If-Modified-Since) em viewsets.
+
+    Antes de serializar, calcula um validador só dos registros que a resposta
+    mostra (o do detalhe ou os da página pedida): id e datas de alteração de cada
+    um, com microssegundos, mais o total de registros da lista. Se o cliente já
+    tiver a mesma versão, responde 304 Not Modified sem carregar nem serializar
+    nada. Na lista são duas consultas limitadas à página: os ids da página com o
+    total (função de janela, sem varrer relações) e as datas desses registros.
+
+    Subclasses definem:
+    - campos_validacao: campos de data que entram no validador, incluindo os de
+      relações exibidas pelo serializer (ex.: "cliente__updated_at")
+    - relacoes_contadas_validacao: relações reversas cuja contagem e maior
+      updated_at também entram no validador (ex.: "pecas", quando o serializer
+      expõe totais de peças); calculadas por subconsultas por registro
+    - tipos_exclusao_validacao: tipos de RegistroExclusao cuja exclusão mais
+      recente entra no validador e no Last-Modified (exclusões de registros
+      relacionados não mudam nenhum updated_at)
+    """
+
+    campos_validacao = ["updated_at"]
+    relacoes_contadas_validacao = []
+    tipos_exclusao_validacao = []
+
+    def get_queryset_validacao(self):
+        # Sem as anotações dos campos exibidos (CamposDinamicosMixin), que o
+        # validador não usa e que forçariam as contagens por registro
+        self.sem_anotacoes = True
+        try:
+            return self.filter_queryset(self.get_queryset())
+        finally:
+            self.sem_anotacoes = False
+
+    def pagina_validacao(self, qs):
+        """
+        Retorna (ids da página pedida, na ordem da resposta, e total do queryset),
+        ou None quando a página não pode ser determinada (ex.: ?page=last ou além
+        da última): a lista segue então sem GET condicional.
+        """
+        inicio, fim = 0, None
+        tamanho = self.paginator.get_page_size(self.request) if self.paginator else None
+        if tamanho:
+            try:
+                numero = int(self.request.query_params.get(self.paginator.page_query_param, 1))
+            except ValueError:
+                return None
+            if numero < 1:
+                return None
+            inicio, fim = (numero - 1) * tamanho, numero * tamanho
+
+        # O total vem da janela, calculada antes do LIMIT, na mesma consulta dos ids
+        linhas = list(
+            qs.annotate(_total_validacao=Window(Count("pk"))).values_list("pk", "_total_validacao")[
+                inicio:fim
+            ]
+        )
+        if not linhas:
+            return None if inicio else ([], 0)
+        return [pk for pk, _ in linhas], linhas[0][1]
+
+    def calcular_validadores(self, qs, ordem=None, total=None):
+        """
+        Retorna (etag, última modificação) dos registros do queryset, que deve
+        estar limitado ao que a resposta mostra. ordem: ids na ordem da resposta;
+        total: total de registros da lista, quando houver.
+        """
+        anotacoes = {}
+        for relacao in self.relacoes_contadas_validacao:
+            campo = qs.model._meta.get_field(relacao)
+            relacionados = (
+                campo.related_model.objects.filter(**{campo.field.name: OuterRef("pk")})
+                .order_by()
+                .values(campo.field.name)
+            )
+            anotacoes[f"_total_{relacao}"] = Subquery(
+                relacionados.annotate(total=Count("pk")).values("total")
+            )
+            anotacoes[f"_max_{relacao}"] = Subquery(
+                relacionados.annotate(maximo=Max("updated_at")).values("maximo")
+            )
+        if self.tipos_exclusao_validacao:
+            anotacoes["_ultima_exclusao"] = Subquery(
+                RegistroExclusao.objects.filter(tipo__in=self.tipos_exclusao_validacao)
+                .order_by("-excluido_em")
+                .values("excluido_em")[:1]
+            )
+
+        campos = ["pk", *self.campos_validacao, *anotacoes]
+        linhas = {
+            linha[0]: linha for linha in qs.annotate(**anotacoes).order_by().values_list(*campos)
+        }
+        linhas = [linhas[pk] for pk in ordem if pk in linhas] if ordem else list(linhas.values())
+
+        datas = [valor for linha in linhas for valor in linha if isinstance(valor, datetime)]
+        ultima_modificacao = max(datas) if datas else None
+
+        etag = gerar_etag(
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            total,
+            linhas,
+        )
+        return etag, ultima_modificacao
+
+    def list(self, request, *args, **kwargs):
+        # No modo cursor o validador (que conta a lista inteira) anularia a
+        # vantagem de não executar COUNT(*); essas páginas seguem sem ETag.
+        usa_cursor = getattr(self.paginator, "usa_cursor", None)
+        if usa_cursor and usa_cursor(request):
+            return super().list(request, *args, **kwargs)
+
+        qs = self.get_queryset_validacao()
+        pagina = self.pagina_validacao(qs)
+        if pagina is None:
+            return super().list(request, *args, **kwargs)
+
+        # Na lista só o ETag é usado: Last-Modified não percebe exclusões
+        pks, total = pagina
+        etag, _ = self.calcular_validadores(qs.filter(pk__in=pks), ordem=pks, total=total)
+        nao_modificado = get_conditional_response(request, etag=etag)
+        if nao_modificado is not None:
+            return nao_modificado
+
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filtro = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            etag, ultima_modificacao = self.calcular_validadores(
+                self.get_queryset_validacao().filter(**filtro)
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Id inválido: o retrieve padrão responde 404
+            return super().retrieve(request, *args, **kwargs)
+
+        # Last-Modified só tem segundos: é enviado (e If-Modified-Since avaliado) apenas
+        # quando a última alteração é de um segundo anterior ao atual, para que qualquer
+        # alteração posterior mude o valor. O ETag compara as datas com microssegundos.
+        last_modified = None
+        if ultima_modificacao and int(ultima_modificacao.timestamp()) < int(time.time()):
+            last_modified = int(ultima_modificacao.timestamp())
+        nao_modificado = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if nao_modificado is not None:
+            return nao_modificado
+
+        response = super().retrieve(request, *args, **kwargs)
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
@@ -0,0 +1,183 @@
+"""
+Publicação de eventos de status (peças e OPs) para o stream SSE.
+
+Os signals de pecas/producao chamam publicar_evento(); o evento é entregue ao
+backend configurado em EVENTOS_BACKEND após o commit da transação:
+
+- BackendLocal (padrão): pub/sub em memória, só alcança conexões SSE do mesmo
+  processo. Suficiente para um único worker ASGI e para os testes.
+- BackendRedis: pub/sub do Redis (EVENTOS_REDIS_URL), para distribuir os eventos
+  entre vários workers. Requer o pacote ``redis``.
+
+Falhas ao publicar são registradas em log e nunca interrompem a gravação.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class AssinaturaLocal:
+    """Fila de eventos de uma conexão SSE, alimentada pelo BackendLocal."""
+
+    def __init__(self, backend, tamanho_maximo):
+        self._backend = backend
+        self._fila = asyncio.Queue(maxsize=tamanho_maximo)
+        self._loop = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._backend._adicionar(self)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._backend._remover(self)
+
+    def entregar(self, evento):
+        # Chamado a partir da thread que publicou (ex.: thread da view síncrona)
+        self._loop.call_soon_threadsafe(self._colocar, evento)
+
+    def _colocar(self, evento):
+        try:
+            self._fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Consumidor lento: descarta em vez de acumular memória
+            logger.warning("Fila de eventos cheia; evento %s descartado", evento.get("id"))
+
+    async def proximo(self, timeout):
+        """Próximo evento, ou None se nenhum chegar em `timeout` segundos."""
+        try:
+            return await asyncio.wait_for(self._fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BackendLocal:
+    """Pub/sub em memória do processo."""
+
+    tamanho_fila = 1000
+
+    def __init__(self):
+        self._assinantes = set()
+        self._lock = threading.Lock()
+
+    def _adicionar(self, assinatura):
+        with self._lock:
+            self._assinantes.add(assinatura)
+
+    def _remover(self, assinatura):
+        with self._lock:
+            self._assinantes.discard(assinatura)
+
+    def publicar(self, evento):
+        with self._lock:
+            assinantes = list(self._assinantes)
+        for assinatura in assinantes:
+            assinatura.entregar(evento)
+
+    def assinar(self):
+        return AssinaturaLocal(self, self.tamanho_fila)
+
+
+class AssinaturaRedis:
+    """Assinatura de um canal Redis com o cliente assíncrono do redis-py."""
+
+    def __init__(self, url, canal):
+        self._url = url
+        self._canal = canal
+
+    async def __aenter__(self):
+        import redis.asyncio
+
+        self._redis = redis.asyncio.from_url(self._url)
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self._canal)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._pubsub.unsubscribe(self._canal)
+        await self._pubsub.close()
+        await self._redis.close()
+
+    async def proximo(self, timeout):
+        """Próximo evento, ou None se nenhum chegar em `timeout` segundos."""
+        # get_message com timeout, em vez de cancelar um listen() a cada heartbeat:
+        # o cancelamento no meio da leitura pode deixar a conexão em estado inválido
+        loop = asyncio.get_running_loop()
+        limite = loop.time() + timeout
+        while (restante := limite - loop.time()) > 0:
+            mensagem = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=restante
+            )
+            if mensagem is not None and mensagem["type"] == "message":
+                return json.loads(mensagem["data"])
+        return None
+
+
+class BackendRedis:
+    """Pub/sub via Redis, para fan-out entre vários workers/servidores."""
+
+    canal = "usinasoft:eventos"
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("BackendRedis requer o pacote 'redis' (pip install redis).")
+        self._url = settings.EVENTOS_REDIS_URL
+        self._cliente = redis.Redis.from_url(self._url)
+
+    def publicar(self, evento):
+        self._cliente.publish(self.canal, json.dumps(evento, cls=DjangoJSONEncoder))
+
+    def assinar(self):
+        return AssinaturaRedis(self._url, self.canal)
+
+
+def get_backend():
+    """Instância única (por processo) do backend configurado em EVENTOS_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.EVENTOS_BACKEND)()
+    return _backend
+
+
+def publicar_evento(tipo, **dados):
+    """
+    Agenda a publicação de um evento para depois do commit da transação corrente.
+
+    Ex.: publicar_evento("peca.status", peca=..., status_anterior=..., status=...)
+    """
+    evento = {
+        "id": uuid.uuid4().hex,
+        "tipo": tipo,
+        "emitido_em": timezone.now().isoformat(),
+        **{
+            chave: str(valor) if isinstance(valor, uuid.UUID) else valor
+            for chave, valor in dados.items()
+        },
+    }
+
+    def _publicar():
+        try:
+            get_backend().publicar(evento)
+        except Exception:
+            logger.exception("Falha ao publicar o evento %s", tipo)
+
+    transaction.on_commit(_publicar)
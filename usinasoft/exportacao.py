@@ -0,0 +1,131 @@
+import csv
+import json
+from datetime import date, datetime, time
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+FORMATOS_EXPORTACAO = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+
+class _Eco:
+    """Pseudo-buffer para o csv.writer: devolve a linha em vez de guardá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, cls=DjangoJSONEncoder, ensure_ascii=False)
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    return valor
+
+
+def _linhas_csv(cabecalho, linhas):
+    escritor = csv.writer(_Eco())
+    # BOM para que o Excel reconheça o arquivo como UTF-8
+    yield "\ufeff" + escritor.writerow(cabecalho)
+    for linha in linhas:
+        yield escritor.writerow([_valor_csv(linha[campo]) for campo in cabecalho])
+
+
+def _linhas_jsonl(linhas):
+    for linha in linhas:
+        yield json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+async def _em_blocos(conteudo, linhas_por_bloco):
+    """
+    Versão assíncrona do gerador, para ASGI: cada bloco de linhas é lido do
+    gerador síncrono (e do banco) via sync_to_async. Com um iterador síncrono, o
+    Django sob ASGI consumiria a exportação inteira de uma vez antes de enviá-la.
+    """
+    ler_bloco = sync_to_async(lambda: "".join(islice(conteudo, linhas_por_bloco)))
+    while bloco := await ler_bloco():
+        yield bloco
+
+
+class ExportacaoMixin:
+    """
+    Adiciona a rota GET <recurso>/export/ a um viewset, exportando a lista
+    filtrada em CSV ou JSONL por streaming.
+
+    As linhas são lidas com values_list() e iterator(), sem instanciar modelos
+    nem passar pelos serializers, para que exportações grandes não acumulem
+    memória. Subclasses definem:
+    - colunas_exportacao: lista de (nome da coluna, lookup do ORM)
+    - nome_exportacao: prefixo do arquivo gerado
+    e podem sobrescrever transformar_linha_exportacao() para preencher campos
+    calculados, listados em colunas_calculadas_exportacao.
+
+    Parâmetros de query: formato (csv | jsonl, padrão csv) e start/end
+    (YYYY-MM-DD) sobre o created_at, além dos filtros normais da listagem.
+
+    Sob ASGI a resposta usa um iterador assíncrono que envia um bloco de
+    chunk_size_exportacao linhas por vez.
+    """
+
+    colunas_exportacao = []
+    colunas_calculadas_exportacao = []
+    nome_exportacao = "exportacao"
+    chunk_size_exportacao = 2000
+
+    def transformar_linha_exportacao(self, linha):
+        return linha
+
+    def filtrar_periodo_exportacao(self, qs):
+        tz = timezone.get_current_timezone()
+        start = self.request.query_params.get("start")
+        end = self.request.query_params.get("end")
+        if start:
+            inicio = timezone.make_aware(datetime.combine(date.fromisoformat(start), time.min), tz)
+            qs = qs.filter(created_at__gte=inicio)
+        if end:
+            fim = timezone.make_aware(datetime.combine(date.fromisoformat(end), time.max), tz)
+            qs = qs.filter(created_at__lte=fim)
+        return qs
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def exportar(self, request):
+        formato = request.query_params.get("formato", "csv")
+        if formato not in FORMATOS_EXPORTACAO:
+            return Response({"error": "formato inválido. Use: csv ou jsonl"}, status=400)
+
+        try:
+            qs = self.filtrar_periodo_exportacao(self.filter_queryset(self.get_queryset()))
+        except ValueError as e:
+            return Response(
+                {"error": f"Formato de data inválido. Use YYYY-MM-DD. Detalhes: {str(e)}"},
+                status=400,
+            )
+
+        nomes = [nome for nome, _ in self.colunas_exportacao]
+        lookups = [lookup for _, lookup in self.colunas_exportacao]
+        cabecalho = nomes + list(self.colunas_calculadas_exportacao)
+        tuplas = qs.values_list(*lookups).iterator(chunk_size=self.chunk_size_exportacao)
+        linhas = (self.transformar_linha_exportacao(dict(zip(nomes, t))) for t in tuplas)
+
+        if formato == "csv":
+            conteudo = _linhas_csv(cabecalho, linhas)
+        else:
+            conteudo = _linhas_jsonl(linhas)
+        if isinstance(request._request, ASGIRequest):
+            conteudo = _em_blocos(conteudo, self.chunk_size_exportacao)
+
+        resposta = StreamingHttpResponse(conteudo, content_type=FORMATOS_EXPORTACAO[formato])
+        nome_arquivo = f"{self.nome_exportacao}-{timezone.localdate().isoformat()}.{formato}"
+        resposta["Content-Disposition"] = f'attachment; filename="{nome_arquivo}"'
+        return resposta
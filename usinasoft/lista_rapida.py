@@ -0,0 +1,99 @@
+"""
+Listagem rápida: monta as linhas da resposta direto de values(), sem instanciar
+modelos nem serializar campo a campo.
+
+Em listas com centenas de linhas por página o custo de CPU do ModelSerializer
+(get_attribute + to_representation por campo) supera o do banco. O resultado
+é idêntico ao do serializer do viewset: mesmas chaves, na mesma ordem, e os
+mesmos tipos (datas em ISO 8601, UUIDs, "Z" para UTC).
+"""
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def _data_hora(valor, tz):
+    """Equivalente ao DateTimeField.to_representation do DRF no formato ISO 8601."""
+    valor = valor.astimezone(tz).isoformat()
+    if valor.endswith("+00:00"):
+        valor = valor[:-6] + "Z"
+    return valor
+
+
+def _conversor(campo, tz):
+    """Conversão de um valor bruto do banco para o formato do campo do serializer."""
+    if isinstance(campo, serializers.DateTimeField):
+        if getattr(campo, "format", api_settings.DATETIME_FORMAT).lower() != "iso-8601":
+            return campo.to_representation
+        return lambda valor: _data_hora(valor, tz)
+    if isinstance(campo, (serializers.DateField, serializers.UUIDField)):
+        return campo.to_representation
+    return None
+
+
+class ListaRapidaMixin:
+    """
+    Substitui a action list de um viewset por uma leitura com values().
+
+    Subclasses definem colunas_lista_rapida, uma lista de (nome, lookup do ORM)
+    com os campos do serializer lidos direto do banco, e podem sobrescrever
+    transformar_linha_lista_rapida() para preencher campos calculados a partir
+    de colunas auxiliares (nomes que não são campos do serializer são
+    descartados na resposta). Campos ausentes da linha ficam fora da resposta,
+    como o serializer faz com relações nulas.
+
+    O modo normal é usado quando LISTA_RAPIDA=False e quando a requisição
+    escolhe campos ou relações (?fields= / ?expand=).
+    """
+
+    colunas_lista_rapida = []
+
+    def usa_lista_rapida(self):
+        params = self.request.query_params
+        return (
+            settings.LISTA_RAPIDA
+            and bool(self.colunas_lista_rapida)
+            and "fields" not in params
+            and "expand" not in params
+        )
+
+    def transformar_linha_lista_rapida(self, linha):
+        return linha
+
+    def campos_lista_rapida(self):
+        """(nome, conversor) dos campos exibidos, na ordem do serializer."""
+        tz = timezone.get_current_timezone()
+        return [
+            (nome, _conversor(campo, tz))
+            for nome, campo in self.get_serializer().fields.items()
+            if not campo.write_only
+        ]
+
+    def list(self, request, *args, **kwargs):
+        if not self.usa_lista_rapida():
+            return super().list(request, *args, **kwargs)
+
+        nomes = [nome for nome, _ in self.colunas_lista_rapida]
+        lookups = [lookup for _, lookup in self.colunas_lista_rapida]
+        qs = self.filter_queryset(self.get_queryset()).values(*lookups)
+
+        pagina = self.paginate_queryset(qs)
+        campos = self.campos_lista_rapida()
+        dados = []
+        for valores in qs if pagina is None else pagina:
+            linha = self.transformar_linha_lista_rapida(
+                {nome: valores[lookup] for nome, lookup in zip(nomes, lookups)}
+            )
+            item = {}
+            for nome, conversor in campos:
+                if nome in linha:
+                    valor = linha[nome]
+                    item[nome] = conversor(valor) if conversor and valor is not None else valor
+            dados.append(item)
+
+        if pagina is not None:
+            return self.get_paginated_response(dados)
+        return Response(dados)
@@ -0,0 +1,338 @@
+"""
+Métricas por requisição: view, número de consultas SQL, tempo de banco e tempo
+total.
+
+O MetricasMiddleware mede cada requisição com connection.execute_wrapper e:
+- devolve os tempos no cabeçalho Server-Timing (visível no DevTools do navegador);
+- acumula contadores e histogramas por view no processo, expostos em formato
+  texto do Prometheus em GET /metrics;
+- verifica o orçamento de consultas da view (METRICAS_ORCAMENTO_CONSULTAS), se
+  houver: ao excedê-lo registra um aviso no log ou, com
+  METRICAS_ORCAMENTO_ESTRITO=True (testes), lança OrcamentoConsultasExcedido.
+
+Com vários workers do gunicorn, cada processo grava seus totais em um arquivo
+próprio em METRICAS_DIR (no máximo a cada METRICAS_INTERVALO_GRAVACAO segundos
+e no encerramento do worker), e o /metrics soma os arquivos de todos os
+processos. Quando um worker termina, o mestre soma o arquivo dele ao dos workers
+encerrados (consolidar_processo), mantendo um arquivo por worker vivo. Sem
+METRICAS_DIR, o /metrics mostra só o processo que atendeu.
+
+Consultas feitas durante o streaming da resposta (ex.: exportações) acontecem
+depois que o middleware retorna e não entram na conta.
+"""
+
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+PREFIXO = "usinasoft"
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# nome: (tipo, ajuda, buckets)
+METRICAS = {
+    "http_requisicoes_total": ("counter", "Requisições atendidas", None),
+    "http_duracao_segundos": ("histogram", "Tempo total da requisição", BUCKETS_SEGUNDOS),
+    "db_duracao_segundos": ("histogram", "Tempo em consultas SQL por requisição", BUCKETS_SEGUNDOS),
+    "db_consultas": ("histogram", "Consultas SQL por requisição", BUCKETS_CONSULTAS),
+    "orcamento_consultas_excedido_total": (
+        "counter",
+        "Requisições acima do orçamento de consultas da view",
+        None,
+    ),
+}
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Requisição com mais consultas SQL que o orçamento da view."""
+
+
+class RegistroMetricas:
+    """Contadores e histogramas do processo, gravados em arquivo quando há METRICAS_DIR."""
+
+    def __init__(self):
+        self._iniciar_estado()
+
+    def _iniciar_estado(self):
+        # Também chamado no processo filho após um fork: cada worker tem os próprios totais
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._series = {}
+        self._arquivo = None
+        self._gravado_em = time.monotonic()
+
+    def _verificar_processo(self):
+        if self._pid != os.getpid():
+            self._iniciar_estado()
+
+    def incrementar(self, nome, rotulos, valor=1):
+        self._verificar_processo()
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def observar(self, nome, rotulos, valor):
+        self._verificar_processo()
+        buckets = METRICAS[nome][2]
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._lock:
+            # Contagem por bucket (não acumulada), soma e total
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [0] * (len(buckets) + 1) + [0, 0]
+            serie[bisect_left(buckets, valor)] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def instantaneo(self):
+        with self._lock:
+            return {
+                chave: list(valor) if isinstance(valor, list) else valor
+                for chave, valor in self._series.items()
+            }
+
+    def _caminho_arquivo(self):
+        if self._arquivo is None:
+            # O uuid evita que um worker novo com um pid reaproveitado sobrescreva o antigo
+            self._arquivo = Path(settings.METRICAS_DIR) / f"{self._pid}-{uuid.uuid4().hex}.json"
+        return self._arquivo
+
+    def gravar(self, forcar=False):
+        """Grava os totais do processo em METRICAS_DIR (se configurado)."""
+        self._verificar_processo()
+        if not settings.METRICAS_DIR:
+            return
+        agora = time.monotonic()
+        if not forcar and agora - self._gravado_em < settings.METRICAS_INTERVALO_GRAVACAO:
+            return
+        self._gravado_em = agora
+
+        series = [
+            [nome, list(rotulos), valor] for (nome, rotulos), valor in self.instantaneo().items()
+        ]
+        destino = self._caminho_arquivo()
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_suffix(".tmp")
+        temporario.write_text(json.dumps(series))
+        os.replace(temporario, destino)
+
+    def agregado(self):
+        """Totais de todos os processos (arquivos de METRICAS_DIR) ou só deste."""
+        if not settings.METRICAS_DIR:
+            return self.instantaneo()
+
+        self.gravar(forcar=True)
+        return _somar_arquivos(Path(settings.METRICAS_DIR).glob("*.json"))
+
+
+registro = RegistroMetricas()
+
+# Totais dos workers já encerrados, mantidos para que os contadores não diminuam
+ARQUIVO_ENCERRADOS = "encerrados.json"
+
+
+def _somar_arquivos(caminhos):
+    total = {}
+    for caminho in caminhos:
+        try:
+            series = json.loads(caminho.read_text())
+        except (OSError, ValueError):
+            continue  # Arquivo removido ou sendo substituído
+        for nome, rotulos, valor in series:
+            chave = (nome, tuple(tuple(par) for par in rotulos))
+            if isinstance(valor, list):
+                atual = total.setdefault(chave, [0] * len(valor))
+                total[chave] = [a + b for a, b in zip(atual, valor)]
+            else:
+                total[chave] = total.get(chave, 0) + valor
+    return total
+
+
+def limpar_arquivos():
+    """Remove os arquivos de métricas de execuções anteriores (início do gunicorn)."""
+    if settings.METRICAS_DIR:
+        for caminho in Path(settings.METRICAS_DIR).glob("*.json"):
+            caminho.unlink(missing_ok=True)
+
+
+def consolidar_processo(pid):
+    """
+    Soma os arquivos do processo encerrado ao de workers encerrados e os remove.
+
+    Chamado pelo mestre do gunicorn (child_exit) depois que o worker terminou,
+    para que os arquivos não se acumulem com os workers reciclados.
+    """
+    if not settings.METRICAS_DIR:
+        return
+    diretorio = Path(settings.METRICAS_DIR)
+    arquivos = list(diretorio.glob(f"{pid}-*.json"))
+    if not arquivos:
+        return
+    encerrados = diretorio / ARQUIVO_ENCERRADOS
+    total = _somar_arquivos([encerrados, *arquivos])
+    series = [[nome, list(rotulos), valor] for (nome, rotulos), valor in total.items()]
+    temporario = encerrados.with_suffix(".tmp")
+    temporario.write_text(json.dumps(series))
+    os.replace(temporario, encerrados)
+    for caminho in arquivos:
+        caminho.unlink(missing_ok=True)
+
+
+def _formatar_rotulos(rotulos, extra=()):
+    pares = [*rotulos, *extra]
+    if not pares:
+        return ""
+    escapados = (
+        '%s="%s"' % (chave, str(valor).replace("\\", "\\\\").replace('"', '\\"'))
+        for chave, valor in pares
+    )
+    return "{" + ",".join(escapados) + "}"
+
+
+def formatar_prometheus(series):
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+    linhas = []
+    for nome, (tipo, ajuda, buckets) in METRICAS.items():
+        completo = f"{PREFIXO}_{nome}"
+        linhas.append(f"# HELP {completo} {ajuda}")
+        linhas.append(f"# TYPE {completo} {tipo}")
+        for (nome_serie, rotulos), valor in sorted(series.items()):
+            if nome_serie != nome:
+                continue
+            if tipo == "counter":
+                linhas.append(f"{completo}{_formatar_rotulos(rotulos)} {valor}")
+                continue
+            acumulado = 0
+            for limite, quantidade in zip((*buckets, "+Inf"), valor):
+                acumulado += quantidade
+                sufixo = _formatar_rotulos(rotulos, [("le", limite)])
+                linhas.append(f"{completo}_bucket{sufixo} {acumulado}")
+            linhas.append(f"{completo}_sum{_formatar_rotulos(rotulos)} {valor[-2]}")
+            linhas.append(f"{completo}_count{_formatar_rotulos(rotulos)} {valor[-1]}")
+    return "\n".join(linhas) + "\n"
+
+
+def endereco_cliente(request):
+    """
+    Endereço de quem fez a requisição. Se ela veio de um proxy de
+    METRICAS_PROXIES_CONFIAVEIS, é o último do X-Forwarded-For, o único que o
+    proxy garante (os anteriores vêm do cliente); sem o cabeçalho, None.
+    """
+    endereco = request.META.get("REMOTE_ADDR")
+    if endereco not in settings.METRICAS_PROXIES_CONFIAVEIS:
+        return endereco
+    encaminhados = request.META.get("HTTP_X_FORWARDED_FOR", "").split(",")
+    return encaminhados[-1].strip() or None
+
+
+def metricas(request):
+    """
+    GET /metrics: métricas agregadas de todos os workers, em texto do Prometheus.
+
+    Só responde com METRICAS_TOKEN configurado (e enviado como Bearer) ou para
+    endereços de METRICAS_IPS_PERMITIDOS; sem nenhum dos dois o endpoint não existe (404).
+    """
+    token = settings.METRICAS_TOKEN
+    if not token and not settings.METRICAS_IPS_PERMITIDOS:
+        raise Http404
+    autorizado = endereco_cliente(request) in settings.METRICAS_IPS_PERMITIDOS or (
+        token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    )
+    if not autorizado:
+        return HttpResponse(status=401)
+    return HttpResponse(
+        formatar_prometheus(registro.agregado()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class _Medicao:
+    """execute_wrapper que conta as consultas e soma o tempo gasto no banco."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.duracao_db = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracao_db += time.perf_counter() - inicio
+            self.consultas += 1
+
+
+def nome_view(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "nao_resolvida"
+    return match.view_name or match._func_path
+
+
+def orcamento_consultas(request, view):
+    """Orçamento da view para o método da requisição ("GET view") ou para qualquer método."""
+    orcamentos = settings.METRICAS_ORCAMENTO_CONSULTAS
+    return orcamentos.get(f"{request.method} {view}", orcamentos.get(view))
+
+
+class MetricasMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICAS_ATIVAS:
+            return self.get_response(request)
+
+        medicao = _Medicao()
+        inicio = time.perf_counter()
+        with ExitStack() as pilha:
+            for conexao in connections.all():
+                pilha.enter_context(conexao.execute_wrapper(medicao))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+
+        view = nome_view(request)
+        self.registrar(request, response, view, medicao, duracao)
+
+        if settings.METRICAS_SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={medicao.duracao_db * 1000:.1f};desc="{medicao.consultas} consultas", '
+                f"total;dur={duracao * 1000:.1f}"
+            )
+
+        limite = orcamento_consultas(request, view)
+        if limite is not None and medicao.consultas > limite:
+            registro.incrementar("orcamento_consultas_excedido_total", {"view": view})
+            mensagem = (
+                f"{request.method} {view} executou {medicao.consultas} consultas SQL "
+                f"(orçamento: {limite})"
+            )
+            if settings.METRICAS_ORCAMENTO_ESTRITO:
+                raise OrcamentoConsultasExcedido(mensagem)
+            logger.warning(mensagem)
+
+        return response
+
+    def registrar(self, request, response, view, medicao, duracao):
+        rotulos = {"view": view, "metodo": request.method}
+        registro.incrementar(
+            "http_requisicoes_total", {**rotulos, "status": str(response.status_code)}
+        )
+        registro.observar("http_duracao_segundos", rotulos, duracao)
+        registro.observar("db_duracao_segundos", rotulos, medicao.duracao_db)
+        registro.observar("db_consultas", rotulos, medicao.consultas)
+        registro.gravar()
@@ -0,0 +1,170 @@
+import uuid
+from itertools import islice
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) sobre (created_at, id), do mais recente para o
+    mais antigo. Não executa COUNT(*) nem OFFSET, então o custo de cada página
+    não cresce com a profundidade. Coberta pelos índices (created_at, id).
+
+    O cursor guarda o created_at e o id do registro da borda da página: registros
+    com o mesmo created_at (ex.: importados em lote) são separados pelo id, em vez
+    do deslocamento que o CursorPagination do DRF usa nos empates da primeira coluna.
+    A ordem é sempre esta; ?ordering= não se aplica ao modo cursor.
+    """
+
+    ordering = ("-created_at", "-id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverso = self.cursor is not None and self.cursor.reverse
+
+        if self.cursor is not None:
+            criado_em, pk = self._decodificar_posicao(self.cursor.position)
+            if reverso:
+                filtro = Q(created_at__gt=criado_em) | Q(created_at=criado_em, id__gt=pk)
+            else:
+                filtro = Q(created_at__lt=criado_em) | Q(created_at=criado_em, id__lt=pk)
+            queryset = queryset.filter(filtro)
+        queryset = queryset.order_by(*(("created_at", "id") if reverso else self.ordering))
+
+        # Um registro a mais indica se há outra página na mesma direção
+        resultados = list(queryset[: self.page_size + 1])
+        self.page = resultados[: self.page_size]
+        mais = len(resultados) > self.page_size
+        if reverso:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, mais
+        else:
+            self.has_next, self.has_previous = mais, self.cursor is not None
+
+        if (self.has_next or self.has_previous) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            posicao = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            posicao = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=posicao))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            posicao = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            posicao = self.cursor.position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=posicao))
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Também recebe dicionários (ListaRapidaMixin pagina um queryset de values())
+        if isinstance(instance, dict):
+            criado_em, pk = instance["created_at"], instance["id"]
+        else:
+            criado_em, pk = instance.created_at, instance.pk
+        return f"{criado_em.isoformat()}|{pk}"
+
+    def _decodificar_posicao(self, posicao):
+        try:
+            criado_em, pk = (posicao or "").split("|")
+            criado_em = parse_datetime(criado_em)
+            pk = uuid.UUID(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if criado_em is None:
+            raise NotFound(self.invalid_cursor_message)
+        return criado_em, pk
+
+
+class CursorOpcionalPagination(PageNumberPagination):
+    """
+    Paginação por número de página (padrão) com modo cursor opcional.
+
+    O cliente ativa o cursor com ?paginacao=cursor; os links next/previous já
+    carregam o parâmetro ?cursor=, que também ativa o modo.
+    """
+
+    cursor_query_param = "cursor"
+    modo_query_param = "paginacao"
+    cursor_pagination_class = CreatedAtCursorPagination
+
+    def usa_cursor(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.modo_query_param) == "cursor"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.usa_cursor(request):
+            self.paginador_cursor = self.cursor_pagination_class()
+            return self.paginador_cursor.paginate_queryset(queryset, request, view)
+
+        self.paginador_cursor = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.paginador_cursor is not None:
+            return self.paginador_cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class IteradorPagination(PageNumberPagination):
+    """
+    Paginação por número de página de um iterador (ex.: logs arquivados) que o
+    consome só até o fim da página pedida. Sem o total ("count"), que exigiria
+    percorrê-lo inteiro: a resposta traz next, previous e results.
+    """
+
+    def paginate_queryset(self, iterador, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        valor = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.numero = int(valor)
+            if self.numero < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+
+        inicio = (self.numero - 1) * self.page_size
+        resultados = list(islice(iterador, inicio, inicio + self.page_size + 1))
+        if not resultados and self.numero > 1:
+            raise NotFound(self.invalid_page_message)
+        self.mais = len(resultados) > self.page_size
+        return resultados[: self.page_size]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data}
+        )
+
+    def get_next_link(self):
+        if not self.mais:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.numero + 1)
+
+    def get_previous_link(self):
+        if self.numero == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.numero == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.numero - 1)
@@ -0,0 +1,59 @@
+"""
+Renderer e parser JSON da API com orjson, quando instalado.
+
+O orjson serializa nativamente UUIDs, datas e dicionários/listas (incluindo os
+ReturnDict/ReturnList do DRF) em código nativo; o que ele não conhece (ex.:
+Decimal, textos traduzíveis) passa pelo mesmo encoder do DRF. A saída segue o
+JSONRenderer padrão (compacta, UTF-8, "Z" para UTC; só a notação de floats
+muito grandes ou pequenos difere, ex.: 1e20 em vez de 1e+20). Sem o orjson, ou
+quando o cliente pede indentação (?format=json com indent, API navegável),
+as classes se comportam exatamente como as do DRF.
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    OPCOES_ORJSON = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=OPCOES_ORJSON)
+        except orjson.JSONEncodeError:
+            # Ex.: inteiros acima de 64 bits, que o orjson não representa
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Mesmo escape do JSONRenderer, para que a saída seja um subconjunto de JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class JSONRapidoParser(JSONParser):
+    renderer_class = JSONRapidoRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
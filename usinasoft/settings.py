@@ -51,16 +51,21 @@ INSTALLED_APPS = [
     "usuarios",
     "pecas",
     "producao",
+    "sincronizacao",
+    "busca",
 ]
 
 MIDDLEWARE = [
+    "usinasoft.metricas.MetricasMiddleware",  # Consultas SQL e tempos por requisição
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Servir arquivos estáticos em produção
+    "usinasoft.compressao.CompressaoMiddleware",  # gzip/Brotli das respostas da API
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "usinasoft.auditoria.AuditoriaMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -116,6 +121,59 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Padrão: cache em memória local (por processo). Em produção com vários workers,
+# aponte para um backend compartilhado, ex.:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# CACHE_LOCATION=redis://localhost:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "usinasoft"),
+    }
+}
+
+# Cache dos indicadores de produção (invalidado por signals de OP/Peça)
+INDICADORES_CACHE_ALIAS = "default"
+INDICADORES_CACHE_TIMEOUT = int(os.environ.get("INDICADORES_CACHE_TIMEOUT", "300"))
+
+
+# Eventos de status (stream SSE em /api/eventos/, disponível sob ASGI)
+# BackendLocal entrega eventos só ao próprio processo; com vários workers use
+# EVENTOS_BACKEND=usinasoft.eventos.BackendRedis (requer o pacote redis).
+EVENTOS_BACKEND = os.environ.get("EVENTOS_BACKEND", "usinasoft.eventos.BackendLocal")
+EVENTOS_REDIS_URL = os.environ.get("EVENTOS_REDIS_URL", "redis://localhost:6379/0")
+
+
+# Auditoria (LogAcao): registros gravados em lote por uma thread em segundo plano
+# Com AUDITORIA_ASSINCRONA=False cada registro é gravado na hora (após o commit).
+AUDITORIA_ASSINCRONA = os.environ.get("AUDITORIA_ASSINCRONA", "True") == "True"
+AUDITORIA_TAMANHO_LOTE = int(os.environ.get("AUDITORIA_TAMANHO_LOTE", "200"))
+AUDITORIA_INTERVALO = float(os.environ.get("AUDITORIA_INTERVALO", "2"))
+AUDITORIA_LIMITE_BUFFER = int(os.environ.get("AUDITORIA_LIMITE_BUFFER", "10000"))
+# Gravações que falham por o banco estar indisponível são tentadas de novo até este limite
+AUDITORIA_MAX_TENTATIVAS = int(os.environ.get("AUDITORIA_MAX_TENTATIVAS", "5"))
+
+
+# Retenção dos logs de ação: o comando prune_logs arquiva em LOGS_ARQUIVO_DIR os logs
+# com mais de LOGS_RETENCAO_DIAS dias; GET /api/logs/?origem=arquivo consulta esses
+# arquivos em períodos de até LOGS_ARQUIVO_MAX_DIAS dias.
+LOGS_RETENCAO_DIAS = int(os.environ.get("LOGS_RETENCAO_DIAS", "180"))
+LOGS_ARQUIVO_DIR = os.environ.get("LOGS_ARQUIVO_DIR", str(BASE_DIR / "arquivo_logs"))
+LOGS_ARQUIVO_MAX_DIAS = int(os.environ.get("LOGS_ARQUIVO_MAX_DIAS", "31"))
+
+# Sincronização incremental (GET /api/sync/): alterações dos últimos
+# SINCRONIZACAO_MARGEM_SEGUNDOS segundos só são entregues na consulta seguinte, para que
+# uma transação longa (ex.: importação em lote) que confirme registros com data anterior
+# ao watermark já entregue não seja pulada. Use um valor maior que a transação mais longa.
+SINCRONIZACAO_MARGEM_SEGUNDOS = int(os.environ.get("SINCRONIZACAO_MARGEM_SEGUNDOS", "60"))
+# As marcas de exclusão são mantidas por SINCRONIZACAO_RETENCAO_DIAS dias (comando
+# prune_exclusoes); um since mais antigo que isso recebe 410 e exige sincronização completa.
+SINCRONIZACAO_RETENCAO_DIAS = int(os.environ.get("SINCRONIZACAO_RETENCAO_DIAS", "90"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -179,8 +237,49 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # JSON com orjson quando instalado (saída equivalente à do JSONRenderer do DRF)
+    "DEFAULT_RENDERER_CLASSES": [
+        "usinasoft.renderers.JSONRapidoRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "usinasoft.renderers.JSONRapidoParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# Listas de /api/pecas/ e /api/ops/ montadas direto de values(), sem o serializer
+# (mesma resposta; ver usinasoft.lista_rapida). False volta a usar o serializer.
+LISTA_RAPIDA = os.environ.get("LISTA_RAPIDA", "True") == "True"
+
+# Compressão das respostas (usinasoft.compressao): Brotli requer o pacote brotli
+COMPRESSAO_TAMANHO_MINIMO = int(os.environ.get("COMPRESSAO_TAMANHO_MINIMO", "1024"))
+COMPRESSAO_BROTLI_QUALIDADE = int(os.environ.get("COMPRESSAO_BROTLI_QUALIDADE", "4"))
+
+# Métricas por requisição (usinasoft.metricas): cabeçalho Server-Timing e GET /metrics
+# (Prometheus). Com vários workers, METRICAS_DIR deve ser um diretório local
+# compartilhado por eles. O /metrics só responde com METRICAS_TOKEN ("Authorization:
+# Bearer <token>") ou para os endereços de METRICAS_IPS_PERMITIDOS (separados por vírgula,
+# ex.: o do Prometheus); sem nenhum dos dois ele devolve 404. Atrás de um proxy reverso,
+# liste-o em METRICAS_PROXIES_CONFIAVEIS: nas requisições vindas dele o endereço
+# comparado é o último do X-Forwarded-For (o que o proxy adicionou), não o do proxy.
+METRICAS_ATIVAS = os.environ.get("METRICAS_ATIVAS", "True") == "True"
+METRICAS_SERVER_TIMING = os.environ.get("METRICAS_SERVER_TIMING", "True") == "True"
+METRICAS_DIR = os.environ.get("METRICAS_DIR", "")
+METRICAS_INTERVALO_GRAVACAO = float(os.environ.get("METRICAS_INTERVALO_GRAVACAO", "5"))
+METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN", "")
+METRICAS_IPS_PERMITIDOS = [
+    ip.strip() for ip in os.environ.get("METRICAS_IPS_PERMITIDOS", "").split(",") if ip.strip()
+]
+METRICAS_PROXIES_CONFIAVEIS = [
+    ip.strip() for ip in os.environ.get("METRICAS_PROXIES_CONFIAVEIS", "").split(",") if ip.strip()
+]
+# Orçamento de consultas SQL por view ("nome-da-view" ou "MÉTODO nome-da-view"): acima
+# dele a requisição gera um aviso no log, ou falha com METRICAS_ORCAMENTO_ESTRITO=True.
+METRICAS_ORCAMENTO_CONSULTAS = {}
+METRICAS_ORCAMENTO_ESTRITO = os.environ.get("METRICAS_ORCAMENTO_ESTRITO", "False") == "True"
+
 # CORS Headers
 # Em produção, especifique os domínios permitidos
 if DEBUG:
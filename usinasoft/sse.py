@@ -0,0 +1,155 @@
+"""
+Stream de eventos de status via Server-Sent Events (GET /api/eventos/).
+
+Aplicação ASGI pura, montada em usinasoft/asgi.py antes do Django: cada conexão
+fica aberta recebendo os eventos publicados por usinasoft.eventos, sem ocupar
+um worker síncrono. Disponível apenas quando o projeto roda sob ASGI
+(ex.: uvicorn usinasoft.asgi:application).
+
+Autenticação: token JWT de acesso no cabeçalho Authorization (Bearer) ou no
+parâmetro ?token= (o EventSource do navegador não envia cabeçalhos).
+
+Filtros opcionais:
+- tipos: lista separada por vírgulas (ex.: peca.status,ordem_producao.status)
+- ordem_producao: id de uma OP, para receber só os eventos dela e de suas peças
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .eventos import get_backend
+
+CAMINHO_EVENTOS = "/api/eventos/"
+
+# Comentário enviado periodicamente para manter a conexão (e proxies) ativa
+INTERVALO_HEARTBEAT = 15
+
+
+@sync_to_async
+def _autenticar(token):
+    # Fora do ciclo request_started/request_finished do Django: a conexão usada na
+    # thread do sync_to_async é verificada e fechada aqui, para não ficar aberta
+    # durante toda a assinatura do stream (nem ser reaproveitada já caída)
+    close_old_connections()
+    autenticacao = JWTAuthentication()
+    try:
+        validado = autenticacao.get_validated_token(token)
+        return autenticacao.get_user(validado)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+
+
+def _obter_token(scope, parametros):
+    for nome, valor in scope.get("headers", []):
+        if nome == b"authorization":
+            partes = valor.decode().split()
+            if len(partes) == 2 and partes[0].lower() == "bearer":
+                return partes[1]
+    return parametros.get("token", [None])[0]
+
+
+def _formatar(evento):
+    dados = json.dumps(evento, cls=DjangoJSONEncoder)
+    return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {dados}\n\n".encode()
+
+
+def _aceita(evento, tipos, ordem_producao):
+    if tipos and evento["tipo"] not in tipos:
+        return False
+    if ordem_producao and evento.get("ordem_producao") != ordem_producao:
+        return False
+    return True
+
+
+async def _responder_erro(send, status, mensagem):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": json.dumps({"detail": mensagem}).encode()})
+
+
+async def aplicacao_eventos(scope, receive, send):
+    """Aplicação ASGI do stream SSE."""
+    if scope["method"] != "GET":
+        await _responder_erro(send, 405, "Método não permitido.")
+        return
+
+    parametros = parse_qs(scope.get("query_string", b"").decode())
+    token = _obter_token(scope, parametros)
+    usuario = await _autenticar(token) if token else None
+    if usuario is None or not usuario.is_active:
+        await _responder_erro(send, 401, "Token de autenticação ausente ou inválido.")
+        return
+
+    tipos = set(filter(None, parametros.get("tipos", [""])[0].split(",")))
+    ordem_producao = parametros.get("ordem_producao", [None])[0]
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+
+    async def _aguardar_desconexao():
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "http.disconnect":
+                return
+
+    desconexao = asyncio.ensure_future(_aguardar_desconexao())
+    try:
+        async with get_backend().assinar() as assinatura:
+            await send(
+                {"type": "http.response.body", "body": b": conectado\n\n", "more_body": True}
+            )
+            while not desconexao.done():
+                # A espera pelo evento termina sozinha a cada heartbeat; só é
+                # cancelada quando o cliente desconecta
+                proximo = asyncio.ensure_future(assinatura.proximo(INTERVALO_HEARTBEAT))
+                await asyncio.wait({proximo, desconexao}, return_when=asyncio.FIRST_COMPLETED)
+                if desconexao.done():
+                    proximo.cancel()
+                    break
+
+                evento = proximo.result()
+                if evento is None:
+                    await send(
+                        {"type": "http.response.body", "body": b": ping\n\n", "more_body": True}
+                    )
+                elif _aceita(evento, tipos, ordem_producao):
+                    await send(
+                        {"type": "http.response.body", "body": _formatar(evento), "more_body": True}
+                    )
+    finally:
+        desconexao.cancel()
+
+
+def com_eventos(aplicacao_django):
+    """Envolve a aplicação ASGI do Django, desviando /api/eventos/ para o stream SSE."""
+
+    async def aplicacao(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == CAMINHO_EVENTOS:
+            await aplicacao_eventos(scope, receive, send)
+        else:
+            await aplicacao_django(scope, receive, send)
+
+    return aplicacao
@@ -4,9 +4,12 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from usinasoft.metricas import metricas
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    # Métricas no formato do Prometheus
+    path("metrics", metricas, name="metricas"),
     # JWT Authentication
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
@@ -14,4 +17,6 @@ urlpatterns = [
     path("api/", include("usuarios.urls")),
     path("api/", include("pecas.urls")),
     path("api/", include("producao.urls")),
+    path("api/", include("sincronizacao.urls")),
+    path("api/", include("busca.urls")),
 ]
@@ -5,3 +5,7 @@ class UsuariosConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "usuarios"
     verbose_name = "Usuários"
+
+    def ready(self):
+        """Importa os signals de auditoria quando o app é carregado."""
+        import usuarios.signals
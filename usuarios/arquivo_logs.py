@@ -0,0 +1,133 @@
+"""
+Arquivamento dos logs de ação (LogAcao) antigos.
+
+O comando prune_logs move os registros anteriores ao horizonte de retenção
+para arquivos JSONL comprimidos com gzip, um por dia (fuso padrão), em
+LOGS_ARQUIVO_DIR. Cada linha tem o mesmo formato de LogAcaoSerializer, então
+o LogAcaoViewSet devolve registros arquivados exatamente como os do banco
+(ver ?origem=arquivo).
+
+Cada dia é gravado em um arquivo temporário e renomeado só depois de completo;
+as linhas só são excluídas do banco depois disso, em lotes delimitados por
+created_at. Se o processo for interrompido entre a gravação e a exclusão, a
+próxima execução acrescenta os registros novamente ao arquivo do dia e a
+leitura descarta os ids repetidos.
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import LogAcao
+from .serializers import LogAcaoSerializer
+
+
+def diretorio_arquivo():
+    return Path(settings.LOGS_ARQUIVO_DIR)
+
+
+def caminho_arquivo(dia):
+    """Arquivo com os logs arquivados do dia informado."""
+    return diretorio_arquivo() / f"{dia:%Y}" / f"logacao-{dia.isoformat()}.jsonl.gz"
+
+
+def limites_dia(dia):
+    """Início e fim (exclusivo) do dia no fuso padrão."""
+    tz = timezone.get_default_timezone()
+    inicio = timezone.make_aware(datetime.combine(dia, time.min), tz)
+    return inicio, inicio + timedelta(days=1)
+
+
+def arquivar_dia(dia, tamanho_lote=2000):
+    """
+    Move para o arquivo do dia todos os LogAcao criados nele.
+
+    Retorna o número de registros arquivados.
+    """
+    inicio, fim = limites_dia(dia)
+    registros = (
+        LogAcao.objects.select_related("usuario")
+        .filter(created_at__gte=inicio, created_at__lt=fim)
+        .order_by("created_at", "id")
+    )
+
+    destino = caminho_arquivo(dia)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(destino.name + ".tmp")
+
+    # Lotes (primeiro created_at, último created_at, ids) a excluir depois da gravação
+    lotes = []
+    with open(temporario, "wb") as saida:
+        if destino.exists():
+            # Membros gzip concatenados formam um arquivo gzip válido
+            with open(destino, "rb") as existente:
+                shutil.copyfileobj(existente, saida)
+
+        with gzip.GzipFile(fileobj=saida, mode="wb") as compactado:
+            lote = []
+            for log in registros.iterator(chunk_size=tamanho_lote):
+                dados = LogAcaoSerializer(log).data
+                linha = json.dumps(dados, cls=DjangoJSONEncoder, ensure_ascii=False)
+                compactado.write(linha.encode() + b"\n")
+                lote.append(log)
+                if len(lote) == tamanho_lote:
+                    lotes.append((lote[0].created_at, lote[-1].created_at, [r.pk for r in lote]))
+                    lote = []
+            if lote:
+                lotes.append((lote[0].created_at, lote[-1].created_at, [r.pk for r in lote]))
+
+        saida.flush()
+        os.fsync(saida.fileno())
+
+    if not lotes:
+        temporario.unlink()
+        return 0
+
+    os.replace(temporario, destino)
+
+    total = 0
+    for primeiro, ultimo, ids in lotes:
+        total += LogAcao.objects.filter(
+            created_at__gte=primeiro, created_at__lte=ultimo, pk__in=ids
+        ).delete()[0]
+    return total
+
+
+def ler_arquivo(inicio, fim, filtros=None):
+    """
+    Registros arquivados entre as datas inicio e fim (inclusive), do mais
+    recente para o mais antigo, no formato de LogAcaoSerializer.
+
+    filtros ({campo: valor}) é aplicado a cada linha durante a leitura, e os
+    dias são lidos sob demanda: quem consome só parte do gerador (uma página)
+    não abre os arquivos dos dias seguintes. De cada dia só ficam em memória
+    os registros que passam nos filtros.
+    """
+    filtros = filtros or {}
+    dia = fim
+    while dia >= inicio:
+        caminho = caminho_arquivo(dia)
+        if caminho.exists():
+            registros = []
+            with gzip.open(caminho, "rt", encoding="utf-8") as entrada:
+                for linha in entrada:
+                    if not linha.strip():
+                        continue
+                    registro = json.loads(linha)
+                    if all(str(registro[campo]) == valor for campo, valor in filtros.items()):
+                        registros.append(registro)
+
+            vistos = set()
+            # As linhas foram gravadas em ordem crescente de (created_at, id)
+            for registro in reversed(registros):
+                if registro["id"] not in vistos:
+                    vistos.add(registro["id"])
+                    yield registro
+        dia -= timedelta(days=1)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from usuarios.arquivo_logs import arquivar_dia, diretorio_arquivo, limites_dia
+from usuarios.models import LogAcao
+
+
+class Command(BaseCommand):
+    help = (
+        "Move os logs de ação anteriores ao horizonte de retenção para arquivos "
+        "JSONL comprimidos (um por dia) e os exclui do banco em lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=settings.LOGS_RETENCAO_DIAS,
+            help=(
+                "Dias mantidos no banco; logs mais antigos são arquivados "
+                f"(padrão: {settings.LOGS_RETENCAO_DIAS})"
+            ),
+        )
+        parser.add_argument(
+            "--lote",
+            type=int,
+            default=2000,
+            help="Registros por lote de leitura e exclusão (padrão: 2000)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantos registros seriam arquivados por dia",
+        )
+
+    def handle(self, *args, **options):
+        if options["dias"] < 1:
+            raise CommandError("--dias deve ser maior que zero.")
+        if options["lote"] < 1:
+            raise CommandError("--lote deve ser maior que zero.")
+
+        tz = timezone.get_default_timezone()
+        limite = timezone.localdate(timezone=tz) - timedelta(days=options["dias"])
+        limite_inicio, _ = limites_dia(limite)
+
+        logs_antigos = LogAcao.objects.filter(created_at__lt=limite_inicio)
+        total = 0
+        proximo = logs_antigos.aggregate(primeiro=Min("created_at"))["primeiro"]
+        while proximo is not None:
+            dia = timezone.localtime(proximo, tz).date()
+            inicio, fim = limites_dia(dia)
+            if options["dry_run"]:
+                arquivados = LogAcao.objects.filter(
+                    created_at__gte=inicio, created_at__lt=fim
+                ).count()
+            else:
+                arquivados = arquivar_dia(dia, options["lote"])
+
+            self.stdout.write(f"  {dia.isoformat()}: {arquivados} registro(s)")
+            total += arquivados
+            # Pula direto para o próximo dia que tem logs
+            proximo = logs_antigos.filter(created_at__gte=fim).aggregate(
+                primeiro=Min("created_at")
+            )["primeiro"]
+
+        acao = "seriam arquivados" if options["dry_run"] else "arquivados"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} log(s) anteriores a {limite.isoformat()} {acao} em {diretorio_arquivo()}."
+            )
+        )
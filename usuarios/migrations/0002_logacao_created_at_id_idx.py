@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usuarios", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="logacao",
+            index=models.Index(fields=["created_at", "id"], name="usuarios_lo_created_166241_idx"),
+        ),
+    ]
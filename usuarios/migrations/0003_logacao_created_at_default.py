@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 14:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("usuarios", "0002_logacao_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="logacao",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name="Criado em"
+            ),
+        ),
+    ]
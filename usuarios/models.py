@@ -1,6 +1,15 @@
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.utils import timezone
+from usinasoft.auditoria import AuditavelMixin
+
+
+def nome_completo(first_name, last_name, email):
+    """Nome completo a partir dos campos do usuário (usado também nas listagens com values())."""
+    if first_name and last_name:
+        return f"{first_name} {last_name}"
+    return email
 
 
 class UsuarioManager(BaseUserManager):
@@ -30,7 +39,7 @@ class UsuarioManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
-class Usuario(AbstractBaseUser, PermissionsMixin):
+class Usuario(AuditavelMixin, AbstractBaseUser, PermissionsMixin):
     """
     Modelo de usuário customizado que usa email como identificador único.
     """
@@ -64,9 +73,7 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
 
     def get_full_name(self):
         """Retorna o nome completo do usuário."""
-        if self.first_name and self.last_name:
-            return f"{self.first_name} {self.last_name}"
-        return self.email
+        return nome_completo(self.first_name, self.last_name, self.email)
 
     def get_short_name(self):
         """Retorna o nome curto do usuário."""
@@ -86,7 +93,10 @@ class LogAcao(models.Model):
     alvo_tipo = models.CharField(max_length=100, blank=True, null=True, verbose_name="Tipo do alvo")
     alvo_id = models.UUIDField(blank=True, null=True, verbose_name="ID do alvo")
     detalhes = models.JSONField(blank=True, null=True, verbose_name="Detalhes")
-    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    # Sem auto_now_add: registros gravados em lote guardam o momento da ação, não o da gravação
+    created_at = models.DateTimeField(
+        default=timezone.now, editable=False, verbose_name="Criado em"
+    )
 
     class Meta:
         verbose_name = "Log de Ação"
@@ -96,6 +106,7 @@ class LogAcao(models.Model):
             models.Index(fields=["usuario", "created_at"]),
             models.Index(fields=["acao"]),
             models.Index(fields=["alvo_tipo", "alvo_id"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self):
@@ -0,0 +1,60 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from pecas.models import Cliente, Peca
+from producao.models import OrdemProducao
+from usinasoft.auditoria import (
+    ACAO_ATUALIZAR,
+    ACAO_CRIAR,
+    ACAO_EXCLUIR,
+    campos_alterados,
+    registrar_acao,
+    valores_para_log,
+)
+from .models import Usuario
+
+TIPOS_AUDITADOS = {
+    Cliente: "cliente",
+    OrdemProducao: "ordem_producao",
+    Peca: "peca",
+    Usuario: "usuario",
+}
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_save, sender=OrdemProducao)
+@receiver(post_save, sender=Peca)
+@receiver(post_save, sender=Usuario)
+def auditar_gravacao(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Signal que registra no log de auditoria a criação ou alteração do registro,
+    com os valores iniciais ou os campos alterados em ``detalhes``.
+    Gravações que não alteram nenhum campo não são registradas.
+    """
+    if created:
+        registrar_acao(
+            ACAO_CRIAR,
+            TIPOS_AUDITADOS[sender],
+            instance.pk,
+            {"campos": valores_para_log(instance.valores_auditoria())},
+        )
+    else:
+        alterados = campos_alterados(instance, update_fields)
+        if alterados:
+            registrar_acao(
+                ACAO_ATUALIZAR, TIPOS_AUDITADOS[sender], instance.pk, {"campos": alterados}
+            )
+    instance.registrar_valores_auditoria()
+
+
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=OrdemProducao)
+@receiver(post_delete, sender=Peca)
+@receiver(post_delete, sender=Usuario)
+def auditar_exclusao(sender, instance, **kwargs):
+    """Signal que registra no log de auditoria a exclusão, com os últimos valores do registro."""
+    registrar_acao(
+        ACAO_EXCLUIR,
+        TIPOS_AUDITADOS[sender],
+        instance.pk,
+        {"campos": valores_para_log(instance.valores_auditoria())},
+    )
@@ -1,7 +1,16 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from usinasoft.pagination import CursorOpcionalPagination, IteradorPagination
+from .arquivo_logs import ler_arquivo
 from .models import Usuario, LogAcao
 from .serializers import UsuarioSerializer, LogAcaoSerializer
 
@@ -13,9 +22,110 @@ class UsuarioViewSet(viewsets.ModelViewSet):
 
 
 class LogAcaoViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = LogAcao.objects.all().order_by("-created_at")
+    """
+    Logs de ação. Com ?origem=arquivo&start=YYYY-MM-DD&end=YYYY-MM-DD a listagem
+    lê os logs já movidos para o arquivo pelo comando prune_logs.
+
+    Restrito a administradores (is_staff): os detalhes trazem os valores
+    alterados de todos os modelos auditados, inclusive de usuários.
+    """
+
+    queryset = LogAcao.objects.select_related("usuario").order_by("-created_at", "-id")
     serializer_class = LogAcaoSerializer
-    permission_classes = [AllowAny]
+    pagination_class = CursorOpcionalPagination
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        """
+        Permite filtrar logs por parâmetros de query, cada um coberto por um
+        índice de LogAcao:
+        - usuario: UUID do autor (índice usuario, created_at)
+        - acao: ação registrada, ex.: atualizar (índice acao)
+        - alvo_tipo e alvo_id: registro afetado, ex.: ?alvo_tipo=ordem_producao&alvo_id=<id>
+          (índice alvo_tipo, alvo_id; alvo_id exige alvo_tipo)
+        - start / end: período de created_at, YYYY-MM-DD (dia inteiro) ou data/hora
+          ISO 8601 (índice created_at, id)
+        """
+        qs = super().get_queryset()
+        if self.action == "list":
+            qs = qs.filter(**self.filtros())
+        return qs
+
+    def filtros(self):
+        """Lê e valida os filtros da query string, no formato de lookups do ORM."""
+        params = self.request.query_params
+        filtros = {}
+
+        for param, campo in (("usuario", "usuario_id"), ("alvo_id", "alvo_id")):
+            if params.get(param):
+                try:
+                    filtros[campo] = uuid.UUID(params[param])
+                except ValueError:
+                    raise ValidationError({param: "UUID inválido."})
+
+        if "alvo_id" in filtros and not params.get("alvo_tipo"):
+            raise ValidationError({"alvo_id": "Informe também alvo_tipo."})
+
+        for param in ("acao", "alvo_tipo"):
+            if params.get(param):
+                filtros[param] = params[param]
+
+        if params.get("start"):
+            filtros["created_at__gte"] = self._limite_periodo("start", time.min)
+        if params.get("end"):
+            filtros["created_at__lte"] = self._limite_periodo("end", time.max)
+
+        return filtros
+
+    def _limite_periodo(self, param, hora_do_dia):
+        valor = self.request.query_params[param]
+        try:
+            dia = parse_date(valor)
+            momento = datetime.combine(dia, hora_do_dia) if dia else parse_datetime(valor)
+        except ValueError:
+            momento = None
+        if momento is None:
+            raise ValidationError({param: "Use YYYY-MM-DD ou data/hora ISO 8601."})
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+        return momento
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("origem") == "arquivo":
+            return self.listar_arquivo(request)
+        return super().list(request, *args, **kwargs)
+
+    def listar_arquivo(self, request):
+        try:
+            start = date.fromisoformat(request.query_params.get("start", ""))
+            end = date.fromisoformat(request.query_params.get("end", ""))
+        except ValueError:
+            return Response(
+                {"error": "origem=arquivo requer start e end no formato YYYY-MM-DD"}, status=400
+            )
+
+        if start > end:
+            return Response({"error": "start deve ser anterior ou igual a end"}, status=400)
+        if end - start >= timedelta(days=settings.LOGS_ARQUIVO_MAX_DIAS):
+            return Response(
+                {
+                    "error": "O período consultado no arquivo deve ter no máximo "
+                    f"{settings.LOGS_ARQUIVO_MAX_DIAS} dias"
+                },
+                status=400,
+            )
+
+        # Mesmos filtros da listagem do banco, exceto o período (já dado pelos dias)
+        filtros = {
+            ("usuario" if campo == "usuario_id" else campo): str(valor)
+            for campo, valor in self.filtros().items()
+            if not campo.startswith("created_at")
+        }
+        # Os arquivos não suportam cursor: a paginação é por número de página, lendo
+        # os dias só até completar a página pedida
+        paginador = IteradorPagination()
+        pagina = paginador.paginate_queryset(ler_arquivo(start, end, filtros), request, view=self)
+        return paginador.get_paginated_response(pagina)
 
 
 @api_view(["GET"])